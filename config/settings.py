@@ -134,3 +134,29 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,  # Number of items per page
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
 }
+
+# How often (seconds) each worker re-reads the dataset version stamp used to
+# invalidate in-memory lookup tables after the Pokédex data changes
+POKEDEX_DATASET_VERSION_CHECK_INTERVAL = 5
+
+# Worker processes used by the team optimizer search (1 runs it in-process)
+POKEDEX_TEAM_SEARCH_WORKERS = 1
+
+# How often (seconds) each worker re-checks the stored team score distribution,
+# so builds from other processes are picked up
+POKEDEX_TEAM_PERCENTILE_CHECK_INTERVAL = 5
+
+# Maximum number of distinct team typings kept in the team analysis cache
+POKEDEX_TEAM_ANALYSIS_CACHE_SIZE = 4096
+
+# How long (seconds) a request waits for an identical computation running in
+# another process before computing itself, and how often it polls the cache
+POKEDEX_SINGLE_FLIGHT_TIMEOUT = 10
+POKEDEX_SINGLE_FLIGHT_POLL_INTERVAL = 0.01
+
+# Whether identical computations are coalesced across processes through the
+# cache (None: only when the default cache backend is shared between processes)
+POKEDEX_SINGLE_FLIGHT_SHARED = None
+
+# Maximum number of targets whose counter rankings are kept in memory
+POKEDEX_COUNTERS_CACHE_SIZE = 512
@@ -1,14 +1,125 @@
-from django_filters import CharFilter, FilterSet, ModelMultipleChoiceFilter
+from django.db.models import F
+from django_filters import (
+    CharFilter,
+    ChoiceFilter,
+    FilterSet,
+    ModelMultipleChoiceFilter,
+    NumberFilter,
+    OrderingFilter,
+)
 
 from pokedex.models import Ability, Pokemon, PokemonType
+from services.utils.membership_columns import MembershipColumnsService
+
+ROLE_CHOICES = [(role, role) for role in ["Offensive", "Defensive", "Tank", "Balanced"]]
+STAT_FIELDS = ["hp", "attack", "defense", "special_attack", "special_defense", "speed", "total"]
 
 
 class PokedexFilter(FilterSet):
     name = CharFilter(field_name="name", lookup_expr="icontains", label="Name")
     types = ModelMultipleChoiceFilter(field_name="types", queryset=PokemonType.objects.all(), label="Types")
     abilities = ModelMultipleChoiceFilter(field_name="abilities", queryset=Ability.objects.all(), label="Abilities")
+    types_all = ModelMultipleChoiceFilter(
+        queryset=MembershipColumnsService.maskable_types(), method="filter_types_all", label="Has all types"
+    )
+    types_not = ModelMultipleChoiceFilter(
+        queryset=MembershipColumnsService.maskable_types(), method="filter_types_not", label="Has none of the types"
+    )
+    abilities_all = ModelMultipleChoiceFilter(
+        queryset=Ability.objects.all(), method="filter_abilities_all", label="Has all abilities"
+    )
+    immune_to = ModelMultipleChoiceFilter(
+        queryset=MembershipColumnsService.maskable_types(), method="filter_immune_to", label="Immune to all types"
+    )
+    resists = ModelMultipleChoiceFilter(
+        queryset=MembershipColumnsService.maskable_types(), method="filter_resists", label="Resists all types"
+    )
+    weak_to = ModelMultipleChoiceFilter(
+        queryset=MembershipColumnsService.maskable_types(), method="filter_weak_to", label="Weak to all types"
+    )
+    max_weakness = NumberFilter(field_name="max_multiplier", lookup_expr="lte", label="Max multiplier taken")
+    role = ChoiceFilter(field_name="stats__role", choices=ROLE_CHOICES, label="Role")
+
+    min_hp = NumberFilter(field_name="stats__hp", lookup_expr="gte")
+    max_hp = NumberFilter(field_name="stats__hp", lookup_expr="lte")
+    min_attack = NumberFilter(field_name="stats__attack", lookup_expr="gte")
+    max_attack = NumberFilter(field_name="stats__attack", lookup_expr="lte")
+    min_defense = NumberFilter(field_name="stats__defense", lookup_expr="gte")
+    max_defense = NumberFilter(field_name="stats__defense", lookup_expr="lte")
+    min_special_attack = NumberFilter(field_name="stats__special_attack", lookup_expr="gte")
+    max_special_attack = NumberFilter(field_name="stats__special_attack", lookup_expr="lte")
+    min_special_defense = NumberFilter(field_name="stats__special_defense", lookup_expr="gte")
+    max_special_defense = NumberFilter(field_name="stats__special_defense", lookup_expr="lte")
+    min_speed = NumberFilter(field_name="stats__speed", lookup_expr="gte")
+    max_speed = NumberFilter(field_name="stats__speed", lookup_expr="lte")
+    min_total = NumberFilter(field_name="stats__total", lookup_expr="gte")
+    max_total = NumberFilter(field_name="stats__total", lookup_expr="lte")
+
+    min_hp_pct = NumberFilter(field_name="stats__hp_pct", lookup_expr="gte")
+    min_attack_pct = NumberFilter(field_name="stats__attack_pct", lookup_expr="gte")
+    min_defense_pct = NumberFilter(field_name="stats__defense_pct", lookup_expr="gte")
+    min_special_attack_pct = NumberFilter(field_name="stats__special_attack_pct", lookup_expr="gte")
+    min_special_defense_pct = NumberFilter(field_name="stats__special_defense_pct", lookup_expr="gte")
+    min_speed_pct = NumberFilter(field_name="stats__speed_pct", lookup_expr="gte")
+    min_total_pct = NumberFilter(field_name="stats__total_pct", lookup_expr="gte")
+
+    ordering = OrderingFilter(
+        fields=[("id", "id"), ("name", "name"), ("height", "height"), ("weight", "weight")]
+        + [(f"stats__{field}", field) for field in STAT_FIELDS]
+        + [(f"stats__{field}_pct", f"{field}_pct") for field in STAT_FIELDS]
+    )
+
+
+    @staticmethod
+    def _filter_bits(queryset, name, field, types, all_set=True):
+        """
+        Keep rows with every bit of `types` set in `field` (or, with `all_set=False`, none of them).
+
+        A btree index can't serve a bitwise predicate, so the predicate only
+        picks among the column's few distinct values (read from its index)
+        and the rows are then fetched by exact match on those values.
+        """
+        if not types:
+            return queryset
+        mask = MembershipColumnsService.type_mask(t.id for t in types)
+        matching = (
+            Pokemon.objects.alias(bits=F(field).bitand(mask))
+            .filter(bits=mask if all_set else 0)
+            .order_by()
+            .values(field)
+            .distinct()
+        )
+        return queryset.filter(**{f"{field}__in": matching})
+
+
+    def filter_types_all(self, queryset, name, value):
+        return self._filter_bits(queryset, name, "type_mask", value)
+
+
+    def filter_types_not(self, queryset, name, value):
+        return self._filter_bits(queryset, name, "type_mask", value, all_set=False)
+
+
+    def filter_immune_to(self, queryset, name, value):
+        return self._filter_bits(queryset, name, "immune_mask", value)
+
+
+    def filter_resists(self, queryset, name, value):
+        return self._filter_bits(queryset, name, "resist_mask", value)
+
+
+    def filter_weak_to(self, queryset, name, value):
+        return self._filter_bits(queryset, name, "weak_mask", value)
+
+
+    def filter_abilities_all(self, queryset, name, value):
+        # One semi-join per ability, each a lookup on the junction table's ability index
+        memberships = Pokemon.abilities.through.objects
+        for ability in value:
+            queryset = queryset.filter(id__in=memberships.filter(ability_id=ability.id).values("pokemon_id"))
+        return queryset
 
 
     class Meta:
         model = Pokemon
-        fields = ["name", "types", "abilities"]
+        fields = ["name", "types", "abilities", "role"]
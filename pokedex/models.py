@@ -20,12 +20,23 @@ class Ability(models.Model):
 
 class Pokemon(models.Model):
     name = models.CharField(max_length=50, db_index=True)
-    height = models.IntegerField(null=True, blank=True)
-    weight = models.IntegerField(null=True, blank=True)
+    height = models.IntegerField(null=True, blank=True, db_index=True)
+    weight = models.IntegerField(null=True, blank=True, db_index=True)
     image_url = models.URLField(null=True, blank=True)
     types = models.ManyToManyField(PokemonType, related_name="pokemon")
     abilities = models.ManyToManyField(Ability, related_name="pokemon")
 
+    # Denormalized copy of `types` for single-row filtering,
+    # maintained by `MembershipColumnsService`
+    type_mask = models.BigIntegerField(default=0, db_index=True)
+
+    # Defensive profile as bitmasks of attacking types (same bits as `type_mask`),
+    # maintained by `DefensiveColumnsService`
+    immune_mask = models.BigIntegerField(default=0, db_index=True)
+    resist_mask = models.BigIntegerField(default=0, db_index=True)
+    weak_mask = models.BigIntegerField(default=0, db_index=True)
+    max_multiplier = models.FloatField(default=1.0, db_index=True)
+
     def __str__(self):
         return self.name
 
@@ -39,13 +50,24 @@ class Pokemon(models.Model):
 
 class PokemonStats(models.Model):
     pokemon = models.OneToOneField(Pokemon, on_delete=models.CASCADE, related_name="stats")
-    hp = models.IntegerField(null=True, blank=True)
-    attack = models.IntegerField(null=True, blank=True)
-    defense = models.IntegerField(null=True, blank=True)
-    special_attack = models.IntegerField(null=True, blank=True)
-    special_defense = models.IntegerField(null=True, blank=True)
-    speed = models.IntegerField(null=True, blank=True)
-    total = models.IntegerField(null=True, blank=True)
+    hp = models.IntegerField(null=True, blank=True, db_index=True)
+    attack = models.IntegerField(null=True, blank=True, db_index=True)
+    defense = models.IntegerField(null=True, blank=True, db_index=True)
+    special_attack = models.IntegerField(null=True, blank=True, db_index=True)
+    special_defense = models.IntegerField(null=True, blank=True, db_index=True)
+    speed = models.IntegerField(null=True, blank=True, db_index=True)
+    total = models.IntegerField(null=True, blank=True, db_index=True)
+
+    # Share of Pokémon (0-100) with this stat lower than or equal to this one,
+    # materialized by `StatPercentileService.recompute`
+    hp_pct = models.FloatField(null=True, blank=True, db_index=True)
+    attack_pct = models.FloatField(null=True, blank=True, db_index=True)
+    defense_pct = models.FloatField(null=True, blank=True, db_index=True)
+    special_attack_pct = models.FloatField(null=True, blank=True, db_index=True)
+    special_defense_pct = models.FloatField(null=True, blank=True, db_index=True)
+    speed_pct = models.FloatField(null=True, blank=True, db_index=True)
+    total_pct = models.FloatField(null=True, blank=True, db_index=True)
+    role = models.CharField(max_length=20, blank=True, db_index=True)
     
     def __str__(self):
         return f"{self.pokemon.name} Stats"
@@ -0,0 +1,178 @@
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import F, Field, Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+OrderField = Tuple[str, bool]
+
+
+class PokedexCursorPagination(BasePagination):
+    """
+    Keyset pagination on (ordering key, id).
+
+    Each page is fetched with a WHERE clause that seeks past the last row of
+    the previous page instead of an OFFSET, so deep pages cost the same as
+    the first. The ordering comes from the `ordering` filter (default `id`)
+    with `id` appended as tie-breaker; NULL keys sort last. Cursors are
+    opaque and tied to the ordering they were issued for.
+
+    `?count=false` skips the COUNT query. Clients that send `?page=<n>` get
+    the previous page-number pagination instead.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    page_query_param = "page"
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.page_number_pagination = None
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> Optional[List]:
+        if self.page_query_param in request.query_params:
+            self.page_number_pagination = PageNumberPagination()
+            if not queryset.ordered:
+                queryset = queryset.order_by("id")
+            return self.page_number_pagination.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.fields = self._get_ordering(queryset)
+        self.count = None
+        if request.query_params.get(self.count_query_param, "true").lower() not in ("0", "false", "no"):
+            self.count = queryset.count()
+
+        values, reverse = self._decode_cursor(request)
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, reverse))
+
+        rows = list(queryset.order_by(*self._order_by(reverse))[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Going forward, there is a next page if more rows came back, and a
+        # previous one if we got here through a cursor; backward it is the other way round
+        self.has_next = has_more if not reverse else True
+        self.has_previous = (values is not None) if not reverse else has_more
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data) -> Response:
+        if self.page_number_pagination is not None:
+            return self.page_number_pagination.get_paginated_response(data)
+
+        body = {"next": self.get_next_link(), "previous": self.get_previous_link()}
+        if self.count is not None:
+            body["count"] = self.count
+        body["results"] = data
+        return Response(body)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self._link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or not self.page:
+            return None
+        return self._link(self.page[0], reverse=True)
+
+    def _get_ordering(self, queryset: QuerySet) -> List[OrderField]:
+        """(field, descending) pairs from the queryset's ordering, ending with id (ascending unless ordered otherwise)."""
+        fields = []
+        for field in queryset.query.order_by or ():
+            if not isinstance(field, str):
+                continue
+            name = field.lstrip("-")
+            if name in ("id", "pk"):
+                # id is unique, so later keys never matter
+                return fields + [("id", field.startswith("-"))]
+            fields.append((name, field.startswith("-")))
+        return fields + [("id", False)]
+
+    def _order_by(self, reverse: bool) -> List:
+        # Backward pages walk the forward order in reverse: flip directions and put NULLs first
+        nulls = {"nulls_first": True} if reverse else {"nulls_last": True}
+        return [
+            F(name).desc(**nulls) if descending != reverse else F(name).asc(**nulls)
+            for name, descending in self.fields
+        ]
+
+    def _seek(self, values: List[Any], reverse: bool) -> Q:
+        """Rows strictly after `values` in the traversal direction."""
+        condition = Q(pk__in=[])
+        equal_so_far = Q()
+        for (name, descending), value in zip(self.fields, values):
+            if value is None:
+                # NULLs sort last: nothing follows going forward, every non-NULL going backward
+                after = Q(**{f"{name}__isnull": False}) if reverse else Q(pk__in=[])
+                equal = Q(**{f"{name}__isnull": True})
+            else:
+                lookup = "lt" if descending != reverse else "gt"
+                after = Q(**{f"{name}__{lookup}": value})
+                if not reverse:
+                    after |= Q(**{f"{name}__isnull": True})
+                equal = Q(**{name: value})
+            condition |= equal_so_far & after
+            equal_so_far &= equal
+        return condition
+
+    @staticmethod
+    def _model_field(model: Model, name: str) -> Field:
+        """The model field an ordering name (possibly spanning relations) refers to."""
+        *relations, last = name.split("__")
+        for part in relations:
+            model = model._meta.get_field(part).related_model
+        return model._meta.get_field(last)
+
+    @staticmethod
+    def _value(instance, name: str) -> Any:
+        value = instance
+        for part in name.split("__"):
+            try:
+                value = getattr(value, part)
+            except ObjectDoesNotExist:
+                return None
+            if value is None:
+                return None
+        return value
+
+    def _link(self, instance, reverse: bool) -> str:
+        payload = {
+            "o": [[name, descending] for name, descending in self.fields],
+            "v": [self._value(instance, name) for name, _ in self.fields],
+            "r": reverse,
+        }
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def _decode_cursor(self, request) -> Tuple[Optional[List[Any]], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            ordering = [(name, bool(descending)) for name, descending in payload["o"]]
+            values, reverse = payload["v"], bool(payload["r"])
+            if ordering != self.fields or not isinstance(values, list) or len(values) != len(self.fields):
+                raise NotFound(self.invalid_cursor_message)
+            # Tampered values must fail here, not later in the seek query
+            values = [
+                None if value is None else self._model_field(self.model, name).to_python(value)
+                for (name, _), value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
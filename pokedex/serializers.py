@@ -1,3 +1,5 @@
+from typing import Iterable, Optional
+
 from rest_framework import serializers
 
 from pokedex.models import Ability, Pokemon, PokemonStats, PokemonType
@@ -14,13 +16,57 @@ class AbilitySerializer(serializers.ModelSerializer):
         model = Ability
         fields = ["name"]
 
-class PokemonListSerializer(serializers.ModelSerializer):
+class PokemonStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PokemonStats
+        fields = [
+            "hp",
+            "attack",
+            "defense",
+            "special_attack",
+            "special_defense",
+            "speed",
+            "total",
+            "hp_pct",
+            "attack_pct",
+            "defense_pct",
+            "special_attack_pct",
+            "special_defense_pct",
+            "speed_pct",
+            "total_pct",
+            "role",
+        ]
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer that can be limited to a subset of its fields.
+
+    `fields` keeps only the named fields (all by default); fields listed in
+    `expandable_fields` are left out unless named in `expand` or in `fields`.
+    """
+
+    expandable_fields = []
+
+    def __init__(self, *args, fields: Optional[Iterable[str]] = None, expand: Iterable[str] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = set(expand) | set(fields or ())
+        keep = None if fields is None else expand
+        for name in list(self.fields):
+            if (name in self.expandable_fields and name not in expand) or (keep is not None and name not in keep):
+                self.fields.pop(name)
+
+
+class PokemonListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     types = TypeSerializer(many=True, read_only=True)
     abilities = AbilitySerializer(many=True, read_only=True)
+    stats = PokemonStatsSerializer(read_only=True)
+
+    expandable_fields = ["stats"]
 
     class Meta:
         model = Pokemon
-        fields = ["id", "name", "image_url", "types", "abilities"]
+        fields = ["id", "name", "image_url", "types", "abilities", "stats"]
 
 
 class PokemonTeamSynergySerializer(serializers.ModelSerializer):
@@ -31,13 +77,7 @@ class PokemonTeamSynergySerializer(serializers.ModelSerializer):
         fields = ["id", "name", "types", "image_url"]
 
 
-class PokemonStatsSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = PokemonStats
-        fields = ["hp", "attack", "defense", "special_attack", "special_defense", "speed", "total"]
-
-
-class PokemonDetailSerializer(serializers.ModelSerializer):
+class PokemonDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     types = TypeSerializer(many=True, read_only=True)
     abilities = AbilitySerializer(many=True, read_only=True)
     stats = PokemonStatsSerializer(read_only=True)
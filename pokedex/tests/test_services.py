@@ -0,0 +1,662 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from itertools import combinations
+from unittest import mock
+
+import numpy as np
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+
+from pokedex.models import Pokemon, PokemonStats, PokemonType
+from pokedex.tests.test_views import PokedexBaseTestCase
+from services.management.commands.populate_pokedex import PokedexPopulator
+from services.models import TeamScoreDistribution
+from services.utils.dataset_version import DatasetVersionService
+from services.utils.defensive_columns import DefensiveColumnsService
+from services.utils.membership_columns import MembershipColumnsService
+from services.utils.single_flight import SingleFlight
+from services.utils.stat_percentiles import StatPercentileService
+from services.utils.stat_similarity import StatSimilarityIndex
+from services.utils.team_fingerprint import TeamDataFingerprint
+from services.utils.team_leaderboard import TeamLeaderboardService
+from services.utils.team_optimizer import TeamOptimizer, get_search_pool
+from services.utils.team_percentile import TeamPercentileService
+from services.utils.team_scoring import TeamScoringKernel
+from services.utils.team_synergy_analyzer import TeamAnalysisService
+from services.utils.type_effectiveness import TypeEffectivenessService
+
+
+class TypeEffectivenessServiceTests(PokedexBaseTestCase):
+    """Test the TypeEffectivenessService"""
+
+    def test_calculate_effectiveness(self):
+        """Test single and dual type effectiveness"""
+        self.assertEqual(TypeEffectivenessService.calculate_effectiveness("water", ["fire"]), 2.0)
+        self.assertEqual(TypeEffectivenessService.calculate_effectiveness("fire", ["water", "fire"]), 0.25)
+        self.assertEqual(TypeEffectivenessService.calculate_effectiveness("electric", ["water", "grass"]), 1.0)
+
+
+    def test_unknown_types_are_neutral(self):
+        """Test unknown attacking or defending types resolve to 1.0"""
+        self.assertEqual(TypeEffectivenessService.calculate_effectiveness("dragon", ["fire"]), 1.0)
+        self.assertEqual(TypeEffectivenessService.calculate_effectiveness("fire", ["dragon"]), 1.0)
+
+
+    def test_calculate_effectiveness_batch(self):
+        """Test batch effectiveness matches the per-call wrapper"""
+        attacking = ["water", "grass", "fire", "electric"]
+        defending = [["fire"], ["water", "grass"], [], ["water"]]
+        result = TypeEffectivenessService.calculate_effectiveness_batch(attacking, defending)
+
+        self.assertEqual(result.tolist(), [2.0, 1.0, 1.0, 2.0])
+
+
+    def test_defensive_multipliers(self):
+        """Test the per-attacking-type profile of defending type sets"""
+        profile = TypeEffectivenessService.defensive_multipliers([["fire"], ["water"]])
+        type_order = TypeEffectivenessService.get_type_order()
+
+        self.assertEqual(profile.shape, (2, len(type_order)))
+        self.assertEqual(profile[0, type_order.index("water")], 2.0)
+        self.assertEqual(profile[1, type_order.index("electric")], 2.0)
+
+
+    def test_defensive_profile_table(self):
+        """Test the precomputed profile table covers every single and dual typing"""
+        type_count = len(TypeEffectivenessService.get_type_order())
+        codes = TypeEffectivenessService.get_defensive_profile_table().codes
+
+        self.assertEqual(codes.dtype.name, "int8")
+        self.assertEqual(codes.shape, (1 + type_count + type_count * (type_count - 1) // 2, type_count))
+
+
+    def test_stale_profile_table_is_not_served(self):
+        """Test a profile table from an older dataset version is rebuilt, even if published late"""
+        old = TypeEffectivenessService.get_defensive_profile_table()
+        self.fire_type.damage_relations = {"double_damage_to": [{"name": "water"}]}
+        self.fire_type.save()
+        new = TypeEffectivenessService.get_defensive_profile_table()
+
+        # A build that started before the change and finishes after it
+        TypeEffectivenessService._profiles = old
+        current = TypeEffectivenessService.get_defensive_profile_table()
+
+        self.assertIsNot(current, old)
+        self.assertEqual(current.dataset_version, TypeEffectivenessService.get_version())
+        self.assertEqual(current.codes.tolist(), new.codes.tolist())
+
+
+    def test_defensive_profiles_match_multiplied_out(self):
+        """Test table lookups agree with multiplying the matrix directly"""
+        type_sets = [["fire"], ["water", "grass"], ["grass", "water"], ["electric", "fire"], []]
+        looked_up = TypeEffectivenessService.get_defensive_profiles(type_sets)
+        computed = TypeEffectivenessService.defensive_multipliers(type_sets)
+
+        self.assertEqual(looked_up.tolist(), computed.tolist())
+
+
+
+class DatasetVersionServiceTests(PokedexBaseTestCase):
+    """Test the DatasetVersionService"""
+
+    def test_saving_type_bumps_version(self):
+        """Test saving a PokemonType stamps a new dataset version"""
+        before = DatasetVersionService.current_version()
+        self.fire_type.save()
+
+        self.assertNotEqual(DatasetVersionService.current_version(), before)
+
+
+    def test_batch_updates_bump_once(self):
+        """Test batched updates defer the bump until the block exits"""
+        before = DatasetVersionService.current_version()
+        with DatasetVersionService.batch_updates():
+            self.fire_type.save()
+            self.assertEqual(DatasetVersionService.current_version(), before)
+
+        self.assertNotEqual(DatasetVersionService.current_version(), before)
+
+
+    def test_batching_is_per_context(self):
+        """Test a batch does not defer work in unrelated threads, like other requests"""
+        seen = []
+        with DatasetVersionService.batch_updates():
+            thread = threading.Thread(target=lambda: seen.append(DatasetVersionService.is_batching()))
+            thread.start()
+            thread.join()
+            self.assertTrue(DatasetVersionService.is_batching())
+
+        self.assertEqual(seen, [False])
+        self.assertFalse(DatasetVersionService.is_batching())
+
+
+    def test_matrix_rebuilds_on_new_version(self):
+        """Test the effectiveness matrix picks up changed type relations"""
+        self.assertEqual(TypeEffectivenessService.calculate_effectiveness("fire", ["water"]), 0.5)
+
+        self.fire_type.damage_relations = {"double_damage_to": [{"name": "water"}]}
+        self.fire_type.save()
+        PokemonType.objects.create(name="dragon", damage_relations={})
+
+        self.assertEqual(TypeEffectivenessService.calculate_effectiveness("fire", ["water"]), 2.0)
+        self.assertIn("dragon", TypeEffectivenessService.get_all_type_names())
+
+
+class PopulatePokedexBatchTests(TransactionTestCase):
+    """Test populate_pokedex defers per-row work while it saves"""
+
+    def test_populator_saves_are_batched(self):
+        """Test rows saved through the populator's sync_to_async workers join the batch"""
+        stats = [{"stat": {"name": "speed"}, "base_stat": 90}]
+        pokemon = {
+            "name": "pikachu",
+            "height": 4,
+            "weight": 60,
+            "sprites": {"front_default": ""},
+            "stats": stats,
+            "types": [{"type": {"name": "electric"}}],
+            "abilities": [{"ability": {"name": "static"}, "is_hidden": False}],
+        }
+        electric = {"name": "electric", "damage_relations": {"double_damage_to": [{"name": "water"}]}}
+
+        async def populate(populator):
+            await populator.save_pokemon(pokemon)
+            await populator.save_type_details(electric)
+
+        populator = PokedexPopulator(StringIO(), StringIO())
+        with (
+            mock.patch.object(DatasetVersionService, "bump", wraps=DatasetVersionService.bump) as bump,
+            mock.patch.object(
+                StatPercentileService, "recompute", wraps=StatPercentileService.recompute
+            ) as recompute,
+        ):
+            with DatasetVersionService.batch_updates():
+                asyncio.run(populate(populator))
+            StatPercentileService.recompute()
+
+        self.assertEqual(bump.call_count, 1)
+        self.assertEqual(recompute.call_count, 1)
+        self.assertTrue(Pokemon.objects.filter(name="pikachu", stats__speed=90).exists())
+
+
+class TeamScoringKernelTests(PokedexBaseTestCase):
+    """Test the bitset team scoring kernel"""
+
+    def test_score_matches_detailed_analysis(self):
+        """Test the fast-path score agrees with the detailed analysis"""
+        teams = [
+            [self.charizard, self.blastoise, self.venusaur],
+            [self.charizard],
+            [self.blastoise],
+            [self.venusaur, self.charizard],
+        ]
+        for team in teams:
+            analysis = TeamAnalysisService.analyze_team_synergy(team)
+            signatures = TeamAnalysisService.get_team_signatures(team)
+
+            self.assertEqual(TeamAnalysisService.score_team(signatures), analysis["score"])
+
+
+    def test_summary_categories_match_detailed_analysis(self):
+        """Test the summary lists the same attacking types per category"""
+        team = [self.charizard, self.blastoise]
+        analysis = TeamAnalysisService.analyze_team_synergy(team)
+        summary = TeamAnalysisService.analyze_team_synergy(team, detailed=False)
+
+        for key in ["major_threats", "balanced_matchups", "safe_matchups"]:
+            self.assertEqual(summary[key], [m["type"] for m in analysis[key]])
+
+
+    def test_stacked_weakness_counts(self):
+        """Test bit-sliced counters handle repeated members"""
+        fire = TypeEffectivenessService.get_type_signature(["fire"])
+        team = TeamScoringKernel.team_masks([fire] * 6)
+        water = TypeEffectivenessService.get_type_order().index("water")
+
+        self.assertEqual(TeamScoringKernel._count_within(team["weak"], 1 << water), 6)
+        self.assertTrue((team["major"] >> water) & 1)
+
+
+    def test_score_code_batch_matches_score(self):
+        """Test the vectorized scorer agrees with the bitset kernel"""
+        signatures = list(TypeEffectivenessService.get_defensive_profile_table().signature_index)
+        teams = list(combinations(signatures, 6))[::7]
+
+        scores = TeamScoringKernel.score_code_batch(
+            np.stack([TypeEffectivenessService.get_defensive_profile_codes(t) for t in teams])
+        )
+        self.assertEqual(scores.tolist(), [TeamScoringKernel.score(t) for t in teams])
+
+
+class TeamPercentileServiceTests(PokedexBaseTestCase):
+    """Test the TeamPercentileService"""
+
+    def setUp(self):
+        super().setUp()
+        for pokemon_type in [self.fire_type, self.water_type, self.grass_type, self.electric_type]:
+            pokemon = Pokemon.objects.create(name=f"{pokemon_type.name}-extra")
+            pokemon.types.add(pokemon_type)
+
+
+    def test_histogram_is_reproducible(self):
+        """Test the sample depends on the seed, not on the number of workers"""
+        serial = TeamPercentileService.sample_histogram(3000, seed=7, chunk_size=1000)
+        parallel = TeamPercentileService.sample_histogram(3000, seed=7, workers=2, chunk_size=1000)
+
+        self.assertEqual(serial.sum(), 3000)
+        self.assertEqual(serial.tolist(), parallel.tolist())
+
+
+    def test_percentile_lookup(self):
+        """Test percentiles come from the stored histogram of the current dataset"""
+        self.assertIsNone(TeamPercentileService.percentile(50))
+
+        TeamPercentileService.build(2000, seed=1)
+        histogram = TeamPercentileService.sample_histogram(2000, seed=1)
+        score = int(np.flatnonzero(histogram)[-1])
+        expected = round(100 * histogram[:score].sum() / 2000, 1)
+        self.assertEqual(TeamPercentileService.percentile(score), expected)
+        self.assertEqual(TeamPercentileService.percentile(0), 0.0)
+        self.assertTrue(TeamPercentileService.is_current(2000, 1))
+
+        # A dataset change makes the stored distribution stale
+        Pokemon.objects.create(name="newcomer").types.add(self.fire_type)
+        self.assertIsNone(TeamPercentileService.percentile(score))
+        self.assertFalse(TeamPercentileService.is_current(2000, 1))
+
+
+    @override_settings(POKEDEX_TEAM_PERCENTILE_CHECK_INTERVAL=0)
+    def test_distribution_built_elsewhere_is_picked_up(self):
+        """Test a miss is not cached past the check interval, and rebuilds are seen"""
+        self.assertIsNone(TeamPercentileService.percentile(50))
+
+        # Rows written by another process, without touching this process's cache
+        TeamScoreDistribution.objects.create(
+            key="random-teams", fingerprint=TeamDataFingerprint.current(), sample_size=2, seed=0, histogram=[0] * 50 + [2] + [0] * 50
+        )
+        self.assertEqual(TeamPercentileService.percentile(51), 100.0)
+
+        TeamScoreDistribution.objects.filter(key="random-teams").update(
+            histogram=[0] * 60 + [2] + [0] * 40, updated_at=timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual(TeamPercentileService.percentile(51), 0.0)
+
+
+class TeamOptimizerTests(PokedexBaseTestCase):
+    """Test the TeamOptimizer"""
+
+    def setUp(self):
+        super().setUp()
+        for pokemon_type in [self.fire_type, self.water_type, self.grass_type, self.electric_type]:
+            for i in range(2):
+                pokemon = Pokemon.objects.create(name=f"{pokemon_type.name}-{i}")
+                pokemon.types.add(pokemon_type)
+        dual = Pokemon.objects.create(name="water-electric")
+        dual.types.add(self.water_type, self.electric_type)
+
+
+    def test_best_team_matches_brute_force(self):
+        """Test the branch-and-bound search finds the best-scoring completion"""
+        candidates = list(Pokemon.objects.prefetch_related("types"))
+        result = TeamOptimizer([], candidates, top_k=1, time_budget_ms=5000).run()
+
+        signatures = TeamAnalysisService.get_team_signatures(candidates)
+        best = max(
+            TeamAnalysisService.score_team(combo) for combo in combinations(signatures, 6)
+        )
+        self.assertTrue(result["complete"])
+        self.assertEqual(result["teams"][0]["score"], best)
+
+
+    def test_parallel_search_matches_serial(self):
+        """Test the process-pool search returns the serial results in the same order"""
+        candidates = list(Pokemon.objects.prefetch_related("types"))
+        serial = TeamOptimizer([], candidates, top_k=5, time_budget_ms=5000, workers=1).run()
+        parallel = TeamOptimizer([], candidates, top_k=5, time_budget_ms=5000, workers=2).run()
+
+        self.assertTrue(parallel["complete"])
+        self.assertEqual(
+            [(t["score"], [p.id for p in t["team"]]) for t in parallel["teams"]],
+            [(t["score"], [p.id for p in t["team"]]) for t in serial["teams"]],
+        )
+
+
+    def test_search_pool_is_reused(self):
+        """Test parallel searches share one long-lived process pool"""
+        candidates = list(Pokemon.objects.prefetch_related("types"))
+        TeamOptimizer([], candidates, top_k=3, time_budget_ms=5000, workers=2).run()
+        pool = get_search_pool(2)
+        result = TeamOptimizer([], candidates, top_k=3, time_budget_ms=5000, workers=2).run()
+
+        self.assertIs(get_search_pool(2), pool)
+        self.assertTrue(result["complete"])
+
+
+class StatPercentileServiceTests(PokedexBaseTestCase):
+    """Test the StatPercentileService"""
+
+    def test_percentile_ranks(self):
+        """Test ties share the same percentile and the maximum is 100"""
+        ranks = StatPercentileService.percentile_ranks(np.array([[10], [20], [20], [40]]))
+        self.assertEqual(ranks[:, 0].tolist(), [25.0, 75.0, 75.0, 100.0])
+
+
+    def test_recompute(self):
+        """Test percentiles and roles are stored on every PokemonStats row"""
+        PokemonStats.objects.update(speed_pct=None, total_pct=None, role="")
+        self.assertEqual(StatPercentileService.recompute(), 3)
+        self.assertEqual(StatPercentileService.recompute(), 0)
+
+        self.charizard.stats.refresh_from_db()
+        self.assertEqual(self.charizard.stats.speed_pct, 100.0)
+        self.assertEqual(self.charizard.stats.total_pct, 100.0)
+        self.assertEqual(self.charizard.stats.role, "Offensive")
+        self.blastoise.stats.refresh_from_db()
+        self.assertEqual(self.blastoise.stats.speed_pct, 33.33)
+        self.assertEqual(self.blastoise.stats.role, "Defensive")
+
+
+    def test_stat_edits_refresh_percentiles(self):
+        """Test saving or deleting stats keeps percentiles and roles current"""
+        stats = self.blastoise.stats
+        stats.speed, stats.attack, stats.special_attack = 150, 150, 150
+        stats.save()
+
+        stats.refresh_from_db()
+        self.assertEqual(stats.speed_pct, 100.0)
+        self.assertEqual(stats.role, "Offensive")
+        self.charizard.stats.refresh_from_db()
+        self.assertEqual(self.charizard.stats.speed_pct, 66.67)
+
+        stats.delete()
+        self.charizard.stats.refresh_from_db()
+        self.assertEqual(self.charizard.stats.speed_pct, 100.0)
+
+
+class StatSimilarityIndexTests(PokedexBaseTestCase):
+    """Test the StatSimilarityIndex"""
+
+    def test_rebuild_publishes_new_snapshot(self):
+        """Test a rebuild replaces the index as a whole and leaves the old one untouched"""
+        before = StatSimilarityIndex._build_index()
+        names = list(before.names)
+        self.assertIs(StatSimilarityIndex._build_index(), before)
+
+        self.charizard.name = "charizard-x"
+        self.charizard.save()
+        after = StatSimilarityIndex._build_index()
+
+        self.assertIsNot(after, before)
+        self.assertEqual(before.names, names)
+        self.assertIn("charizard-x", after.names)
+        self.assertFalse(before.matrix.flags.writeable)
+
+
+class MembershipColumnsServiceTests(PokedexBaseTestCase):
+    """Test the denormalized type and ability columns"""
+
+    def test_recompute_after_batched_edits(self):
+        """Test edits made while batching are picked up by a bulk recompute"""
+        with DatasetVersionService.batch_updates():
+            self.charizard.types.add(self.electric_type)
+        self.charizard.refresh_from_db()
+        self.assertEqual(self.charizard.type_mask, MembershipColumnsService.type_mask([self.fire_type.id]))
+
+        self.assertEqual(MembershipColumnsService.recompute(), 1)
+        self.charizard.refresh_from_db()
+        self.assertEqual(
+            self.charizard.type_mask,
+            MembershipColumnsService.type_mask([self.fire_type.id, self.electric_type.id]),
+        )
+        self.assertEqual(MembershipColumnsService.recompute(), 0)
+
+
+    def test_deleting_type_refreshes_columns(self):
+        """Test cascaded M2M deletes are reflected in the columns"""
+        self.charizard.types.add(self.electric_type)
+        self.electric_type.delete()
+
+        self.charizard.refresh_from_db()
+        self.assertEqual(self.charizard.type_mask, MembershipColumnsService.type_mask([self.fire_type.id]))
+
+
+    def test_unmaskable_type(self):
+        """Test a type ID beyond the mask can still be assigned, and is left out of it"""
+        wide = PokemonType.objects.create(id=64, name="stellar", damage_relations={})
+        self.charizard.types.add(wide)
+
+        self.charizard.refresh_from_db()
+        self.assertEqual(self.charizard.type_mask, MembershipColumnsService.type_mask([self.fire_type.id]))
+
+
+    def test_type_bit_range(self):
+        """Test type IDs outside the 64-bit mask are rejected"""
+        self.assertEqual(MembershipColumnsService.type_mask([1, 3]), 0b101)
+        with self.assertRaises(ValueError):
+            MembershipColumnsService.type_bit(64)
+
+
+class DefensiveColumnsServiceTests(PokedexBaseTestCase):
+    """Test the materialized defensive profile columns"""
+
+    def test_columns_match_type_effectiveness(self):
+        """Test the stored masks agree with TypeEffectivenessService"""
+        with DatasetVersionService.batch_updates():
+            self.blastoise.types.add(self.electric_type)
+        self.assertEqual(DefensiveColumnsService.recompute(), 1)
+        self.assertEqual(DefensiveColumnsService.recompute(), 0)
+
+        types = list(PokemonType.objects.all())
+        for pokemon in Pokemon.objects.prefetch_related("types"):
+            type_names = [t.name for t in pokemon.types.all()]
+            multipliers = {
+                t.id: TypeEffectivenessService.calculate_effectiveness(t.name, type_names) for t in types
+            }
+            for field, taken in (
+                ("immune_mask", lambda m: m == 0),
+                ("resist_mask", lambda m: m < 1),
+                ("weak_mask", lambda m: m > 1),
+            ):
+                expected = MembershipColumnsService.type_mask(i for i, m in multipliers.items() if taken(m))
+                self.assertEqual(getattr(pokemon, field), expected, (pokemon.name, field))
+            self.assertEqual(pokemon.max_multiplier, max(multipliers.values()))
+
+
+class TeamLeaderboardServiceTests(PokedexBaseTestCase):
+    """Test the TeamLeaderboardService"""
+
+    def setUp(self):
+        super().setUp()
+        for pokemon_type in [self.fire_type, self.water_type, self.grass_type, self.electric_type]:
+            for i in range(2):
+                pokemon = Pokemon.objects.create(name=f"{pokemon_type.name}-{i}")
+                pokemon.types.add(pokemon_type)
+        dual = Pokemon.objects.create(name="water-electric")
+        dual.types.add(self.water_type, self.electric_type)
+
+
+    def _brute_force(self, type_name=None):
+        """Scores of every distinct typing multiset among all 6-Pokémon teams."""
+        pokemon = list(Pokemon.objects.prefetch_related("types"))
+        teams = set()
+        for team in combinations(pokemon, 6):
+            if type_name and not any(t.name == type_name for p in team for t in p.types.all()):
+                continue
+            teams.add(tuple(sorted(TeamAnalysisService.get_team_signatures(team))))
+        return sorted((TeamAnalysisService.score_team(team) for team in teams), reverse=True)
+
+
+    def test_leaderboard_matches_brute_force(self):
+        """Test the signature enumeration finds the best scores of all Pokémon teams"""
+        self.assertTrue(TeamLeaderboardService.build(top=5, batch_size=7))
+
+        overall = TeamLeaderboardService.get_leaderboard()
+        self.assertEqual([row["rank"] for row in overall], [1, 2, 3, 4, 5])
+        self.assertEqual([row["score"] for row in overall], self._brute_force()[:5])
+
+        grass = TeamLeaderboardService.get_leaderboard("grass")
+        self.assertEqual([row["score"] for row in grass], self._brute_force("grass")[:5])
+        for row in grass:
+            self.assertEqual(len({p["id"] for p in row["pokemon"]}), 6)
+            self.assertTrue(any("grass" in typing for typing in row["typings"]))
+
+
+    def test_resumed_and_parallel_builds_match(self):
+        """Test an interrupted build resumes to the same leaderboard, with any worker count"""
+        TeamLeaderboardService.build(top=5)
+        expected = TeamLeaderboardService.get_leaderboard("fire")
+
+        self.assertFalse(TeamLeaderboardService.build(top=5, max_partitions=2, restart=True))
+        self.assertTrue(TeamLeaderboardService.build(top=5))
+        self.assertEqual(TeamLeaderboardService.get_leaderboard("fire"), expected)
+
+        self.assertTrue(TeamLeaderboardService.build(top=5, workers=2))
+        self.assertEqual(TeamLeaderboardService.get_leaderboard("fire"), expected)
+
+
+    def test_leaderboard_goes_stale_on_dataset_change(self):
+        """Test no leaderboard is served once types or typings change"""
+        TeamLeaderboardService.build(top=5)
+        Pokemon.objects.create(name="newcomer").types.add(self.fire_type)
+
+        self.assertIsNone(TeamLeaderboardService.get_leaderboard())
+
+
+    def test_leaderboard_survives_score_neutral_edits(self):
+        """Test renames and stat edits keep the leaderboard, with current names"""
+        TeamLeaderboardService.build(top=5)
+        TeamPercentileService.build(500, seed=1)
+        self.charizard.name = "charizard-x"
+        self.charizard.save()
+        PokemonStats.objects.filter(pokemon=self.blastoise).update(attack=1)
+        self.blastoise.stats.save()
+
+        board = TeamLeaderboardService.get_leaderboard()
+        self.assertIsNotNone(board)
+        names = {member["name"] for row in board for member in row["pokemon"]}
+        self.assertIn("charizard-x", names)
+        self.assertNotIn("charizard", names)
+        self.assertIsNotNone(TeamPercentileService.percentile(50))
+
+
+class TeamAnalysisCacheTests(PokedexBaseTestCase):
+    """Test the signature-keyed team analysis cache"""
+
+    def test_same_typings_share_cached_analysis(self):
+        """Test teams with the same typings hit the cache and keep their own names"""
+        flareon = Pokemon.objects.create(name="flareon")
+        flareon.types.add(self.fire_type)
+
+        first = TeamAnalysisService.analyze_team_synergy([self.charizard, self.venusaur])
+        before = TeamAnalysisService.cache_info()
+        second = TeamAnalysisService.analyze_team_synergy([self.venusaur, flareon])
+        after = TeamAnalysisService.cache_info()
+
+        self.assertEqual(after["hits"], before["hits"] + 1)
+        self.assertEqual(after["misses"], before["misses"])
+        self.assertEqual(second["score"], first["score"])
+
+        def names(analysis):
+            return [
+                (matchup["type"], key, sorted(p["name"] for p in matchup[key]))
+                for category in ["major_threats", "balanced_matchups", "safe_matchups"]
+                for matchup in analysis[category]
+                for key in ["vulnerable_pokemon", "resistant_pokemon", "immune_pokemon"]
+                if key in matchup
+            ]
+
+        renamed = [
+            (t, key, sorted("flareon" if n == "charizard" else n for n in members))
+            for t, key, members in names(first)
+        ]
+        self.assertTrue(renamed)
+        self.assertEqual(names(second), renamed)
+
+
+class SingleFlightTests(PokedexBaseTestCase):
+    """Test the SingleFlight request coalescing"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.flight = SingleFlight("test")
+
+
+    def test_concurrent_calls_share_one_computation(self):
+        """Test identical concurrent calls in a process run the computation once"""
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            release.wait(5)
+            return {"score": 42}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.flight.do("team", compute)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        while self.flight.metrics()["calls"] < 5:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"score": 42}] * 5)
+        metrics = self.flight.metrics()
+        self.assertEqual(metrics["executions"], 1)
+        self.assertEqual(metrics["coalesced_local"], 4)
+
+
+    def test_local_cache_skips_cross_process_lock(self):
+        """Test a process-local cache backend bypasses the cache lock"""
+        cache.add(self.flight._cache_key("team", "lock"), True)
+
+        self.assertEqual(self.flight.do("team", lambda: "local"), "local")
+        metrics = self.flight.metrics()
+        self.assertEqual(metrics["executions"], 1)
+        self.assertEqual(metrics["wait_fallbacks"], 0)
+
+
+    @override_settings(POKEDEX_SINGLE_FLIGHT_SHARED=True)
+    def test_waits_for_other_process(self):
+        """Test a call waits for the result published by the lock holder in another process"""
+        cache.add(self.flight._cache_key("team", "lock"), True)
+
+        def other_process():
+            time.sleep(0.05)
+            cache.set(self.flight._cache_key("team", "result"), "shared")
+
+        threading.Thread(target=other_process).start()
+        result = self.flight.do("team", lambda: "local")
+
+        self.assertEqual(result, "shared")
+        self.assertEqual(self.flight.metrics()["coalesced_remote"], 1)
+        self.assertGreater(self.flight.metrics()["wait_seconds_max"], 0)
+
+
+    @override_settings(POKEDEX_SINGLE_FLIGHT_TIMEOUT=0.05, POKEDEX_SINGLE_FLIGHT_SHARED=True)
+    def test_falls_back_when_lock_holder_stalls(self):
+        """Test a call computes itself when the lock holder never publishes"""
+        cache.add(self.flight._cache_key("team", "lock"), True)
+
+        self.assertEqual(self.flight.do("team", lambda: "local"), "local")
+        self.assertEqual(self.flight.metrics()["wait_fallbacks"], 1)
+
+
+    def test_errors_propagate_and_release(self):
+        """Test a failing computation raises for the caller and does not block later calls"""
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.flight.do("team", fail)
+        self.assertEqual(self.flight.do("team", lambda: "ok"), "ok")
@@ -1,11 +1,27 @@
+import base64
+import json
+import re
+from io import StringIO
+from unittest import skipUnless
+from urllib.parse import unquote
+
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
 from pokedex.models import Ability, Pokemon, PokemonStats, PokemonType
+from services.utils.autocomplete import PokemonAutocompleteIndex
+from services.utils.counters import CounterService
 from services.utils.pokemon_comparator import PokemonComparator
+from services.utils.pokemon_index import PokemonNameIndex
+from services.utils.stat_percentiles import StatPercentileService
+from services.utils.team_leaderboard import TeamLeaderboardService
 from services.utils.team_synergy_analyzer import TeamAnalysisService
+from services.utils.type_effectiveness import TypeEffectivenessService
 
 User = get_user_model()
 
@@ -153,6 +169,308 @@ class PokedexViewTests(PokedexBaseTestCase):
         self.assertEqual(response.data["results"][0]["name"], "charizard")
 
 
+    def test_filter_by_stat_percentile_and_role(self):
+        """Test filtering by materialized percentiles and roles"""
+        StatPercentileService.recompute()
+        url = reverse("pokedex")
+
+        response = self.client.get(url + "?min_speed_pct=90")
+        self.assertEqual([p["name"] for p in response.data["results"]], ["charizard"])
+
+        response = self.client.get(url + "?role=Defensive&ordering=-total")
+        self.assertEqual([p["name"] for p in response.data["results"]], ["blastoise", "venusaur"])
+
+
+    def test_ordering_by_stat(self):
+        """Test ordering the list by a stat"""
+        response = self.client.get(reverse("pokedex") + "?ordering=speed")
+
+        self.assertEqual(
+            [p["name"] for p in response.data["results"]], ["blastoise", "venusaur", "charizard"]
+        )
+
+
+class PokedexStatFilterTests(PokedexBaseTestCase):
+    """Test the stat range filters and ordering of the Pokedex list view"""
+
+    def _names(self, query):
+        response = self.client.get(reverse("pokedex") + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [p["name"] for p in response.data["results"]]
+
+
+    def test_stat_range_filters(self):
+        """Test min_/max_ filters on stats and total, combined"""
+        self.assertEqual(self._names("?min_speed=80"), ["charizard", "venusaur"])
+        self.assertEqual(self._names("?max_defense=90"), ["charizard", "venusaur"])
+        self.assertEqual(self._names("?min_total=526&max_total=532"), ["blastoise"])
+        self.assertEqual(self._names("?min_hp=79&max_special_attack=90&min_special_defense=100"), ["blastoise"])
+        self.assertEqual(self._names("?min_attack=200"), [])
+
+
+    def test_types_all_and_types_not(self):
+        """Test AND-semantics type filters and type exclusion"""
+        self.blastoise.types.add(self.electric_type)
+        self.charizard.types.add(self.electric_type)
+
+        query = f"?types_all={self.water_type.id}&types_all={self.electric_type.id}"
+        self.assertEqual(self._names(query), ["blastoise"])
+        # The OR filter still matches either type
+        self.assertEqual(
+            self._names(f"?types={self.water_type.id}&types={self.electric_type.id}"),
+            ["charizard", "blastoise"],
+        )
+        self.assertEqual(self._names(f"?types_not={self.electric_type.id}"), ["venusaur"])
+        self.assertEqual(
+            self._names(f"?types_all={self.electric_type.id}&types_not={self.water_type.id}"),
+            ["charizard"],
+        )
+
+        self.blastoise.types.remove(self.electric_type)
+        self.assertEqual(self._names(query), [])
+
+
+    def test_type_filters_reject_unmaskable_types(self):
+        """Test type IDs without a mask bit are a validation error, not a server error"""
+        PokemonType.objects.create(id=64, name="stellar", damage_relations={})
+
+        for param in ("types_all", "types_not", "weak_to"):
+            response = self.client.get(reverse("pokedex") + f"?{param}=64")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_abilities_all(self):
+        """Test AND-semantics ability filter"""
+        self.charizard.abilities.add(self.torrent)
+        self.assertEqual(
+            self._names(f"?abilities_all={self.blaze.id}&abilities_all={self.torrent.id}"), ["charizard"]
+        )
+        self.assertEqual(self._names(f"?abilities_all={self.torrent.id}"), ["charizard", "blastoise"])
+
+        # Edits from the ability side are kept in sync too
+        self.torrent.pokemon.remove(self.charizard)
+        self.assertEqual(self._names(f"?abilities_all={self.torrent.id}"), ["blastoise"])
+
+
+    def test_ordering_by_stats_and_size(self):
+        """Test ordering on stats, height and weight"""
+        Pokemon.objects.filter(id=self.charizard.id).update(height=17, weight=905)
+        Pokemon.objects.filter(id=self.blastoise.id).update(height=16, weight=855)
+        Pokemon.objects.filter(id=self.venusaur.id).update(height=20, weight=1000)
+
+        self.assertEqual(self._names("?ordering=-special_defense"), ["blastoise", "venusaur", "charizard"])
+        self.assertEqual(self._names("?ordering=height"), ["blastoise", "charizard", "venusaur"])
+        self.assertEqual(self._names("?ordering=-weight"), ["venusaur", "charizard", "blastoise"])
+
+
+    def test_stat_filters_query_count(self):
+        """Test stat filters join PokemonStats once, without per-row queries"""
+        url = reverse("pokedex") + "?min_speed=50&max_total=600&ordering=-attack&count=false"
+        # Page (with stats joined), types and abilities
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["results"]), 3)
+
+
+    @skipUnless(connection.vendor == "sqlite", "the plan format is SQLite's")
+    def test_benchmark_query_plan_uses_indexes(self):
+        """Test the benchmarked combined filter reads no table with a full scan"""
+        out = StringIO()
+        call_command("benchmark_pokedex_filters", "--repeat=1", stdout=out)
+        plan = out.getvalue()
+
+        self.assertEqual(plan.count("JOIN"), 1)
+        self.assertIn("USING INDEX pokedex_pokemonstats_", plan)
+        self.assertIsNone(re.search(r"SCAN pokedex_\w+\s*$", plan, re.MULTILINE))
+
+
+    @skipUnless(connection.vendor == "sqlite", "the plan format is SQLite's")
+    def test_type_mask_filters_use_index(self):
+        """Test the type mask filters fetch rows through the type_mask index"""
+        out = StringIO()
+        query = f"types_all={self.fire_type.id}&types_not={self.water_type.id}"
+        call_command("benchmark_pokedex_filters", "--repeat=1", f"--query={query}", stdout=out)
+        plan = out.getvalue()
+
+        self.assertRegex(plan, r"SEARCH pokedex_pokemon USING INDEX pokedex_pokemon_type_mask_\w+ \(type_mask=\?\)")
+        self.assertIsNone(re.search(r"SCAN pokedex_\w+\s*$", plan, re.MULTILINE))
+
+
+    @skipUnless(connection.vendor == "sqlite", "the plan format is SQLite's")
+    def test_ability_and_weakness_filters_use_indexes(self):
+        """Test abilities_all and the weakness filters read no table with a full scan"""
+        query = f"abilities_all={self.blaze.id}&weak_to={self.water_type.id}&resists={self.fire_type.id}"
+        out = StringIO()
+        call_command("benchmark_pokedex_filters", "--repeat=1", f"--query={query}", stdout=out)
+        plan = out.getvalue()
+
+        self.assertRegex(plan, r"USING INDEX pokedex_pokemon_abilities_ability_id_\w+ \(ability_id=\?\)")
+        self.assertIsNone(re.search(r"SCAN pokedex_\w+\s*$", plan, re.MULTILINE))
+
+
+class PokedexWeaknessFilterTests(PokedexBaseTestCase):
+    """Test the defensive-profile filters of the Pokedex list view"""
+
+    def setUp(self):
+        super().setUp()
+        self.ground_type = PokemonType.objects.create(name="ground", damage_relations={})
+        # Saving a type's relations refreshes every stored profile
+        self.grass_type.damage_relations["double_damage_to"].append({"name": "ground"})
+        self.grass_type.save()
+
+        self.dugtrio = Pokemon.objects.create(name="dugtrio")
+        self.dugtrio.types.add(self.ground_type)
+        self.swampert = Pokemon.objects.create(name="swampert")
+        self.swampert.types.add(self.water_type, self.ground_type)
+
+
+    def _names(self, query):
+        response = self.client.get(reverse("pokedex") + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [p["name"] for p in response.data["results"]]
+
+
+    def test_immune_to_and_resists(self):
+        """Test immunity and resistance filters, combined"""
+        electric, fire = self.electric_type.id, self.fire_type.id
+
+        self.assertEqual(self._names(f"?immune_to={electric}"), ["dugtrio", "swampert"])
+        self.assertEqual(self._names(f"?immune_to={electric}&resists={fire}"), ["swampert"])
+        # Immunities count as resistances
+        self.assertEqual(self._names(f"?resists={electric}"), ["venusaur", "dugtrio", "swampert"])
+
+
+    def test_type_changes_refresh_profiles(self):
+        """Test new attacking types and deleted types are reflected in the profiles"""
+        rock = PokemonType.objects.create(name="rock", damage_relations={"double_damage_to": [{"name": "fire"}]})
+        self.assertEqual(self._names(f"?weak_to={rock.id}"), ["charizard"])
+
+        self.ground_type.delete()
+        self.assertEqual(self._names(f"?immune_to={self.electric_type.id}"), [])
+        self.assertIn("swampert", self._names("?max_weakness=2"))
+
+
+    def test_weak_to_and_max_weakness(self):
+        """Test weakness filters, including excluding 4× weaknesses"""
+        grass = self.grass_type.id
+
+        self.assertEqual(self._names(f"?weak_to={grass}"), ["blastoise", "dugtrio", "swampert"])
+        self.assertEqual(self._names("?max_weakness=2"), ["charizard", "blastoise", "venusaur", "dugtrio"])
+        self.assertEqual(self._names(f"?weak_to={grass}&max_weakness=2"), ["blastoise", "dugtrio"])
+
+        # Changing a Pokémon's types refreshes its profile
+        self.swampert.types.remove(self.ground_type)
+        self.assertIn("swampert", self._names("?max_weakness=2"))
+
+
+class PokedexPaginationTests(PokedexBaseTestCase):
+    """Test the keyset pagination of the Pokedex list view"""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(30):
+            pokemon = Pokemon.objects.create(name=f"mon-{i:02d}")
+            if i % 3:
+                PokemonStats.objects.create(pokemon=pokemon, total=300 + i % 7)
+
+
+    def _walk(self, url):
+        names, pages = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            names.extend(p["name"] for p in response.data["results"])
+            url = response.data["next"]
+        return names, pages
+
+
+    def test_cursor_pages_cover_list_once(self):
+        """Test following next links returns every Pokémon exactly once, in id order"""
+        names, pages = self._walk(reverse("pokedex"))
+
+        expected = list(Pokemon.objects.order_by("id").values_list("name", flat=True))
+        self.assertEqual(names, expected)
+        self.assertEqual(pages[0]["count"], 33)
+        self.assertIsNone(pages[0]["previous"])
+
+
+    def test_cursor_with_ordering_and_nulls(self):
+        """Test keyset pagination on a non-unique, nullable ordering key"""
+        names, _ = self._walk(reverse("pokedex") + "?ordering=-total")
+
+        def key(pokemon):
+            # Pokémon without stats have a NULL total and come last
+            if not hasattr(pokemon, "stats"):
+                return (1, 0, pokemon.id)
+            return (0, -pokemon.stats.total, pokemon.id)
+
+        expected = [p.name for p in sorted(Pokemon.objects.select_related("stats"), key=key)]
+        self.assertEqual(names, expected)
+
+
+    def test_cursor_descending_id(self):
+        """Test ?ordering=-id pages through ids in descending order, forward and back"""
+        names, pages = self._walk(reverse("pokedex") + "?ordering=-id")
+
+        expected = list(Pokemon.objects.order_by("-id").values_list("name", flat=True))
+        self.assertEqual(names, expected)
+        back = self.client.get(pages[1]["previous"]).data
+        self.assertEqual(back["results"], pages[0]["results"])
+
+
+    def test_cursor_previous_link(self):
+        """Test the previous link returns the preceding page"""
+        first = self.client.get(reverse("pokedex") + "?ordering=-total").data
+        second = self.client.get(first["next"]).data
+        back = self.client.get(second["previous"]).data
+
+        self.assertEqual(back["results"], first["results"])
+        self.assertIsNotNone(back["next"])
+
+
+    def test_count_opt_out_and_page_numbers(self):
+        """Test skipping the count, and page-number pagination via ?page="""
+        url = reverse("pokedex")
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url + "?count=false")
+        self.assertNotIn("count", response.data)
+
+        response = self.client.get(url + "?page=2")
+        self.assertEqual(response.data["count"], 33)
+        self.assertEqual(len(response.data["results"]), 13)
+
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is rejected"""
+        response = self.client.get(reverse("pokedex") + "?cursor=garbage")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_cursor_with_wrong_value_types(self):
+        """Test cursors whose values don't fit the ordering fields are rejected, not a server error"""
+        def tampered(query, values):
+            next_link = self.client.get(reverse("pokedex") + query).data["next"]
+            encoded = next_link.split("cursor=")[1].split("&")[0]
+            payload = json.loads(base64.urlsafe_b64decode(unquote(encoded)))
+            payload["v"] = values
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            return self.client.get(reverse("pokedex") + query + ("&" if query else "?") + f"cursor={cursor}")
+
+        for query, values in [
+            ("", ["abc"]),
+            ("", [[1]]),
+            ("", [{"a": 1}]),
+            ("", 1),
+            ("", [1, 2]),
+            ("?ordering=-speed", ["x", 1]),
+        ]:
+            response = tampered(query, values)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, (query, values))
+
+
 class PokemonDetailViewTests(PokedexBaseTestCase):
     """Test the Pokémon detail view"""
 
@@ -172,6 +490,258 @@ class PokemonDetailViewTests(PokedexBaseTestCase):
         self.assertIsNotNone(response.data["stats"])
 
 
+class SparseFieldsetTests(PokedexBaseTestCase):
+    """Test ?fields= and ?expand= on the list and detail views"""
+
+    def test_slim_list_skips_relations(self):
+        """Test requesting plain fields loads only those columns, in one query"""
+        url = reverse("pokedex") + "?fields=id,name&count=false"
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0], {"id": self.charizard.id, "name": "charizard"})
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("image_url", queries[0]["sql"])
+        self.assertNotIn("pokemonstats", queries[0]["sql"])
+
+
+    def test_default_list_fields_unchanged(self):
+        """Test the list keeps its default fields, with stats only when expanded"""
+        response = self.client.get(reverse("pokedex"))
+        self.assertEqual(
+            set(response.data["results"][0]), {"id", "name", "image_url", "types", "abilities"}
+        )
+
+        url = reverse("pokedex") + "?fields=name&expand=stats&ordering=-speed&count=false"
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual([p["name"] for p in response.data["results"]], ["charizard", "venusaur", "blastoise"])
+        self.assertEqual(response.data["results"][0]["stats"]["speed"], 100)
+        self.assertEqual(set(response.data["results"][0]), {"name", "stats"})
+
+
+    def test_expandable_field_in_fields(self):
+        """Test naming an expandable field in ?fields= renders it"""
+        response = self.client.get(reverse("pokedex") + "?fields=id,stats&ordering=-speed")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data["results"][0]), {"id", "stats"})
+        self.assertEqual(response.data["results"][0]["stats"]["speed"], 100)
+
+
+    def test_ordering_on_deferred_stat(self):
+        """Test ordering by a stat that is not rendered still paginates without extra queries"""
+        url = reverse("pokedex") + "?fields=id,name&ordering=-attack&count=false"
+        response = self.client.get(url)
+        self.assertEqual([p["name"] for p in response.data["results"]], ["charizard", "blastoise", "venusaur"])
+
+        Pokemon.objects.bulk_create(Pokemon(name=f"mon-{i:02d}") for i in range(25))
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertIsNotNone(response.data["next"])
+
+
+    def test_detail_fields(self):
+        """Test sparse fieldsets on the detail view"""
+        url = reverse("pokemon-detail", kwargs={"pk": self.charizard.id})
+        with self.assertNumQueries(2):
+            response = self.client.get(url + "?fields=name,types")
+        self.assertEqual(response.data, {"name": "charizard", "types": [{"name": "fire"}]})
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.data["stats"]["total"], 534)
+
+
+    def test_unknown_fields(self):
+        """Test unknown or non-expandable field names are rejected"""
+        response = self.client.get(reverse("pokedex") + "?fields=id,secret")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("secret", response.data["error"])
+
+        url = reverse("pokemon-detail", kwargs={"pk": self.charizard.id})
+        self.assertEqual(self.client.get(url + "?expand=stats").status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PokemonAutocompleteViewTests(PokedexBaseTestCase):
+    """Test the name autocomplete view"""
+
+    def setUp(self):
+        super().setUp()
+        for name in ["charmander", "charmeleon", "Mr. Mime", "Flabébé"]:
+            Pokemon.objects.create(name=name)
+
+
+    def _names(self, query):
+        response = self.client.get(reverse("pokemon-autocomplete") + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [p["name"] for p in response.data["results"]]
+
+
+    def test_prefix(self):
+        """Test prefix matches are alphabetical and limited"""
+        self.assertEqual(self._names("?q=CHAR"), ["charizard", "charmander", "charmeleon"])
+        self.assertEqual(self._names("?q=char&limit=2"), ["charizard", "charmander"])
+        self.assertEqual(self._names("?q=mr mi"), ["Mr. Mime"])
+        self.assertEqual(self._names("?q=flabe"), ["Flabébé"])
+        self.assertEqual(self._names("?q="), [])
+
+
+    def test_substring(self):
+        """Test substring matches through the n-gram index"""
+        self.assertEqual(self._names("?q=mel&mode=substring"), ["charmeleon"])
+        self.assertEqual(self._names("?q=ar&mode=substring"), ["charizard", "charmander", "charmeleon"])
+        self.assertEqual(self._names("?q=toise&mode=substring"), ["blastoise"])
+
+
+    def test_no_database_queries(self):
+        """Test a warm index answers without touching the database"""
+        self._names("?q=char")
+        with self.assertNumQueries(0):
+            self._names("?q=ven")
+
+
+    def test_index_refreshes_on_dataset_change(self):
+        """Test new Pokémon show up once the dataset version changes"""
+        self._names("?q=char")
+        before = PokemonAutocompleteIndex._build_index()
+        keys = list(before.keys)
+        Pokemon.objects.create(name="chansey")
+
+        self.assertEqual(self._names("?q=chan"), ["chansey"])
+        self.assertIsNot(PokemonAutocompleteIndex._build_index(), before)
+        self.assertEqual(before.keys, keys)
+
+
+    def test_invalid_mode(self):
+        """Test an unknown mode is rejected"""
+        response = self.client.get(reverse("pokemon-autocomplete") + "?q=char&mode=fuzzy")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class PokemonSimilarViewTests(PokedexBaseTestCase):
+    """Test the similar Pokémon view"""
+
+    def test_similar_cosine(self):
+        """Test results are ranked by cosine similarity and exclude the Pokémon itself"""
+        url = reverse("pokemon-similar", args=[self.charizard.id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [r["name"] for r in response.data["results"]]
+        self.assertEqual(sorted(names), ["blastoise", "venusaur"])
+        similarities = [r["similarity"] for r in response.data["results"]]
+        self.assertEqual(similarities, sorted(similarities, reverse=True))
+
+
+    def test_similar_euclidean(self):
+        """Test Euclidean distances match the stat vectors"""
+        url = reverse("pokemon-similar", args=[self.charizard.id]) + "?metric=euclidean&k=1"
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+        # venusaur (2, 2, 5, 9, 15, 20) is closer to charizard than blastoise
+        self.assertEqual(response.data["results"][0]["name"], "venusaur")
+        self.assertAlmostEqual(response.data["results"][0]["distance"], 739 ** 0.5, places=3)
+
+
+    def test_similar_filters(self):
+        """Test the shared type and same role filters"""
+        url = reverse("pokemon-similar", args=[self.charizard.id])
+
+        response = self.client.get(url + "?shared_type=true")
+        self.assertEqual(response.data["results"], [])
+
+        response = self.client.get(url + "?same_role=true")
+        for result in response.data["results"]:
+            self.assertEqual(result["role"], response.data["role"])
+
+
+    def test_similar_invalid_requests(self):
+        """Test unknown Pokémon, missing stats and bad parameters"""
+        pikachu = Pokemon.objects.create(name="pikachu")
+
+        self.assertEqual(
+            self.client.get(reverse("pokemon-similar", args=[9999])).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertEqual(
+            self.client.get(reverse("pokemon-similar", args=[pikachu.id])).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+        self.assertEqual(
+            self.client.get(reverse("pokemon-similar", args=[self.charizard.id]) + "?metric=manhattan").status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
+
+
+class PokemonCountersViewTests(PokedexBaseTestCase):
+    """Test the counters view"""
+
+    def test_counters_ranking(self):
+        """Test candidates are ranked by type matchup, speed and bulk"""
+        url = reverse("pokemon-counters", args=[self.charizard.id])
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+        blastoise, venusaur = response.data["results"]
+        self.assertEqual(blastoise["name"], "blastoise")
+        self.assertEqual(blastoise["offensive_multiplier"], 2.0)
+        self.assertEqual(blastoise["defensive_multiplier"], 0.5)
+        self.assertFalse(blastoise["faster"])
+        # log2(2) - log2(0.5) + 0.5 * bulk percentile (highest of three)
+        self.assertEqual(blastoise["score"], 2.5)
+        self.assertEqual(venusaur["name"], "venusaur")
+        self.assertEqual(venusaur["score"], -1.667)
+
+
+    def test_counters_filters(self):
+        """Test the type and role filters"""
+        url = reverse("pokemon-counters", args=[self.charizard.id])
+
+        response = self.client.get(url + "?type=grass")
+        self.assertEqual([r["name"] for r in response.data["results"]], ["venusaur"])
+
+        response = self.client.get(url + "?role=Offensive")
+        self.assertEqual(response.data["results"], [])
+
+        response = self.client.get(url + "?type=shadow")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_counters_cached_per_target(self):
+        """Test rankings are reused for the same target and dataset version"""
+        url = reverse("pokemon-counters", args=[self.charizard.id])
+        self.client.get(url)
+        hits = CounterService.cache_info()["hits"]
+        self.client.get(url + "?type=grass")
+
+        self.assertGreater(CounterService.cache_info()["hits"], hits)
+
+
+    def test_describe_uses_ranked_snapshot(self):
+        """Test a ranking is described from the index it was ranked on, even after a rebuild"""
+        ranking = CounterService.rank(self.charizard.id)
+        self.blastoise.name = "blastoise-mega"
+        self.blastoise.save()
+        CounterService.rank(self.charizard.id)
+
+        described = CounterService.describe(ranking, ranking.rows)
+        self.assertEqual([r["name"] for r in described], ["blastoise", "venusaur"])
+        self.assertEqual(described[0]["score"], 2.5)
+
+
+    def test_counters_unknown_pokemon(self):
+        """Test counters for a missing Pokémon"""
+        response = self.client.get(reverse("pokemon-counters", args=[9999]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class PokemonTeamSynergyViewTests(PokedexBaseTestCase):
     """Test the team synergy analysis view"""
 
@@ -199,6 +769,37 @@ class PokemonTeamSynergyViewTests(PokedexBaseTestCase):
         self.assertIn("safe_matchups", response.data)
         self.assertEqual(len(response.data["team"]), 6)
 
+    def test_team_synergy_fuzzy_names(self):
+        """Test misspelled names resolve with ?fuzzy=1 and are reported as corrections"""
+        url = reverse("pokemon-team-synergy")
+        data = {"pokemons": ["charzard", "blastoise", "venasaur"] * 2}
+
+        self.assertEqual(self.client.post(url, data, format="json").status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(url + "?fuzzy=1", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p["name"] for p in response.data["team"]], ["charizard", "blastoise", "venusaur"] * 2)
+        self.assertEqual(
+            [(c["input"], c["name"]) for c in response.data["corrections"]],
+            [("charzard", "charizard"), ("venasaur", "venusaur")] * 2,
+        )
+        self.assertTrue(all(0.75 <= c["confidence"] < 1 for c in response.data["corrections"]))
+
+
+    def test_team_synergy_fuzzy_unknown_name(self):
+        """Test names without a confident match are rejected with suggestions"""
+        url = reverse("pokemon-team-synergy") + "?fuzzy=1"
+        response = self.client.post(url, {"pokemons": ["charizard"] * 5 + ["blas"]}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("blas", response.data["error"])
+        self.assertEqual([s["name"] for s in response.data["did_you_mean"]], ["blastoise"])
+
+        response = self.client.post(url, {"pokemons": ["charizard"] * 5 + ["zzzzzz"]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn("did_you_mean", response.data)
+
+
     def test_team_synergy_with_names(self):
         """Test team synergy analysis with Pokémon names"""
         url = reverse("pokemon-team-synergy")
@@ -218,6 +819,36 @@ class PokemonTeamSynergyViewTests(PokedexBaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["team"]), 6)
 
+    def test_team_synergy_query_count(self):
+        """Test mixed IDs and names resolve in a single round trip"""
+        TypeEffectivenessService.get_type_order()
+        PokemonNameIndex.lookup_id("charizard")
+        url = reverse("pokemon-team-synergy")
+        data = {"pokemons": ["Charizard", self.blastoise.id, "venusaur"] * 2}
+
+        with self.assertNumQueries(2):
+            response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [p["name"] for p in response.data["team"]],
+            ["charizard", "blastoise", "venusaur"] * 2,
+        )
+
+    def test_team_synergy_percentile(self):
+        """Test the optional percentile against the random-team distribution"""
+        url = reverse("pokemon-team-synergy")
+        data = {"pokemons": [self.charizard.id] * 3 + [self.blastoise.id] * 3}
+
+        response = self.client.post(url, data, format="json")
+        self.assertNotIn("percentile", response.data)
+
+        response = self.client.post(url + "?percentile=true", data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("percentile", response.data)
+        self.assertIsNone(response.data["percentile"])
+
+
     def test_team_synergy_missing_pokemon(self):
         """Test team synergy analysis with missing Pokémon"""
         url = reverse("pokemon-team-synergy")
@@ -249,6 +880,285 @@ class PokemonTeamSynergyViewTests(PokedexBaseTestCase):
         self.assertIn("error", response.data)
 
 
+class PokemonTeamSynergyBatchViewTests(PokedexBaseTestCase):
+    """Test the batch team synergy view"""
+
+    def _read_lines(self, response):
+        return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_batch_analysis(self):
+        """Test a JSON batch streams one result per team, with inline errors"""
+        url = reverse("pokemon-team-synergy-batch")
+        team = ["charizard", "blastoise", "venusaur", self.charizard.id, self.blastoise.id, self.venusaur.id]
+        data = {"teams": [team, [self.charizard.id], team[:5] + ["missingno"]]}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = self._read_lines(response)
+        self.assertEqual([line["index"] for line in lines], [0, 1, 2])
+        self.assertIn("score", lines[0])
+        self.assertEqual(len(lines[0]["team"]), 6)
+        self.assertIn("error", lines[1])
+        self.assertIn("missingno", lines[2]["error"])
+
+    def test_batch_matches_single_analysis(self):
+        """Test batch results match the single-team endpoint"""
+        team = [self.charizard.id, self.blastoise.id, self.venusaur.id] * 2
+        single = self.client.post(reverse("pokemon-team-synergy"), {"pokemons": team}, format="json")
+        batch = self.client.post(reverse("pokemon-team-synergy-batch"), {"teams": [team]}, format="json")
+
+        line = self._read_lines(batch)[0]
+        self.assertEqual(line["score"], single.data["score"])
+        self.assertEqual(line["suggestions"], single.data["suggestions"])
+
+    def test_batch_ndjson_upload(self):
+        """Test an NDJSON upload, resolving all members in one round trip"""
+        TypeEffectivenessService.get_type_order()
+        PokemonNameIndex.lookup_id("charizard")
+        url = reverse("pokemon-team-synergy-batch")
+        body = "\n".join(
+            [
+                json.dumps(["charizard", "blastoise", "venusaur"] * 2),
+                json.dumps({"pokemons": [self.venusaur.id] * 6}),
+                "not json",
+            ]
+        )
+
+        response = self.client.post(url, body, content_type="application/x-ndjson")
+
+        with self.assertNumQueries(2):
+            lines = self._read_lines(response)
+        self.assertEqual(len(lines), 3)
+        self.assertIn("score", lines[0])
+        self.assertIn("score", lines[1])
+        self.assertIn("error", lines[2])
+
+    def test_batch_requires_teams(self):
+        """Test a JSON batch without teams is rejected"""
+        url = reverse("pokemon-team-synergy-batch")
+
+        response = self.client.post(url, {"teams": []}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+
+class PokemonTeamOptimizeViewTests(PokedexBaseTestCase):
+    """Test the team optimizer view"""
+
+    def setUp(self):
+        super().setUp()
+        for name, pokemon_type, total in [
+            ("pikachu", self.electric_type, 320),
+            ("squirtle", self.water_type, 314),
+            ("bulbasaur", self.grass_type, 318),
+            ("charmander", self.fire_type, 309),
+        ]:
+            pokemon = Pokemon.objects.create(name=name)
+            pokemon.types.add(pokemon_type)
+            PokemonStats.objects.create(
+                pokemon=pokemon,
+                hp=50,
+                attack=50,
+                defense=50,
+                special_attack=50,
+                special_defense=50,
+                speed=50,
+                total=total,
+            )
+
+    def test_optimize_partial_team(self):
+        """Test the optimizer completes a partial team"""
+        url = reverse("pokemon-team-optimize")
+        data = {"fixed": ["charizard"], "top_k": 3}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["complete"])
+        self.assertEqual(len(response.data["teams"]), 3)
+        scores = [team["score"] for team in response.data["teams"]]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        for team in response.data["teams"]:
+            names = [p["name"] for p in team["team"]]
+            self.assertEqual(len(names), 6)
+            self.assertEqual(len(set(names)), 6)
+            self.assertEqual(names[0], "charizard")
+
+    def test_optimize_constraints(self):
+        """Test required types and minimum stat totals are honoured"""
+        url = reverse("pokemon-team-optimize")
+        data = {"required_types": ["electric"], "min_total": 310}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["teams"]), 1)
+        names = {p["name"] for p in response.data["teams"][0]["team"]}
+        self.assertIn("pikachu", names)
+        self.assertNotIn("charmander", names)
+
+    def test_optimize_excluded_pokemon(self):
+        """Test excluded Pokémon are never picked"""
+        url = reverse("pokemon-team-optimize")
+        pikachu = Pokemon.objects.get(name="pikachu")
+        data = {"exclude": [pikachu.id], "required_types": ["electric"]}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["teams"], [])
+
+    def test_optimize_too_many_fixed(self):
+        """Test the optimizer rejects more than 5 fixed Pokémon"""
+        url = reverse("pokemon-team-optimize")
+        data = {"fixed": [self.charizard.id] * 6}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+    def test_optimize_unknown_type(self):
+        """Test the optimizer rejects unknown required types"""
+        url = reverse("pokemon-team-optimize")
+        data = {"required_types": ["shadow"]}
+
+        response = self.client.post(url, data, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+
+class PokemonTeamEditViewTests(PokedexBaseTestCase):
+    """Test the incremental team edit view"""
+
+    def _edit(self, data):
+        return self.client.post(reverse("pokemon-team-edit"), data, format="json")
+
+
+    def _assert_matches_full_analysis(self, data, team):
+        expected = TeamAnalysisService.analyze_team_synergy(team, detailed=False)
+        for key in ("score", "major_threats", "balanced_matchups", "safe_matchups"):
+            self.assertEqual(data[key], expected[key])
+
+
+    def test_edit_add_remove_replace(self):
+        """Test each edit keeps the summary in line with a full re-analysis"""
+        response = self._edit({"pokemons": [self.charizard.id]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["members"], [self.charizard.id])
+        self._assert_matches_full_analysis(response.data, [self.charizard])
+
+        response = self._edit(
+            {"state": response.data["state"], "op": "add", "pokemon": "blastoise"}
+        )
+        self.assertEqual(response.data["members"], [self.charizard.id, self.blastoise.id])
+        self._assert_matches_full_analysis(response.data, [self.charizard, self.blastoise])
+
+        response = self._edit(
+            {
+                "state": response.data["state"],
+                "op": "replace",
+                "pokemon": self.venusaur.id,
+                "replaces": "charizard",
+            }
+        )
+        self.assertEqual(response.data["members"], [self.venusaur.id, self.blastoise.id])
+        self._assert_matches_full_analysis(response.data, [self.venusaur, self.blastoise])
+
+        response = self._edit(
+            {"state": response.data["state"], "op": "remove", "pokemon": "venusaur"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["members"], [self.blastoise.id])
+        self._assert_matches_full_analysis(response.data, [self.blastoise])
+
+
+    def test_edit_offensive_coverage(self):
+        """Test offensive coverage reflects the members' types"""
+        response = self._edit({"pokemons": ["charizard"]})
+
+        self.assertEqual(response.data["offensive_coverage"], ["grass"])
+        self.assertNotIn("grass", response.data["offensive_gaps"])
+
+
+    def test_edit_duplicate_member(self):
+        """Test adding a Pokémon that is already in the team"""
+        state = self._edit({"pokemons": ["charizard"]}).data["state"]
+        response = self._edit({"state": state, "op": "add", "pokemon": "charizard"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+
+    def test_edit_invalid_state(self):
+        """Test a tampered state token is rejected"""
+        state = self._edit({"pokemons": ["charizard"]}).data["state"]
+        response = self._edit({"state": state + "x", "op": "add", "pokemon": "blastoise"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+
+    def test_edit_unknown_operation(self):
+        """Test an unknown operation is rejected"""
+        response = self._edit({"pokemons": ["charizard"], "op": "swap"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+
+class PokemonTeamLeaderboardViewTests(PokedexBaseTestCase):
+    """Test the team leaderboard view"""
+
+    def setUp(self):
+        super().setUp()
+        for name, pokemon_type in [
+            ("charmander", self.fire_type),
+            ("squirtle", self.water_type),
+            ("bulbasaur", self.grass_type),
+            ("pikachu", self.electric_type),
+            ("magnemite", self.electric_type),
+        ]:
+            Pokemon.objects.create(name=name).types.add(pokemon_type)
+
+
+    def test_leaderboard_not_built(self):
+        """Test the leaderboard is unavailable until it has been built"""
+        response = self.client.get(reverse("pokemon-team-leaderboard"))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn("error", response.data)
+
+
+    def test_leaderboard_per_type(self):
+        """Test reading the overall and per-type boards"""
+        TeamLeaderboardService.build(top=3)
+        url = reverse("pokemon-team-leaderboard")
+
+        response = self.client.get(url + "?limit=2")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["type"])
+        self.assertEqual(len(response.data["teams"]), 2)
+
+        response = self.client.get(url + "?type=electric")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for team in response.data["teams"]:
+            self.assertIn(["electric"], team["typings"])
+            self.assertEqual(len(team["pokemon"]), 6)
+
+
+    def test_leaderboard_unknown_type(self):
+        """Test the leaderboard rejects unknown types"""
+        response = self.client.get(reverse("pokemon-team-leaderboard") + "?type=shadow")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+
 class PokemonComparisonViewTests(PokedexBaseTestCase):
     """Test the Pokémon comparison view"""
 
@@ -264,6 +1174,121 @@ class PokemonComparisonViewTests(PokedexBaseTestCase):
         self.assertIn("overall_winner", response.data)
 
 
+    def test_coalescing_metrics(self):
+        """Test coalescing metrics are exposed per endpoint"""
+        self.client.get(reverse("compare") + "?p1=charizard&p2=blastoise")
+        response = self.client.get(reverse("coalescing-metrics"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("team-synergy", response.data)
+        self.assertGreaterEqual(response.data["compare"]["executions"], 1)
+        self.assertIn("wait_seconds_avg", response.data["compare"])
+
+
+    def test_compare_many(self):
+        """Test comparing several Pokémon in one request"""
+        url = reverse("compare") + f"?ids=charizard,{self.blastoise.id},venusaur"
+        PokemonNameIndex.lookup_id("charizard")
+        # All stats are loaded in a single query
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["names"], ["charizard", "blastoise", "venusaur"])
+        self.assertEqual(len(response.data["matrix"]), 3)
+        self.assertEqual(len(response.data["matrix"][0]), 6)
+        self.assertEqual(len(response.data["ranks"]), 3)
+        self.assertEqual(len(response.data["roles"]), 3)
+
+        # Pairwise results agree with the two-Pokémon comparator
+        pair = PokemonComparator(self.charizard, self.blastoise)
+        self.assertEqual(response.data["roles"][0], pair.classify_role(self.charizard.stats))
+        self.assertEqual(response.data["totals"][:2], [self.charizard.stats.total, self.blastoise.stats.total])
+
+
+    def test_compare_fuzzy_names(self):
+        """Test ?fuzzy=1 corrects misspelled names in both comparison modes"""
+        url = reverse("compare")
+
+        response = self.client.get(url + "?p1=charizrd&p2=blastoise&fuzzy=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["corrections"][0]["name"], "charizard")
+        self.assertEqual(self.client.get(url + "?p1=charizrd&p2=blastoise").status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(url + "?ids=charizrd,blastoise,venusuar&fuzzy=1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["names"], ["charizard", "blastoise", "venusaur"])
+        self.assertEqual(
+            [(c["input"], c["name"]) for c in response.data["corrections"]],
+            [("charizrd", "charizard"), ("venusuar", "venusaur")],
+        )
+
+        # A misspelling of a listed Pokémon does not make a second member
+        response = self.client.get(url + "?ids=charizard,charizrd&fuzzy=1")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(url + "?p1=char&p2=blastoise&fuzzy=1")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data["did_you_mean"][0]["name"], "charizard")
+
+
+    def test_compare_many_limits(self):
+        """Test the N-way comparison validates its inputs"""
+        url = reverse("compare")
+
+        self.assertEqual(self.client.get(url + "?ids=charizard").status_code, status.HTTP_400_BAD_REQUEST)
+        too_many = ",".join(str(i) for i in range(1, 30))
+        self.assertEqual(self.client.get(url + f"?ids={too_many}").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            self.client.get(url + "?ids=charizard,missingno").status_code, status.HTTP_404_NOT_FOUND
+        )
+
+
+    def test_compare_many_aliases_and_unknown_ids(self):
+        """Test an ID and a name for the same Pokémon count once, and unknown IDs are 404"""
+        url = reverse("compare")
+
+        response = self.client.get(url + f"?ids={self.charizard.id},charizard")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(url + "?ids=charizard,9999")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertIn("9999", response.data["error"])
+        self.assertEqual(
+            self.client.get(reverse("compare-matrix") + "?ids=charizard,9999").status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+        # A Pokémon that exists without stats is still a bad request
+        Pokemon.objects.create(name="missingno")
+        self.assertEqual(
+            self.client.get(url + "?ids=charizard,missingno").status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+
+    def test_head_to_head_matrix(self):
+        """Test the all-pairs stat outcomes and type multipliers"""
+        url = reverse("compare-matrix") + "?ids=charizard,blastoise,venusaur"
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["names"], ["charizard", "blastoise", "venusaur"])
+        self.assertEqual(response.data["outcomes"]["speed"], [[0, 1, 1], [-1, 0, -1], [-1, 1, 0]])
+        self.assertEqual(response.data["outcomes"]["total"][0], [0, 1, 1])
+        self.assertEqual(
+            response.data["type_multipliers"],
+            [[0.5, 0.5, 2.0], [2.0, 0.5, 0.5], [0.5, 2.0, 0.5]],
+        )
+
+
+    def test_head_to_head_requires_roster(self):
+        """Test the head-to-head matrix needs at least two Pokémon"""
+        response = self.client.get(reverse("compare-matrix") + "?ids=charizard")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("error", response.data)
+
+
     def test_pokemon_comparison_missing_params(self):
         """Test comparison with missing parameters"""
         url = reverse("compare") + "?p1=charizard"
@@ -316,6 +1341,17 @@ class TeamAnalysisServiceTests(PokedexBaseTestCase):
         self.assertIsInstance(analysis["suggestions"], list)
 
 
+    def test_prefetched_team_counts_repeats_once(self):
+        """Test repeated members count once whether or not the team is prefetched"""
+        team = list(Pokemon.objects.filter(id=self.charizard.id).prefetch_related("types")) * 6
+
+        for detailed in (True, False):
+            self.assertEqual(
+                TeamAnalysisService.analyze_team_synergy(team, detailed=detailed, prefetched=True),
+                TeamAnalysisService.analyze_team_synergy(team, detailed=detailed),
+            )
+
+
     def test_analyze_empty_team(self):
         """Test team synergy analysis with empty team"""
         analysis = TeamAnalysisService.analyze_team_synergy([])
@@ -3,15 +3,33 @@ from django.contrib import admin
 from django.urls import path
 
 from pokedex.views.pokedex import (
+    CoalescingMetricsView,
     PokedexView,
+    PokemonAutocompleteView,
     PokemonComparisonView,
+    PokemonCountersView,
     PokemonDetailView,
+    PokemonHeadToHeadView,
+    PokemonSimilarView,
+    PokemonTeamEditView,
+    PokemonTeamLeaderboardView,
+    PokemonTeamOptimizeView,
+    PokemonTeamSynergyBatchView,
     PokemonTeamSynergyView,
 )
 
 urlpatterns = [
     path("", PokedexView.as_view(), name="pokedex"),
     path("<int:pk>/", PokemonDetailView.as_view(), name="pokemon-detail"),
+    path("autocomplete/", PokemonAutocompleteView.as_view(), name="pokemon-autocomplete"),
+    path("<int:pk>/counters/", PokemonCountersView.as_view(), name="pokemon-counters"),
+    path("<int:pk>/similar/", PokemonSimilarView.as_view(), name="pokemon-similar"),
     path("team-synergy/", PokemonTeamSynergyView.as_view(), name="pokemon-team-synergy"),
+    path("team-synergy/batch/", PokemonTeamSynergyBatchView.as_view(), name="pokemon-team-synergy-batch"),
+    path("team-synergy/edit/", PokemonTeamEditView.as_view(), name="pokemon-team-edit"),
+    path("team-synergy/leaderboard/", PokemonTeamLeaderboardView.as_view(), name="pokemon-team-leaderboard"),
+    path("team-synergy/optimize/", PokemonTeamOptimizeView.as_view(), name="pokemon-team-optimize"),
     path("compare/", PokemonComparisonView.as_view(), name="compare"),
+    path("compare/matrix/", PokemonHeadToHeadView.as_view(), name="compare-matrix"),
+    path("metrics/coalescing/", CoalescingMetricsView.as_view(), name="coalescing-metrics"),
 ]
@@ -1,51 +1,272 @@
-from typing import Dict, List, Union
+import json
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 from rest_framework.views import APIView
 
 from pokedex.filters import PokedexFilter
+from pokedex.pagination import PokedexCursorPagination
 from pokedex.models import Pokemon, PokemonStats
 from pokedex.serializers import (
     PokemonDetailSerializer,
     PokemonListSerializer,
     PokemonTeamSynergySerializer,
 )
-from services.utils.pokemon_comparator import PokemonComparator
+from services.utils.autocomplete import PokemonAutocompleteIndex
+from services.utils.counters import CounterService
+from services.utils.dataset_version import DatasetVersionService
+from services.utils.pokemon_comparator import PokemonComparator, PokemonGroupComparator
+from services.utils.pokemon_index import PokemonNameIndex
+from services.utils.single_flight import SingleFlight
+from services.utils.stat_similarity import StatSimilarityIndex
+from services.utils.team_leaderboard import TeamLeaderboardService
+from services.utils.team_optimizer import TeamOptimizer
+from services.utils.team_percentile import TeamPercentileService
+from services.utils.team_state import TeamState, TeamStateError
 from services.utils.team_synergy_analyzer import TeamAnalysisService
+from services.utils.type_effectiveness import TypeEffectivenessService
 
 
-class PokedexView(generics.ListAPIView):
-    queryset = Pokemon.objects.all().prefetch_related("types", "abilities")
+def query_flag(request, name: str) -> bool:
+    """Read a boolean query parameter (`1`, `true` or `yes`)."""
+    return request.query_params.get(name, "").lower() in ("1", "true", "yes")
+
+
+def parse_int(value, name: str, minimum: int, maximum: Optional[int] = None) -> int:
+    """Parse a bounded integer option, raising ValueError with a client-facing message."""
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"'{name}' must be an integer")
+    if parsed < minimum or (maximum is not None and parsed > maximum):
+        bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise ValueError(f"'{name}' must be {bounds}")
+    return parsed
+
+
+def not_found_body(error: Pokemon.DoesNotExist) -> Dict:
+    """Error body for an unresolved Pokémon, with "did you mean" suggestions when there are any."""
+    body = {"error": str(error)}
+    suggestions = getattr(error, "suggestions", None)
+    if suggestions:
+        body["did_you_mean"] = [
+            {"id": s["id"], "name": s["name"], "confidence": s["confidence"]} for s in suggestions
+        ]
+    return body
+
+
+class SparseFieldsetViewMixin:
+    """
+    Lets clients choose response fields with `?fields=a,b` and add optional
+    ones with `?expand=c`, and loads only what those fields need: deferred
+    columns, no prefetch for unrequested relations and no stats join unless
+    stats are rendered or ordered by.
+    """
+
+    fieldset = (None, ())
+
+    def get(self, request, *args, **kwargs):
+        try:
+            self.fieldset = self._parse_fieldset(request)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return super().get(request, *args, **kwargs)
+
+    def _parse_fieldset(self, request) -> Tuple[Optional[List[str]], List[str]]:
+        serializer_class = self.get_serializer_class()
+
+        def split(param: str) -> List[str]:
+            return [name.strip() for name in request.query_params.get(param, "").split(",") if name.strip()]
+
+        fields, expand = split("fields") or None, split("expand")
+        unknown = [name for name in fields or () if name not in serializer_class.Meta.fields]
+        unknown += [name for name in expand if name not in serializer_class.expandable_fields]
+        if unknown:
+            raise ValueError(f"Unknown or non-expandable fields: {', '.join(unknown)}")
+        return fields, expand
+
+    def get_serializer(self, *args, **kwargs):
+        fields, expand = self.fieldset
+        kwargs.setdefault("fields", fields)
+        kwargs.setdefault("expand", expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+
+        rendered = set(self.get_serializer().fields)
+        ordering = [name.lstrip("-") for name in queryset.query.order_by if isinstance(name, str)]
+        columns = {field.name for field in Pokemon._meta.concrete_fields}
+        relations = {field.name for field in Pokemon._meta.many_to_many}
+
+        only = {"id"} | (rendered & columns) | (set(ordering) & columns)
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if "stats" in rendered or any(name.startswith("stats__") for name in ordering):
+            queryset = queryset.select_related("stats")
+            only |= {f"stats__{field.name}" for field in PokemonStats._meta.concrete_fields}
+        return queryset.only(*only).prefetch_related(*sorted(rendered & relations))
+
+
+class PokedexView(SparseFieldsetViewMixin, generics.ListAPIView):
+    queryset = Pokemon.objects.select_related("stats").prefetch_related("types", "abilities")
     serializer_class = PokemonListSerializer
     filterset_class = PokedexFilter
+    pagination_class = PokedexCursorPagination
 
 
-class PokemonDetailView(generics.RetrieveAPIView):
+class PokemonDetailView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
     queryset = Pokemon.objects.all()
     serializer_class = PokemonDetailSerializer
 
 
-class PokemonTeamSynergyView(APIView):
-    """API endpoint for analyzing Pokémon team synergy."""
+class PokemonAutocompleteView(APIView):
+    """API endpoint for name autocomplete, served from an in-memory index."""
+
+    MAX_LIMIT = 50
+    MODES = ("prefix", "substring")
+
+    def get(self, request):
+        mode = request.query_params.get("mode", "prefix")
+        if mode not in self.MODES:
+            return Response(
+                {"error": f"'mode' must be one of: {', '.join(self.MODES)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = parse_int(request.query_params.get("limit", 10), "limit", 1, self.MAX_LIMIT)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = request.query_params.get("q", "")
+        if mode == "substring":
+            results = PokemonAutocompleteIndex.substring(query, limit)
+        else:
+            results = PokemonAutocompleteIndex.prefix(query, limit)
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+
+class PokemonSimilarView(APIView):
+    """API endpoint for Pokémon with the most similar base stats."""
+
+    MAX_K = 50
+
+    def get(self, request, pk):
+        params = request.query_params
+        metric = params.get("metric", "cosine")
+        if metric not in StatSimilarityIndex.METRICS:
+            return Response(
+                {"error": f"'metric' must be one of: {', '.join(StatSimilarityIndex.METRICS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            k = parse_int(params.get("k", 10), "k", 1, self.MAX_K)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        result = StatSimilarityIndex.similar(
+            pk,
+            k=k,
+            metric=metric,
+            same_role=query_flag(request, "same_role"),
+            shared_type=query_flag(request, "shared_type"),
+        )
+        if result is None:
+            get_object_or_404(Pokemon, pk=pk)
+            return Response(
+                {"error": "This Pokémon has no stats saved."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response({"id": pk, "metric": metric, **result}, status=status.HTTP_200_OK)
+
+
+class PokemonCountersView(generics.GenericAPIView):
+    """
+    API endpoint ranking every Pokémon by how well it handles a target.
+
+    Paginated like the Pokédex list; `?type=<name>` and `?role=<role>`
+    narrow the candidates.
+    """
+
+    def get(self, request, pk):
+        type_name = request.query_params.get("type")
+        if type_name and type_name not in TypeEffectivenessService.get_all_type_names():
+            return Response(
+                {"error": f"Unknown type: {type_name}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        ranking = CounterService.rank(pk, type_name=type_name, role=request.query_params.get("role"))
+        if ranking is None:
+            return Response({"error": "Pokémon not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        page = self.paginate_queryset(ranking.rows)
+        if page is not None:
+            return self.get_paginated_response(CounterService.describe(ranking, page))
+        return Response(CounterService.describe(ranking, ranking.rows))
+
+
+class TeamResolverMixin:
+    """Resolves team members given as IDs or names."""
 
     def _get_pokemon_objects(self, pokemons: List[Union[int, str]]) -> List[Pokemon]:
-        """Get Pokémon objects from a list of IDs or names."""
-        team_pokemon = []
+        """Get Pokémon objects, with their types prefetched, from a list of IDs or names."""
+        return PokemonNameIndex.resolve(pokemons)
 
-        for p in pokemons:
-            try:
-                if isinstance(p, int) or (isinstance(p, str) and p.isdigit()):
-                    pokemon = Pokemon.objects.get(id=int(p))
-                else:
-                    pokemon = Pokemon.objects.get(name__iexact=p)
-                team_pokemon.append(pokemon)
-            except Pokemon.DoesNotExist:
-                raise Pokemon.DoesNotExist(f"Pokémon '{p}' not found")
 
-        return team_pokemon
+class RosterResolverMixin:
+    """Resolves a comma-separated list of Pokémon IDs or names without touching the database."""
+
+    def _get_roster_ids(self, ids: str, maximum: int, fuzzy: bool = False) -> Tuple[List[int], List[Dict]]:
+        """
+        Map `ids` to distinct Pokémon IDs, in order.
+
+        With `fuzzy`, misspelled names resolve to their closest confident match.
+
+        Returns:
+            (IDs, corrections) where corrections lists the fuzzy matches applied
+            ({"input", "name", "confidence"}; always empty without `fuzzy`)
+
+        Raises:
+            ValueError: if there are fewer than 2 or more than `maximum` distinct Pokémon
+            Pokemon.DoesNotExist: if a name does not match any Pokémon
+        """
+        identifiers = list(dict.fromkeys(i.strip() for i in ids.split(",") if i.strip()))
+        if len(identifiers) > maximum:
+            raise ValueError(f"Provide between 2 and {maximum} distinct Pokémon in ?ids=")
+
+        corrections = []
+        if fuzzy:
+            pokemon_ids = []
+            for identifier in identifiers:
+                pokemon_id, match = PokemonNameIndex.fuzzy_lookup(identifier)
+                pokemon_ids.append(pokemon_id)
+                if match is not None:
+                    corrections.append(
+                        {"input": identifier, "name": match["name"], "confidence": match["confidence"]}
+                    )
+        else:
+            pokemon_ids = [PokemonNameIndex.lookup_id(identifier) for identifier in identifiers]
+            missing = [i for i, pokemon_id in zip(identifiers, pokemon_ids) if pokemon_id is None]
+            if missing:
+                raise Pokemon.DoesNotExist(f"Pokémon not found: {', '.join(missing)}")
+
+        # Names and IDs may refer to the same Pokémon, so count them once resolved
+        pokemon_ids = list(dict.fromkeys(pokemon_ids))
+        if not 2 <= len(pokemon_ids) <= maximum:
+            raise ValueError(f"Provide between 2 and {maximum} distinct Pokémon in ?ids=")
+        return pokemon_ids, corrections
+
+
+class PokemonTeamSynergyView(TeamResolverMixin, APIView):
+    """API endpoint for analyzing Pokémon team synergy."""
+
+    flight = SingleFlight("team-synergy")
 
     def post(self, request):
         """
@@ -55,6 +276,11 @@ class PokemonTeamSynergyView(APIView):
         {
             "pokemons": [1, 2, 3, 4, 5, 6]  # List of Pokémon IDs or names
         }
+
+        Pass `?percentile=true` to also get the share of random teams the
+        score beats (null until `build_team_percentiles` has been run for
+        the current types and typings), and
+        `?fuzzy=1` to accept misspelled names (listed under `corrections`).
         """
         pokemons = request.data.get("pokemons", [])
 
@@ -70,19 +296,39 @@ class PokemonTeamSynergyView(APIView):
             )
 
         # Get Pokémon objects
+        fuzzy = query_flag(request, "fuzzy")
         try:
-            team_pokemon = self._get_pokemon_objects(pokemons)
+            if fuzzy:
+                team_pokemon, corrections = PokemonNameIndex.resolve_fuzzy(pokemons)
+            else:
+                team_pokemon = self._get_pokemon_objects(pokemons)
         except Pokemon.DoesNotExist as e:
             return Response(
-                {"error": str(e)},
+                not_found_body(e),
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Analyze team synergy
-        analysis = TeamAnalysisService.analyze_team_synergy(team_pokemon)
+        # Analyze team synergy on the distinct, already prefetched members;
+        # identical concurrent requests share one analysis
+        members = list(dict.fromkeys(team_pokemon))
+        analysis = self.flight.do(
+            (DatasetVersionService.current_version(), tuple(p.id for p in members)),
+            lambda: TeamAnalysisService.analyze_team_synergy(members, prefetched=True),
+        )
 
         # Prepare response data
-        response_data = {
+        response_data = self.serialize_analysis(team_pokemon, analysis)
+        if query_flag(request, "percentile"):
+            response_data["percentile"] = TeamPercentileService.percentile(analysis["score"])
+        if fuzzy:
+            response_data["corrections"] = corrections
+
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def serialize_analysis(team_pokemon: List[Pokemon], analysis: Dict) -> Dict:
+        """Build the response body for an analyzed team."""
+        return {
             "score": analysis["score"],
             "team": PokemonTeamSynergySerializer(team_pokemon, many=True).data,
             "suggestions": analysis["suggestions"],
@@ -91,16 +337,341 @@ class PokemonTeamSynergyView(APIView):
             "safe_matchups": analysis["safe_matchups"],
         }
 
+
+class PokemonTeamSynergyBatchView(APIView):
+    """
+    API endpoint for analyzing many teams in one request.
+
+    Results are streamed back as NDJSON, one line per team in input order, as
+    soon as each is computed. Invalid teams produce an inline error line
+    instead of failing the batch.
+    """
+
+    NDJSON_CONTENT_TYPE = "application/x-ndjson"
+    CHUNK_SIZE = 500
+
+    def _iter_ndjson(self, request) -> Iterator[Tuple[int, Optional[list], Optional[str]]]:
+        """Lazily parse an NDJSON body; each line is a team list or {"pokemons": [...]}."""
+        stream = request.stream
+        if stream is None:
+            return
+        index = 0
+        for line in iter(stream.readline, b""):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                yield index, None, "Invalid JSON line"
+            else:
+                if isinstance(entry, dict):
+                    entry = entry.get("pokemons")
+                yield index, entry, None
+            index += 1
+
+    def _resolve(self, resolved: Dict, teams: Iterable[list]) -> None:
+        """Add every not-yet-resolved team member to `resolved` (keyed by ID) with a single query."""
+        ids = {
+            PokemonNameIndex.lookup_id(identifier)
+            for team in teams
+            for identifier in team
+            if isinstance(identifier, (int, str))
+        } - resolved.keys() - {None}
+        if ids:
+            resolved.update(Pokemon.objects.prefetch_related("types").in_bulk(ids))
+
+    def _analyze_entry(self, resolved: Dict, team: Optional[list]) -> Dict:
+        """Analyze one team, returning an inline error for invalid input."""
+        if not isinstance(team, list) or not team:
+            return {"error": "No Pokémon provided"}
+        if len(team) != 6:
+            return {"error": "Exactly 6 Pokémon are required"}
+
+        team_pokemon = []
+        for identifier in team:
+            pokemon = None
+            if isinstance(identifier, (int, str)):
+                pokemon = resolved.get(PokemonNameIndex.lookup_id(identifier))
+            if pokemon is None:
+                return {"error": f"Pokémon '{identifier}' not found"}
+            team_pokemon.append(pokemon)
+
+        # Analyze distinct members, as the single-team endpoint does
+        analysis = TeamAnalysisService.analyze_team_synergy(
+            list(dict.fromkeys(team_pokemon)), prefetched=True
+        )
+        return PokemonTeamSynergyView.serialize_analysis(team_pokemon, analysis)
+
+    def _stream(self, entries: Iterator[Tuple[int, Optional[list], Optional[str]]]) -> Iterator[str]:
+        """
+        Yield one NDJSON line per team.
+
+        Input is consumed in chunks of CHUNK_SIZE teams; members are resolved
+        once per chunk and remembered, so memory stays bounded by the chunk
+        and the size of the Pokédex rather than the size of the batch.
+        """
+        resolved: Dict = {}
+        encoder = JSONEncoder(ensure_ascii=False)
+        while True:
+            chunk = list(islice(entries, self.CHUNK_SIZE))
+            if not chunk:
+                return
+            self._resolve(resolved, [team for _, team, error in chunk if isinstance(team, list)])
+            for index, team, error in chunk:
+                result = {"error": error} if error else self._analyze_entry(resolved, team)
+                yield encoder.encode({"index": index, **result}) + "\n"
+
+    def post(self, request):
+        """
+        Analyze a batch of teams.
+
+        Request body is either JSON:
+        {
+            "teams": [[1, 2, 3, 4, 5, 6], ["pikachu", ...]]
+        }
+        or, with Content-Type application/x-ndjson, one team per line.
+        """
+        if request.content_type.startswith(self.NDJSON_CONTENT_TYPE):
+            entries = self._iter_ndjson(request)
+        else:
+            teams = request.data.get("teams")
+            if not isinstance(teams, list) or not teams:
+                return Response(
+                    {"error": "Provide a non-empty list of teams"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            entries = ((index, team, None) for index, team in enumerate(teams))
+
+        return StreamingHttpResponse(
+            self._stream(entries), content_type=self.NDJSON_CONTENT_TYPE
+        )
+
+
+class PokemonTeamEditView(TeamResolverMixin, APIView):
+    """
+    API endpoint for editing a team one member at a time.
+
+    The previous analysis travels as an opaque signed `state` token; each
+    request applies a single add/remove/replace edit to its counters instead
+    of re-analyzing the whole team. Teams may have 1-6 members.
+    """
+
+    OPERATIONS = ("add", "remove", "replace")
+
+    def post(self, request):
+        """
+        Apply one edit to a team.
+
+        Request body:
+        {
+            "state": "<token>",       # from a previous response; omit to start a team
+            "pokemons": [1, "abra"],  # optional initial members when starting a team
+            "op": "replace",          # "add", "remove" or "replace"
+            "pokemon": "kadabra",     # Pokémon to add, remove or swap in
+            "replaces": "abra"        # member being swapped out (replace only)
+        }
+        """
+        token = request.data.get("state")
+        op = request.data.get("op")
+        initial = request.data.get("pokemons", [])
+
+        if op is not None and op not in self.OPERATIONS:
+            return Response(
+                {"error": f"'op' must be one of: {', '.join(self.OPERATIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if op is None and token is None and not initial:
+            return Response(
+                {"error": "Provide a state and an edit, or initial Pokémon"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            if token is not None:
+                state = TeamState.from_token(token)
+            else:
+                if not isinstance(initial, list):
+                    raise TeamStateError("'pokemons' must be a list")
+                state = TeamState.from_pokemon(self._get_pokemon_objects(initial))
+
+            if op == "remove":
+                state.remove(self._get_member_id(request.data.get("pokemon")))
+            elif op in ("add", "replace"):
+                (pokemon,) = self._get_pokemon_objects([request.data.get("pokemon")])
+                if op == "add":
+                    state.add(pokemon)
+                else:
+                    state.replace(self._get_member_id(request.data.get("replaces")), pokemon)
+        except (Pokemon.DoesNotExist, TeamStateError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        response_data = {
+            "state": state.to_token(),
+            "members": state.member_ids(),
+            **state.summary(),
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _get_member_id(identifier) -> int:
+        """Map a member given by ID or name to its ID without touching its row."""
+        pokemon_id = PokemonNameIndex.lookup_id(identifier) if identifier is not None else None
+        if pokemon_id is None:
+            raise Pokemon.DoesNotExist(f"Pokémon '{identifier}' not found")
+        return pokemon_id
+
+
+class PokemonTeamOptimizeView(TeamResolverMixin, APIView):
+    """API endpoint for finding the best completions of a partial team."""
+
+    MAX_FIXED = 5
+    MAX_TOP_K = 20
+    MAX_TIME_BUDGET_MS = 10000
+
+    def post(self, request):
+        """
+        Find the top-k full teams that complete the given fixed members.
+
+        Request body:
+        {
+            "fixed": ["pikachu", 7],        # 0-5 Pokémon IDs or names
+            "top_k": 5,                     # optional, 1-20
+            "exclude": [25, 26],            # optional Pokémon IDs to leave out
+            "required_types": ["water"],    # optional types the team must include
+            "min_total": 400,               # optional minimum stat total per added Pokémon
+            "time_budget_ms": 2000          # optional search budget, 1-10000
+        }
+        """
+        fixed = request.data.get("fixed", [])
+        exclude = request.data.get("exclude", [])
+        required_types = request.data.get("required_types", [])
+
+        if not isinstance(fixed, list) or len(fixed) > self.MAX_FIXED:
+            return Response(
+                {"error": f"'fixed' must be a list of at most {self.MAX_FIXED} Pokémon"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            top_k = parse_int(request.data.get("top_k", 5), "top_k", 1, self.MAX_TOP_K)
+            time_budget_ms = parse_int(
+                request.data.get("time_budget_ms", TeamOptimizer.DEFAULT_TIME_BUDGET_MS),
+                "time_budget_ms",
+                1,
+                self.MAX_TIME_BUDGET_MS,
+            )
+            min_total = request.data.get("min_total")
+            if min_total is not None:
+                min_total = parse_int(min_total, "min_total", 0)
+            if not isinstance(exclude, list):
+                raise ValueError("'exclude' must be a list of Pokémon IDs")
+            exclude = [parse_int(p, "exclude", 1) for p in exclude]
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not isinstance(required_types, list):
+            return Response(
+                {"error": "'required_types' must be a list of type names"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        all_type_names = TypeEffectivenessService.get_all_type_names()
+        unknown_types = [str(t) for t in required_types if t not in all_type_names]
+        if unknown_types:
+            return Response(
+                {"error": f"Unknown types: {', '.join(unknown_types)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            fixed_pokemon = self._get_pokemon_objects(fixed)
+        except Pokemon.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        candidates = (
+            Pokemon.objects.exclude(id__in=exclude)
+            .select_related("stats")
+            .prefetch_related("types")
+        )
+        if min_total is not None:
+            candidates = candidates.filter(stats__total__gte=min_total)
+
+        result = TeamOptimizer(
+            fixed_pokemon,
+            candidates,
+            top_k=top_k,
+            required_types=required_types,
+            time_budget_ms=time_budget_ms,
+        ).run()
+
+        response_data = {
+            "teams": [
+                {
+                    "score": entry["score"],
+                    "team": PokemonTeamSynergySerializer(entry["team"], many=True).data,
+                }
+                for entry in result["teams"]
+            ],
+            "complete": result["complete"],
+            "explored": result["explored"],
+        }
+
         return Response(response_data, status=status.HTTP_200_OK)
 
 
-class PokemonComparisonView(APIView):
+class PokemonTeamLeaderboardView(APIView):
+    """
+    API endpoint for the highest-scoring teams overall or per required type.
+
+    Reads the rows published by the `build_team_leaderboard` command, which
+    has to be re-run after changes to types or to Pokémon typings.
+    """
+
+    def get(self, request):
+        type_name = request.query_params.get("type", "")
+        if type_name and type_name not in TypeEffectivenessService.get_all_type_names():
+            return Response(
+                {"error": f"Unknown type: {type_name}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = parse_int(
+                request.query_params.get("limit", TeamLeaderboardService.DEFAULT_TOP_K),
+                "limit",
+                1,
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        teams = TeamLeaderboardService.get_leaderboard(type_name, limit)
+        if teams is None:
+            return Response(
+                {"error": "The leaderboard has not been built for the current types and typings"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        return Response({"type": type_name or None, "teams": teams}, status=status.HTTP_200_OK)
+
+
+class PokemonComparisonView(RosterResolverMixin, APIView):
     """
     Compare two Pokémon by stats.
     Delegates actual comparison logic to PokemonComparator service.
+
+    With `?ids=<id-or-name>,...` compares 2 to `MAX_COMPARE` Pokémon at once
+    through PokemonGroupComparator.
     """
 
+    MAX_COMPARE = 20
+
+    flight = SingleFlight("compare")
+
     def get(self, request, *args, **kwargs):
+        fuzzy = query_flag(request, "fuzzy")
+        if "ids" in request.query_params:
+            return self._compare_many(request.query_params["ids"], fuzzy)
+
         p1_name = request.query_params.get("p1")
         p2_name = request.query_params.get("p2")
 
@@ -110,7 +681,16 @@ class PokemonComparisonView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        p1, p2 = Pokemon.get_pokemon(p1_name), Pokemon.get_pokemon(p2_name)
+        corrections = []
+        if fuzzy:
+            try:
+                (p1, p2), corrections = PokemonNameIndex.resolve_fuzzy(
+                    [p1_name, p2_name], Pokemon.objects.select_related("stats")
+                )
+            except Pokemon.DoesNotExist as e:
+                return Response(not_found_body(e), status=status.HTTP_404_NOT_FOUND)
+        else:
+            p1, p2 = Pokemon.get_pokemon(p1_name), Pokemon.get_pokemon(p2_name)
 
         # Ensure both have stats
         if not hasattr(p1, "stats") or not hasattr(p2, "stats"):
@@ -119,5 +699,66 @@ class PokemonComparisonView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        comparator = PokemonComparator(p1, p2)
-        return Response(comparator.run())
+        # Identical concurrent comparisons share one computation
+        result = self.flight.do(
+            (DatasetVersionService.current_version(), p1.id, p2.id),
+            lambda: PokemonComparator(p1, p2).run(),
+        )
+        if fuzzy:
+            result = {**result, "corrections": corrections}
+        return Response(result)
+
+    def _compare_many(self, ids: str, fuzzy: bool = False):
+        try:
+            pokemon_ids, corrections = self._get_roster_ids(ids, self.MAX_COMPARE, fuzzy)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Pokemon.DoesNotExist as e:
+            return Response(not_found_body(e), status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            result = self.flight.do(
+                (DatasetVersionService.current_version(), tuple(pokemon_ids)),
+                lambda: PokemonGroupComparator.from_ids(pokemon_ids).run(),
+            )
+        except Pokemon.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except PokemonStats.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if fuzzy:
+            result = {**result, "corrections": corrections}
+        return Response(result)
+
+
+class PokemonHeadToHeadView(RosterResolverMixin, APIView):
+    """
+    API endpoint for the all-pairs head-to-head matrix of a roster.
+
+    Every matrix is indexed like `ids`: entry [i][j] describes member i
+    against member j.
+    """
+
+    MAX_ROSTER = 50
+
+    def get(self, request):
+        try:
+            pokemon_ids, _ = self._get_roster_ids(request.query_params.get("ids", ""), self.MAX_ROSTER)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Pokemon.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            comparator = PokemonGroupComparator.from_ids(pokemon_ids, prefetch_types=True)
+        except Pokemon.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except PokemonStats.DoesNotExist as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(comparator.head_to_head(), status=status.HTTP_200_OK)
+
+
+class CoalescingMetricsView(APIView):
+    """API endpoint exposing request-coalescing counters and wait times of this process."""
+
+    def get(self, request):
+        return Response(SingleFlight.all_metrics(), status=status.HTTP_200_OK)
@@ -0,0 +1,47 @@
+import time
+from statistics import median
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from pokedex.filters import PokedexFilter
+from pokedex.views.pokedex import PokedexView
+
+# A typical combined stat query from the list endpoint's clients
+DEFAULT_QUERY = "min_speed=100&max_total=600&min_attack=80&ordering=-attack"
+
+
+class Command(BaseCommand):
+    """Django management command to check the SQL plan and timing of a Pokédex list filter."""
+
+    help = "Prints the SQL, query plan and median run time of a Pokédex list filter"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--query", default=DEFAULT_QUERY, help="List endpoint query string to benchmark"
+        )
+        parser.add_argument("--repeat", type=int, default=20, help="Number of timed runs")
+        parser.add_argument(
+            "--page-size", type=int, default=20, help="Rows fetched per run, like one list page"
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1 or options["page_size"] < 1:
+            raise CommandError("--repeat and --page-size must be positive")
+
+        filterset = PokedexFilter(QueryDict(options["query"]), queryset=PokedexView.queryset)
+        if not filterset.is_valid():
+            raise CommandError(f"Invalid query: {filterset.errors.as_json()}")
+        queryset = filterset.qs.prefetch_related(None)[: options["page_size"]]
+
+        self.stdout.write(str(queryset.query))
+        self.stdout.write(queryset.explain())
+
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            list(queryset.all())
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            self.style.SUCCESS(f"Median of {options['repeat']} runs: {median(timings) * 1000:.2f} ms")
+        )
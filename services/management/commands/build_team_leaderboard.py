@@ -0,0 +1,66 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.utils.team_leaderboard import TeamLeaderboardService
+
+
+class Command(BaseCommand):
+    """Django management command to build the materialized synergy leaderboard."""
+
+    help = "Scores every distinct multiset of type signatures and stores the best teams"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=TeamLeaderboardService.DEFAULT_TOP_K,
+            help="Teams kept overall and per type",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=TeamLeaderboardService.DEFAULT_BATCH_SIZE,
+            help="Teams scored per NumPy batch",
+        )
+        parser.add_argument(
+            "--max-partitions",
+            type=int,
+            default=None,
+            help="Stop after this many partitions; run again to resume",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Discard partitions finished by an earlier run instead of resuming",
+        )
+
+    def handle(self, *args, **options):
+        if options["top"] < 1 or options["workers"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--top, --workers and --batch-size must be positive")
+
+        def progress(partition, scored, left):
+            self.stdout.write(f"Partition {partition}: {scored} teams scored, {left} left")
+
+        try:
+            complete = TeamLeaderboardService.build(
+                top=options["top"],
+                workers=options["workers"],
+                batch_size=options["batch_size"],
+                restart=options["restart"],
+                max_partitions=options["max_partitions"],
+                progress=progress,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if complete:
+            self.stdout.write(self.style.SUCCESS("Leaderboard published!"))
+        else:
+            self.stdout.write("Stopped early; run the command again to resume.")
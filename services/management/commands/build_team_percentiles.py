@@ -0,0 +1,54 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.utils.team_percentile import TeamPercentileService
+
+
+class Command(BaseCommand):
+    """Django management command to build the random-team score distribution."""
+
+    help = "Samples random teams and stores their synergy score histogram for percentile lookups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--samples", type=int, default=1_000_000, help="Number of random teams to score"
+        )
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Number of worker processes used for sampling",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=TeamPercentileService.DEFAULT_CHUNK_SIZE,
+            help="Teams scored per task; part of what makes a seed reproducible",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild even if the stored distribution matches the current types and typings",
+        )
+
+    def handle(self, *args, **options):
+        samples = options["samples"]
+        seed = options["seed"]
+        if samples < 1 or options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--samples, --chunk-size and --workers must be positive")
+
+        if not options["force"] and TeamPercentileService.is_current(samples, seed):
+            self.stdout.write("Team score distribution is up to date.")
+            return
+
+        self.stdout.write(f"Scoring {samples} random teams...")
+        try:
+            distribution = TeamPercentileService.build(
+                samples, seed, workers=options["workers"], chunk_size=options["chunk_size"]
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Stored {distribution}"))
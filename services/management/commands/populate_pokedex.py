@@ -2,10 +2,15 @@ import asyncio
 
 import aiohttp
 from asgiref.sync import sync_to_async
+from django.core.management import call_command
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
 from pokedex.models import Ability, Pokemon, PokemonStats, PokemonType
+from services.utils.dataset_version import DatasetVersionService
+from services.utils.defensive_columns import DefensiveColumnsService
+from services.utils.membership_columns import MembershipColumnsService
+from services.utils.stat_percentiles import StatPercentileService
 
 STAT_MAP = {
     "hp": "hp",
@@ -157,14 +162,30 @@ class Command(BaseCommand):
     
     help = 'Asynchronously populates the database with the first 151 Pokemon'
     
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--with-percentiles",
+            action="store_true",
+            help="Also build the team score distribution (see build_team_percentiles)",
+        )
+
     def handle(self, *args, **options):
         self.stdout.write("Starting to populate Pokedex...")
         
         populator = PokedexPopulator(self.stdout, self.stderr)
         
         try:
-            asyncio.run(populator.run())
+            # Bump the dataset version once at the end instead of once per saved row
+            with DatasetVersionService.batch_updates():
+                asyncio.run(populator.run())
             self.stdout.write(self.style.SUCCESS("Successfully populated Pokedex!"))
         except Exception as e:
             self.stderr.write(f"Failed to populate Pokedex: {str(e)}")
             raise
+
+        StatPercentileService.recompute()
+        MembershipColumnsService.recompute()
+        DefensiveColumnsService.recompute()
+        if options["with_percentiles"]:
+            # Built after the column recomputes, from the types and typings just loaded
+            call_command("build_team_percentiles", stdout=self.stdout, stderr=self.stderr)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from services.utils.stat_percentiles import StatPercentileService
+
+
+class Command(BaseCommand):
+    """Django management command to refresh the materialized stat percentiles and roles."""
+
+    help = "Recomputes per-stat percentile ranks and roles for every Pokémon"
+
+    def handle(self, *args, **options):
+        updated = StatPercentileService.recompute()
+        self.stdout.write(self.style.SUCCESS(f"Updated percentiles for {updated} Pokémon"))
@@ -1,3 +1,65 @@
 from django.db import models
 
-# Create your models here.
+
+class DatasetVersion(models.Model):
+    """Stamp identifying the current state of the Pokédex dataset."""
+
+    key = models.CharField(max_length=50, unique=True)
+    version = models.CharField(max_length=32)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key}@{self.version}"
+
+
+class TeamScoreDistribution(models.Model):
+    """Histogram of synergy scores over a random sample of teams."""
+
+    key = models.CharField(max_length=50, unique=True)
+    # `TeamDataFingerprint` of the type and typing data the sample was scored on
+    fingerprint = models.CharField(max_length=32)
+    sample_size = models.PositiveIntegerField()
+    seed = models.BigIntegerField()
+    # counts[score] for scores 0-100
+    histogram = models.JSONField(default=list)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key}@{self.fingerprint} ({self.sample_size} teams)"
+
+
+class LeaderboardPartition(models.Model):
+    """Top teams of one slice of the exhaustive leaderboard search (for resuming)."""
+
+    # `TeamDataFingerprint` of the data being searched
+    fingerprint = models.CharField(max_length=32)
+    partition = models.PositiveIntegerField()
+    # {constraint: [[score, [group indices]], ...]}
+    results = models.JSONField(default=dict)
+    teams_scored = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("fingerprint", "partition")
+
+    def __str__(self):
+        return f"partition {self.partition}@{self.fingerprint}"
+
+
+class LeaderboardEntry(models.Model):
+    """One ranked team of the materialized synergy leaderboard."""
+
+    # `TeamDataFingerprint` of the type and typing data the board was built from
+    fingerprint = models.CharField(max_length=32)
+    # Empty for the overall board, otherwise a type the team must include
+    constraint = models.CharField(max_length=20, blank=True)
+    rank = models.PositiveIntegerField()
+    score = models.IntegerField()
+    typings = models.JSONField(default=list)
+    pokemon = models.JSONField(default=list)
+
+    class Meta:
+        ordering = ["constraint", "rank"]
+        indexes = [models.Index(fields=["fingerprint", "constraint", "rank"])]
+
+    def __str__(self):
+        return f"#{self.rank} {self.constraint or 'overall'} ({self.score})"
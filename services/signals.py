@@ -0,0 +1,73 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from pokedex.models import Pokemon, PokemonStats, PokemonType
+from services.utils.dataset_version import DatasetVersionService
+from services.utils.defensive_columns import DefensiveColumnsService
+from services.utils.membership_columns import MembershipColumnsService
+from services.utils.stat_percentiles import StatPercentileService
+
+
+@receiver(post_save, sender=PokemonType)
+@receiver(post_delete, sender=PokemonType)
+@receiver(post_save, sender=Pokemon)
+@receiver(post_delete, sender=Pokemon)
+@receiver(post_save, sender=PokemonStats)
+@receiver(post_delete, sender=PokemonStats)
+def bump_dataset_version(sender, **kwargs):
+    """Bump the dataset version whenever Pokédex data changes."""
+    DatasetVersionService.notify_changed()
+
+
+@receiver(m2m_changed, sender=Pokemon.types.through)
+@receiver(m2m_changed, sender=Pokemon.abilities.through)
+def bump_dataset_version_on_relations(sender, action, **kwargs):
+    """Bump the dataset version when type or ability assignments change."""
+    if action in ("post_add", "post_remove", "post_clear"):
+        DatasetVersionService.notify_changed()
+
+
+@receiver(m2m_changed, sender=Pokemon.types.through)
+def refresh_membership_columns(sender, instance, action, reverse, pk_set, **kwargs):
+    """Keep the denormalized type columns in sync with single edits."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    # Batched loads (e.g. populate_pokedex) recompute every row once at the end
+    if DatasetVersionService.is_batching():
+        return
+    # From the type side, pk_set holds the affected Pokémon (None when cleared)
+    pokemon_ids = [instance.pk] if not reverse else pk_set
+    MembershipColumnsService.recompute(pokemon_ids)
+    DefensiveColumnsService.recompute(pokemon_ids)
+
+
+@receiver(pre_delete, sender=PokemonType)
+def remember_members(sender, instance, **kwargs):
+    """Note the Pokémon of a type about to be deleted, whose M2M rows cascade without m2m_changed."""
+    instance._member_ids = list(instance.pokemon.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=PokemonType)
+def refresh_membership_columns_on_delete(sender, instance, **kwargs):
+    """Drop a deleted type from the denormalized type column of its former Pokémon."""
+    member_ids = getattr(instance, "_member_ids", None)
+    if member_ids and not DatasetVersionService.is_batching():
+        MembershipColumnsService.recompute(member_ids)
+
+
+@receiver(post_save, sender=PokemonType)
+@receiver(post_delete, sender=PokemonType)
+def refresh_defensive_columns(sender, instance, created=False, **kwargs):
+    """Recompute every defensive profile when a type's damage relations change or the type is deleted."""
+    # A new type has no Pokémon yet, so only its attacks could change existing profiles
+    if (created and not instance.damage_relations) or DatasetVersionService.is_batching():
+        return
+    DefensiveColumnsService.recompute()
+
+
+@receiver(post_save, sender=PokemonStats)
+@receiver(post_delete, sender=PokemonStats)
+def refresh_stat_percentiles(sender, **kwargs):
+    """Recompute the percentile columns and roles, which depend on every Pokémon's stats."""
+    if not DatasetVersionService.is_batching():
+        StatPercentileService.recompute()
@@ -0,0 +1,148 @@
+import unicodedata
+from bisect import bisect_left
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from pokedex.models import Pokemon
+from services.utils.dataset_version import DatasetVersionService
+
+NGRAM_SIZE = 3
+
+
+def normalize_name(name: str) -> str:
+    """Casefold a name, strip accents and drop separators ("Mr. Mime" -> "mrmime")."""
+    decomposed = unicodedata.normalize("NFKD", name.casefold())
+    return "".join(c for c in decomposed if c.isalnum())
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One build of the autocomplete index, published as a whole and never mutated."""
+
+    dataset_version: str
+    keys: List[str]
+    entries: List[Dict]
+    ngrams: Dict[str, FrozenSet[int]]
+
+
+class PokemonAutocompleteIndex:
+    """
+    In-memory search index for name autocomplete.
+
+    Prefix queries bisect a sorted list of normalized names; substring
+    queries intersect the posting sets of the query's trigrams and then
+    check the candidates, and fuzzy queries score every name sharing a
+    trigram with the query. Entries carry what the API returns, so lookups
+    never touch the database. The index is rebuilt when the dataset version
+    changes.
+    """
+
+    _snapshot: Optional[_Snapshot] = None
+
+    @classmethod
+    def _build_index(cls) -> _Snapshot:
+        """
+        Get the current index, rebuilding it when the dataset version changes.
+
+        A rebuild fills locals and publishes them in one assignment, so a
+        concurrent lookup sees either the old index or the new one, never a mix.
+        """
+        version = DatasetVersionService.current_version()
+        snapshot = cls._snapshot
+        if snapshot is not None and snapshot.dataset_version == version:
+            return snapshot
+
+        rows = sorted(
+            (normalize_name(name), pokemon_id, name, image_url)
+            for pokemon_id, name, image_url in Pokemon.objects.values_list("id", "name", "image_url")
+        )
+        ngrams: Dict[str, Set[int]] = {}
+        for row, (key, *_) in enumerate(rows):
+            for start in range(len(key) - NGRAM_SIZE + 1):
+                ngrams.setdefault(key[start : start + NGRAM_SIZE], set()).add(row)
+
+        snapshot = _Snapshot(
+            dataset_version=version,
+            keys=[key for key, *_ in rows],
+            entries=[
+                {"id": pokemon_id, "name": name, "image_url": image_url}
+                for _, pokemon_id, name, image_url in rows
+            ],
+            ngrams={ngram: frozenset(postings) for ngram, postings in ngrams.items()},
+        )
+        cls._snapshot = snapshot
+        return snapshot
+
+    @classmethod
+    def prefix(cls, query: str, limit: int = 10) -> List[Dict]:
+        """Pokémon whose normalized name starts with the query, alphabetically."""
+        index = cls._build_index()
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        results = []
+        for row in range(bisect_left(index.keys, query), len(index.keys)):
+            if len(results) == limit or not index.keys[row].startswith(query):
+                break
+            results.append(index.entries[row])
+        return results
+
+    @classmethod
+    def substring(cls, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Pokémon whose normalized name contains the query.
+
+        Names starting with the query come first, then earlier matches, then
+        alphabetical order. Queries shorter than a trigram scan the in-memory
+        names instead of the n-gram index.
+        """
+        index = cls._build_index()
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        if len(query) < NGRAM_SIZE:
+            candidates = range(len(index.keys))
+        else:
+            postings = [
+                index.ngrams.get(query[start : start + NGRAM_SIZE], frozenset())
+                for start in range(len(query) - NGRAM_SIZE + 1)
+            ]
+            candidates = frozenset.intersection(*sorted(postings, key=len))
+
+        matches = []
+        for row in candidates:
+            position = index.keys[row].find(query)
+            if position >= 0:
+                matches.append((position, row))
+        return [index.entries[row] for _, row in sorted(matches)[:limit]]
+
+    @classmethod
+    def fuzzy(cls, query: str, limit: int = 3) -> List[Dict]:
+        """
+        Closest names to a possibly misspelled query, best first.
+
+        Candidates are the names sharing at least one trigram with the query
+        (every name if none do) and are scored with difflib's similarity
+        ratio of the normalized names. Each entry gets a `confidence` in 0-1.
+        """
+        index = cls._build_index()
+        query = normalize_name(query)
+        if not query:
+            return []
+
+        candidates: Set[int] = set()
+        for start in range(len(query) - NGRAM_SIZE + 1):
+            candidates |= index.ngrams.get(query[start : start + NGRAM_SIZE], frozenset())
+        if not candidates:
+            candidates = set(range(len(index.keys)))
+
+        scored = sorted(
+            (-SequenceMatcher(None, query, index.keys[row]).ratio(), row) for row in candidates
+        )
+        return [
+            {**index.entries[row], "confidence": round(-score, 3)}
+            for score, row in scored[:limit]
+        ]
@@ -0,0 +1,236 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+
+from pokedex.models import Pokemon
+from services.utils.dataset_version import DatasetVersionService
+
+from .pokemon_comparator import PokemonGroupComparator
+from .stat_percentiles import StatPercentileService
+from .type_effectiveness import TypeEffectivenessService
+
+# Multipliers are clipped to this floor before taking log2, so immunities count as 3 halvings
+MIN_MULTIPLIER = 0.125
+
+
+@dataclass(frozen=True, eq=False)
+class _Snapshot:
+    """
+    One build of the counter index, published as a whole and never mutated.
+
+    Compared and hashed by identity, so it can key the ranking cache.
+    """
+
+    dataset_version: str
+    ids: np.ndarray
+    names: List[str]
+    types: List[List[str]]
+    row: Dict[int, int]
+    profiles: np.ndarray
+    attacking: np.ndarray
+    speed: np.ndarray
+    bulk: np.ndarray
+    roles: np.ndarray
+
+
+@dataclass(frozen=True)
+class CounterRanking:
+    """Ranked candidate rows for a target, tied to the index they were ranked on."""
+
+    index: _Snapshot
+    target: int
+    rows: List[int]
+
+
+class CounterService:
+    """
+    Service for ranking the whole Pokédex against a target Pokémon.
+
+    The Pokédex is held in memory as arrays: every Pokémon's defensive
+    profile (one row per attacking type), a boolean matrix of its own types,
+    its speed, its bulk percentile and its role. Ranking a target is then a
+    handful of vectorized operations, and each ranking is cached per target
+    and dataset version.
+
+    A candidate's score is:
+        log2(best multiplier of its types against the target)
+        - log2(best multiplier of the target's types against it)
+        + 0.5 if it is faster than the target
+        + 0.5 * its bulk (HP + Defense + Sp. Defense) percentile as a fraction
+    """
+
+    _snapshot: Optional[_Snapshot] = None
+
+    @classmethod
+    def _build_index(cls) -> _Snapshot:
+        """
+        Get the Pokédex arrays, rebuilding them when the dataset version changes.
+
+        A rebuild fills locals and publishes them in one assignment, so a
+        concurrent ranking sees either the old arrays or the new ones, never a mix.
+        """
+        version = DatasetVersionService.current_version()
+        snapshot = cls._snapshot
+        if snapshot is not None and snapshot.dataset_version == version:
+            return snapshot
+
+        pokemon = list(
+            Pokemon.objects.select_related("stats").prefetch_related("types").order_by("id")
+        )
+        type_index = TypeEffectivenessService.get_type_index()
+        types = [[t.name for t in p.types.all()] for p in pokemon]
+
+        attacking = np.zeros((len(pokemon), len(type_index)), dtype=bool)
+        for row, names in enumerate(types):
+            attacking[row, [type_index[name] for name in names if name in type_index]] = True
+
+        stats = [getattr(p, "stats", None) for p in pokemon]
+        has_stats = np.array([s is not None for s in stats], dtype=bool)
+        stat_matrix = np.array(
+            [
+                [getattr(s, field) or 0 for field in PokemonGroupComparator.STAT_FIELDS]
+                if s is not None
+                else [0] * len(PokemonGroupComparator.STAT_FIELDS)
+                for s in stats
+            ],
+            dtype=np.int64,
+        ).reshape(len(pokemon), len(PokemonGroupComparator.STAT_FIELDS))
+        hp, _, defense, _, special_defense, speed = stat_matrix.T
+
+        bulk = np.zeros(len(pokemon))
+        if has_stats.any():
+            bulk_values = (hp + defense + special_defense)[has_stats]
+            bulk[has_stats] = StatPercentileService.percentile_ranks(bulk_values[:, None])[:, 0] / 100
+
+        computed_roles = PokemonGroupComparator.classify_roles(stat_matrix)
+        roles = [
+            (s.role or computed) if s is not None else ""
+            for s, computed in zip(stats, computed_roles)
+        ]
+
+        snapshot = _Snapshot(
+            dataset_version=version,
+            ids=np.array([p.id for p in pokemon], dtype=np.int64),
+            names=[p.name for p in pokemon],
+            types=types,
+            row={p.id: row for row, p in enumerate(pokemon)},
+            profiles=TypeEffectivenessService.get_defensive_profiles(types),
+            attacking=attacking,
+            speed=np.where(has_stats, speed, -1),
+            bulk=bulk,
+            roles=np.array(roles, dtype=object),
+        )
+        for array in (
+            snapshot.ids,
+            snapshot.profiles,
+            snapshot.attacking,
+            snapshot.speed,
+            snapshot.bulk,
+            snapshot.roles,
+        ):
+            array.setflags(write=False)
+        cls._snapshot = snapshot
+        # Drop rankings of the previous index so the cache does not keep it alive
+        cls._rank.cache_clear()
+        return snapshot
+
+    @staticmethod
+    @lru_cache(maxsize=getattr(settings, "POKEDEX_COUNTERS_CACHE_SIZE", 512))
+    def _rank(index: _Snapshot, row: int) -> Dict[str, np.ndarray]:
+        """Score every Pokémon in `index` against the Pokémon at `row`, best counter first."""
+        attacking = index.attacking
+        profiles = index.profiles
+
+        # Best multiplier each candidate deals to the target, and takes from it
+        if attacking[row].any():
+            taken = profiles[:, attacking[row]].max(axis=1)
+        else:
+            taken = np.ones(len(profiles))
+        dealt = np.where(attacking, profiles[row][None, :], -np.inf).max(axis=1)
+        dealt = np.where(attacking.any(axis=1), dealt, 1.0)
+
+        faster = index.speed > index.speed[row]
+        scores = (
+            np.log2(np.maximum(dealt, MIN_MULTIPLIER))
+            - np.log2(np.maximum(taken, MIN_MULTIPLIER))
+            + 0.5 * faster
+            + 0.5 * index.bulk
+        )
+
+        candidates = np.flatnonzero(np.arange(len(scores)) != row)
+        order = candidates[np.argsort(-scores[candidates], kind="stable")]
+        ranking = {
+            "order": order,
+            "score": np.round(scores, 3),
+            "dealt": dealt,
+            "taken": taken,
+            "faster": faster,
+        }
+        for array in ranking.values():
+            array.setflags(write=False)
+        return ranking
+
+    @classmethod
+    def rank(
+        cls, pokemon_id: int, type_name: Optional[str] = None, role: Optional[str] = None
+    ) -> Optional[CounterRanking]:
+        """
+        Rank the Pokédex as counters to `pokemon_id`, optionally filtered.
+
+        Args:
+            pokemon_id: ID of the target Pokémon
+            type_name: Only keep candidates of this type
+            role: Only keep candidates with this role
+
+        Returns:
+            The ranking, whose `rows` are candidate index rows, best counter
+            first (pass a slice of them to `describe`), or None if the target
+            does not exist
+        """
+        index = cls._build_index()
+        row = index.row.get(pokemon_id)
+        if row is None:
+            return None
+
+        order = cls._rank(index, row)["order"]
+        if type_name:
+            type_index = TypeEffectivenessService.get_type_index().get(type_name)
+            if type_index is None:
+                return CounterRanking(index, row, [])
+            order = order[index.attacking[order, type_index]]
+        if role:
+            order = order[index.roles[order] == role]
+        return CounterRanking(index, row, order.tolist())
+
+    @classmethod
+    def describe(cls, ranking: CounterRanking, rows: Sequence[int]) -> List[Dict]:
+        """Build the response entries for rows of `ranking`, using the index it was ranked on."""
+        index = ranking.index
+        scores = cls._rank(index, ranking.target)
+        return [
+            {
+                "id": int(index.ids[row]),
+                "name": index.names[row],
+                "types": index.types[row],
+                "role": index.roles[row],
+                "score": float(scores["score"][row]),
+                "offensive_multiplier": float(scores["dealt"][row]),
+                "defensive_multiplier": float(scores["taken"][row]),
+                "faster": bool(scores["faster"][row]),
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def cache_info() -> Dict:
+        """Get hit/miss counters and size of the per-target ranking cache."""
+        info = CounterService._rank.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+        }
@@ -0,0 +1,82 @@
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from services.models import DatasetVersion
+
+DATASET_KEY = "pokedex"
+
+
+class DatasetVersionService:
+    """
+    Service for tracking the version of the Pokédex dataset.
+
+    The version lives in the database so every worker process sees the same
+    stamp. Each process only re-reads it once per
+    `POKEDEX_DATASET_VERSION_CHECK_INTERVAL` seconds, so in-memory caches keyed
+    by the version can be validated on every call without a query per request.
+
+    Batching with `batch_updates` follows the execution context: it covers
+    the code that opened the batch and anything it runs through asyncio or
+    `sync_to_async` (which copy the context), while changes made meanwhile by
+    other requests still bump the version immediately.
+    """
+
+    _version = None
+    _checked_at = 0.0
+    _batch_depth: ContextVar[int] = ContextVar("dataset_version_batch_depth", default=0)
+
+    @classmethod
+    def _check_interval(cls) -> float:
+        return getattr(settings, "POKEDEX_DATASET_VERSION_CHECK_INTERVAL", 5.0)
+
+    @classmethod
+    def current_version(cls) -> str:
+        """Get the dataset version, re-reading it from the database when the check interval has passed."""
+        now = time.monotonic()
+        if cls._version is None or now - cls._checked_at >= cls._check_interval():
+            version = (
+                DatasetVersion.objects.filter(key=DATASET_KEY)
+                .values_list("version", flat=True)
+                .first()
+            )
+            cls._version = version or ""
+            cls._checked_at = now
+        return cls._version
+
+    @classmethod
+    def bump(cls) -> str:
+        """Stamp the dataset with a new version and adopt it in this process immediately."""
+        version = uuid.uuid4().hex
+        DatasetVersion.objects.update_or_create(
+            key=DATASET_KEY, defaults={"version": version}
+        )
+        cls._version = version
+        cls._checked_at = time.monotonic()
+        return version
+
+    @classmethod
+    def notify_changed(cls) -> None:
+        """Record a dataset change, unless the current context is batching updates."""
+        if not cls._batch_depth.get():
+            cls.bump()
+
+    @classmethod
+    def is_batching(cls) -> bool:
+        """Whether the current context is batching updates with `batch_updates`."""
+        return cls._batch_depth.get() > 0
+
+    @classmethod
+    @contextmanager
+    def batch_updates(cls):
+        """Defer version bumps in this context for the duration of the block and bump once on exit."""
+        token = cls._batch_depth.set(cls._batch_depth.get() + 1)
+        try:
+            yield
+        finally:
+            cls._batch_depth.reset(token)
+            if not cls._batch_depth.get():
+                cls.bump()
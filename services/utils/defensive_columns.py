@@ -0,0 +1,76 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from pokedex.models import Pokemon, PokemonType
+
+from .derived_columns import save_derived_columns
+from .membership_columns import MembershipColumnsService
+from .type_effectiveness import TypeEffectivenessService
+
+PROFILE_FIELDS = ["immune_mask", "resist_mask", "weak_mask", "max_multiplier"]
+
+
+class DefensiveColumnsService:
+    """
+    Service for materializing each Pokémon's defensive profile on Pokemon.
+
+    The profile from `TypeEffectivenessService` is stored as bitmasks of
+    attacking types, using the same bit per type ID as `type_mask`:
+    `immune_mask` (takes 0×), `resist_mask` (takes less than 1×, immunities
+    included) and `weak_mask` (takes more than 1×), plus `max_multiplier`,
+    the largest multiplier any type deals to it. Weakness filters then run
+    as predicates on these columns.
+    """
+
+    @classmethod
+    def recompute(cls, pokemon_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute the defensive profile columns in bulk.
+
+        Args:
+            pokemon_ids: Only refresh these Pokémon (default: all)
+
+        Returns:
+            Number of rows whose columns changed
+        """
+        pokemon = Pokemon.objects.only("id", *PROFILE_FIELDS)
+        memberships = Pokemon.types.through.objects.all()
+        if pokemon_ids is not None:
+            pokemon_ids = list(pokemon_ids)
+            pokemon = pokemon.filter(id__in=pokemon_ids)
+            memberships = memberships.filter(pokemon_id__in=pokemon_ids)
+        pokemon = list(pokemon)
+
+        type_names: Dict[int, List[str]] = {}
+        for pokemon_id, type_name in memberships.values_list("pokemon_id", "pokemontype__name"):
+            type_names.setdefault(pokemon_id, []).append(type_name)
+
+        type_ids = dict(PokemonType.objects.values_list("name", "id"))
+        type_order = TypeEffectivenessService.get_type_order()
+        # Attacking types without a bit are left out of the masks
+        bits = np.array(
+            [
+                MembershipColumnsService.type_bit(type_ids[name])
+                if MembershipColumnsService.is_maskable(type_ids[name])
+                else 0
+                for name in type_order
+            ],
+            dtype=np.int64,
+        )
+        profiles = TypeEffectivenessService.get_defensive_profiles(
+            [type_names.get(p.id, []) for p in pokemon]
+        ).reshape(len(pokemon), len(bits))
+
+        columns = {
+            "immune_mask": np.bitwise_or.reduce(np.where(profiles == 0, bits, 0), axis=1),
+            "resist_mask": np.bitwise_or.reduce(np.where(profiles < 1, bits, 0), axis=1),
+            "weak_mask": np.bitwise_or.reduce(np.where(profiles > 1, bits, 0), axis=1),
+            "max_multiplier": profiles.max(axis=1) if len(bits) else np.ones(len(pokemon)),
+        }
+
+        return save_derived_columns(
+            Pokemon,
+            pokemon,
+            ({field: columns[field][row].item() for field in PROFILE_FIELDS} for row in range(len(pokemon))),
+        )
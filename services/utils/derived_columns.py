@@ -0,0 +1,35 @@
+from typing import Any, Dict, Iterable, List, Type
+
+from django.db import models, transaction
+
+
+def save_derived_columns(
+    model: Type[models.Model], instances: Iterable[models.Model], values: Iterable[Dict[str, Any]]
+) -> int:
+    """
+    Assign recomputed column values to `instances` and bulk-update the rows that changed.
+
+    bulk_update sends no signals, so storing derived data neither bumps the
+    dataset version nor re-triggers the receivers that recompute it.
+
+    Args:
+        model: Model the instances belong to
+        instances: Loaded rows, aligned with `values`
+        values: Column name -> new value, one mapping per instance
+
+    Returns:
+        Number of rows whose columns changed
+    """
+    fields: List[str] = []
+    changed = []
+    for instance, row in zip(instances, values):
+        fields = fields or list(row)
+        if any(getattr(instance, field) != value for field, value in row.items()):
+            for field, value in row.items():
+                setattr(instance, field, value)
+            changed.append(instance)
+
+    if changed:
+        with transaction.atomic():
+            model.objects.bulk_update(changed, fields, batch_size=500)
+    return len(changed)
@@ -0,0 +1,80 @@
+from typing import Dict, Iterable, Optional, Set
+
+from django.db.models import QuerySet
+
+from pokedex.models import Pokemon, PokemonType
+
+from .derived_columns import save_derived_columns
+
+# Type IDs map to bits of a signed 64-bit column
+MAX_TYPE_ID = 63
+
+
+class MembershipColumnsService:
+    """
+    Service for maintaining the denormalized type column on Pokemon.
+
+    `type_mask` has bit (id - 1) set for each of the Pokémon's type IDs, so
+    "has all of these types" and "has none of these types" are one bitwise
+    predicate, checked against the column's distinct values and then matched
+    exactly so its index serves the lookup. This replaces joins and
+    GROUP BY/HAVING over the M2M table.
+
+    Types with IDs above `MAX_TYPE_ID` have no bit: they are left out of the
+    masks and rejected by the filters that use them (see `maskable_types`).
+    """
+
+    @staticmethod
+    def maskable_types() -> QuerySet:
+        """Types that have a bit in the masks."""
+        return PokemonType.objects.filter(id__gte=1, id__lte=MAX_TYPE_ID)
+
+    @staticmethod
+    def is_maskable(type_id: int) -> bool:
+        return 1 <= type_id <= MAX_TYPE_ID
+
+    @staticmethod
+    def type_bit(type_id: int) -> int:
+        if not MembershipColumnsService.is_maskable(type_id):
+            raise ValueError(f"Type ID {type_id} does not fit in the type mask")
+        return 1 << (type_id - 1)
+
+    @classmethod
+    def type_mask(cls, type_ids: Iterable[int]) -> int:
+        """Bitmask with the bit of each type ID set."""
+        mask = 0
+        for type_id in type_ids:
+            mask |= cls.type_bit(type_id)
+        return mask
+
+    @classmethod
+    def recompute(cls, pokemon_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Recompute `type_mask` from the M2M table in bulk.
+
+        Args:
+            pokemon_ids: Only refresh these Pokémon (default: all)
+
+        Returns:
+            Number of rows whose columns changed
+        """
+        pokemon = Pokemon.objects.only("id", "type_mask")
+        types = Pokemon.types.through.objects.all()
+        if pokemon_ids is not None:
+            pokemon_ids = list(pokemon_ids)
+            pokemon = pokemon.filter(id__in=pokemon_ids)
+            types = types.filter(pokemon_id__in=pokemon_ids)
+        pokemon = list(pokemon)
+
+        type_ids: Dict[int, Set[int]] = {}
+        for pokemon_id, type_id in types.values_list("pokemon_id", "pokemontype_id"):
+            type_ids.setdefault(pokemon_id, set()).add(type_id)
+
+        return save_derived_columns(
+            Pokemon,
+            pokemon,
+            (
+                {"type_mask": cls.type_mask(i for i in type_ids.get(p.id, ()) if cls.is_maskable(i))}
+                for p in pokemon
+            ),
+        )
@@ -1,4 +1,10 @@
-from pokedex.models import PokemonStats
+from typing import Dict, List
+
+import numpy as np
+
+from pokedex.models import Pokemon, PokemonStats
+
+from .type_effectiveness import TypeEffectivenessService
 
 
 class PokemonComparator:
@@ -58,8 +64,8 @@ class PokemonComparator:
 
     def roles(self):
         return {
-            self.p1.name: self.classify_role(self.s1),
-            self.p2.name: self.classify_role(self.s2),
+            self.p1.name: self.s1.role or self.classify_role(self.s1),
+            self.p2.name: self.s2.role or self.classify_role(self.s2),
         }
 
     def run(self):
@@ -72,3 +78,141 @@ class PokemonComparator:
             "roles": self.roles(),
             "overall_winner": total["winner"],
         }
+
+
+class PokemonGroupComparator:
+    """
+    Compares any number of Pokémon at once.
+
+    Stats are loaded in one query into an (N x 6) matrix, in `STAT_FIELDS`
+    order, and rankings, winners, totals and roles are computed over whole
+    columns instead of pair by pair.
+    """
+
+    STAT_FIELDS = PokemonComparator.STAT_FIELDS
+
+    def __init__(self, stats: List[PokemonStats]):
+        self.pokemon = [s.pokemon for s in stats]
+        self.names = [s.pokemon.name for s in stats]
+        self.ids = [s.pokemon_id for s in stats]
+        self.matrix = np.array(
+            [[getattr(s, field) or 0 for field in self.STAT_FIELDS] for s in stats],
+            dtype=np.int64,
+        ).reshape(len(stats), len(self.STAT_FIELDS))
+        self.totals = np.array(
+            [s.total if s.total is not None else row.sum() for s, row in zip(stats, self.matrix)],
+            dtype=np.int64,
+        )
+
+    @classmethod
+    def from_ids(cls, pokemon_ids: List[int], prefetch_types: bool = False) -> "PokemonGroupComparator":
+        """
+        Load the stats of the given Pokémon (in the given order) with one query,
+        plus one for their types if `prefetch_types` is set (see `head_to_head`).
+
+        Raises:
+            Pokemon.DoesNotExist: if any of them does not exist
+            PokemonStats.DoesNotExist: if any of them has no stats saved
+        """
+        queryset = PokemonStats.objects.filter(pokemon_id__in=pokemon_ids).select_related("pokemon")
+        if prefetch_types:
+            queryset = queryset.prefetch_related("pokemon__types")
+        found = {s.pokemon_id: s for s in queryset}
+        missing = [pokemon_id for pokemon_id in pokemon_ids if pokemon_id not in found]
+        if missing:
+            existing = set(Pokemon.objects.filter(id__in=missing).values_list("id", flat=True))
+            unknown = [pokemon_id for pokemon_id in missing if pokemon_id not in existing]
+            if unknown:
+                raise Pokemon.DoesNotExist(f"Pokémon not found: {', '.join(map(str, unknown))}")
+            raise PokemonStats.DoesNotExist(f"No stats saved for Pokémon IDs: {', '.join(map(str, missing))}")
+        return cls([found[pokemon_id] for pokemon_id in pokemon_ids])
+
+    @staticmethod
+    def rank(values: np.ndarray) -> np.ndarray:
+        """Rank along the first axis: 1 is the highest, ties share the better rank."""
+        return (values[None, :] > values[:, None]).sum(axis=1) + 1
+
+    def winner(self, values: np.ndarray) -> str:
+        """Name of the single highest value, or "tie"."""
+        best = np.flatnonzero(values == values.max())
+        return self.names[best[0]] if len(best) == 1 else "tie"
+
+    @staticmethod
+    def classify_roles(matrix: np.ndarray) -> List[str]:
+        """Vectorized `PokemonComparator.classify_role` over an (N x 6) stat matrix."""
+        hp, attack, defense, special_attack, special_defense, _ = matrix.T
+        offense = (attack + special_attack) / 2
+        bulk = (defense + special_defense) / 2
+        roles = np.select(
+            [
+                (offense > bulk) & (offense > hp),
+                (bulk > offense) & (bulk > hp),
+                (hp > offense) & (hp > bulk),
+            ],
+            ["Offensive", "Defensive", "Tank"],
+            default="Balanced",
+        )
+        return roles.tolist()
+
+    def run(self) -> Dict:
+        """Return the comparison as parallel lists and (N x 6) matrices."""
+        return {
+            "ids": self.ids,
+            "names": self.names,
+            "stats": self.STAT_FIELDS,
+            "matrix": self.matrix.tolist(),
+            "ranks": self.rank(self.matrix).tolist(),
+            "winners": {
+                field: self.winner(self.matrix[:, column])
+                for column, field in enumerate(self.STAT_FIELDS)
+            },
+            "totals": self.totals.tolist(),
+            "total_ranks": self.rank(self.totals).tolist(),
+            "roles": self.classify_roles(self.matrix),
+            "overall_winner": self.winner(self.totals),
+        }
+
+    @staticmethod
+    def outcomes(values: np.ndarray) -> np.ndarray:
+        """(N x N) matrix of 1 where row beats column, 0 on ties and -1 where it loses."""
+        return np.sign(values[:, None] - values[None, :])
+
+    def type_multipliers(self) -> np.ndarray:
+        """
+        (N x N) matrix of the best multiplier any of row's types deals to column's typing.
+
+        Members must have their types prefetched. Typeless attackers deal 1x.
+        """
+        signatures = [
+            TypeEffectivenessService.get_type_signature(t.name for t in p.types.all())
+            for p in self.pokemon
+        ]
+        profiles = TypeEffectivenessService.get_signature_profiles(signatures)
+        attacking = np.zeros(profiles.shape, dtype=bool)
+        for row, signature in enumerate(signatures):
+            attacking[row, list(signature)] = True
+
+        # best[i, j] = max over row i's types of column j's multiplier against that type
+        best = np.where(attacking[:, None, :], profiles[None, :, :], -np.inf).max(axis=2)
+        return np.where(attacking.any(axis=1)[:, None], best, 1.0)
+
+    def head_to_head(self) -> Dict:
+        """
+        Return the all-pairs comparison as dense matrices indexed like `ids`.
+
+        `outcomes[stat][i][j]` is 1, 0 or -1 for member i winning, tying or
+        losing against member j on that stat (or on `total`), and
+        `type_multipliers[i][j]` is member i's best type multiplier against
+        member j, so [j][i] is the other way round.
+        """
+        outcomes = {
+            field: self.outcomes(self.matrix[:, column]).tolist()
+            for column, field in enumerate(self.STAT_FIELDS)
+        }
+        outcomes["total"] = self.outcomes(self.totals).tolist()
+        return {
+            "ids": self.ids,
+            "names": self.names,
+            "outcomes": outcomes,
+            "type_multipliers": self.type_multipliers().tolist(),
+        }
@@ -0,0 +1,146 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from django.db.models import QuerySet
+
+from pokedex.models import Pokemon
+from services.utils.dataset_version import DatasetVersionService
+
+from .autocomplete import PokemonAutocompleteIndex
+
+
+class PokemonNameNotFound(Pokemon.DoesNotExist):
+    """Raised when a name matches no Pokémon, carrying "did you mean" suggestions."""
+
+    def __init__(self, identifier, suggestions: List[Dict]):
+        super().__init__(f"Pokémon '{identifier}' not found")
+        self.identifier = identifier
+        self.suggestions = suggestions
+
+
+class PokemonNameIndex:
+    """In-memory index of the Pokédex, used to resolve names without a database scan."""
+
+    # A fuzzy match is only accepted at this confidence and if no other name ties it
+    FUZZY_MIN_CONFIDENCE = 0.75
+    # Suggestions below this confidence are not worth showing
+    SUGGESTION_MIN_CONFIDENCE = 0.5
+
+    _name_to_id = None
+    _dataset_version = None
+
+    @classmethod
+    def _build_index(cls) -> Dict[str, int]:
+        """Build the lowercase name -> ID map, rebuilding it when the dataset version changes."""
+        version = DatasetVersionService.current_version()
+        if cls._name_to_id is not None and cls._dataset_version == version:
+            return cls._name_to_id
+
+        name_to_id = {}
+        for pokemon_id, name in Pokemon.objects.order_by("id").values_list("id", "name"):
+            name_to_id.setdefault(name.lower(), pokemon_id)
+
+        cls._name_to_id = name_to_id
+        cls._dataset_version = version
+        return name_to_id
+
+    @classmethod
+    def lookup_id(cls, identifier: Union[int, str]) -> Optional[int]:
+        """
+        Map an ID or name to a Pokémon ID.
+
+        Numeric identifiers are returned as IDs without checking they exist;
+        names return None when no Pokémon has that name.
+        """
+        if isinstance(identifier, int) or (isinstance(identifier, str) and identifier.isdigit()):
+            return int(identifier)
+        if not isinstance(identifier, str):
+            return None
+        return cls._build_index().get(identifier.strip().lower())
+
+    @classmethod
+    def fuzzy_lookup(cls, identifier: Union[int, str]) -> Tuple[Optional[int], Optional[Dict]]:
+        """
+        Map an ID or a possibly misspelled name to a Pokémon ID.
+
+        Returns:
+            (ID, match) where match is the fuzzy match used ({"id", "name",
+            "confidence", ...}) or None for an exact match
+
+        Raises:
+            PokemonNameNotFound: if no name is a confident match; its
+                `suggestions` list the closest names
+        """
+        pokemon_id = cls.lookup_id(identifier)
+        if pokemon_id is not None:
+            return pokemon_id, None
+        if not isinstance(identifier, str):
+            raise PokemonNameNotFound(identifier, [])
+
+        matches = PokemonAutocompleteIndex.fuzzy(identifier)
+        best = matches[0] if matches else None
+        if (
+            best is not None
+            and best["confidence"] >= cls.FUZZY_MIN_CONFIDENCE
+            and (len(matches) == 1 or matches[1]["confidence"] < best["confidence"])
+        ):
+            return best["id"], best
+
+        suggestions = [m for m in matches if m["confidence"] >= cls.SUGGESTION_MIN_CONFIDENCE]
+        raise PokemonNameNotFound(identifier, suggestions)
+
+    @classmethod
+    def resolve_fuzzy(
+        cls, identifiers: Iterable[Union[int, str]], queryset: Optional[QuerySet] = None
+    ) -> Tuple[List[Pokemon], List[Dict]]:
+        """
+        Like `resolve`, but misspelled names are replaced by their closest confident match.
+
+        Returns:
+            (Pokémon in input order, corrections) where each correction is
+            {"input", "name", "confidence"}
+
+        Raises:
+            PokemonNameNotFound: for the first name without a confident match
+        """
+        identifiers = list(identifiers)
+        ids = []
+        corrections = []
+        for identifier in identifiers:
+            pokemon_id, match = cls.fuzzy_lookup(identifier)
+            ids.append(pokemon_id)
+            if match is not None:
+                corrections.append(
+                    {"input": identifier, "name": match["name"], "confidence": match["confidence"]}
+                )
+        return cls.resolve(ids, queryset), corrections
+
+    @classmethod
+    def resolve(
+        cls, identifiers: Iterable[Union[int, str]], queryset: Optional[QuerySet] = None
+    ) -> List[Pokemon]:
+        """
+        Resolve IDs and names to Pokémon with their types prefetched, in one round trip.
+
+        Args:
+            identifiers: Pokémon IDs or names, duplicates allowed
+            queryset: Optional base queryset (e.g. with extra related lookups)
+
+        Returns:
+            Pokémon objects in input order
+
+        Raises:
+            Pokemon.DoesNotExist: naming the first identifier that doesn't match
+        """
+        identifiers = list(identifiers)
+        ids = [cls.lookup_id(identifier) for identifier in identifiers]
+
+        if queryset is None:
+            queryset = Pokemon.objects.prefetch_related("types")
+        found = queryset.in_bulk([i for i in ids if i is not None])
+
+        team_pokemon = []
+        for identifier, pokemon_id in zip(identifiers, ids):
+            if pokemon_id not in found:
+                raise Pokemon.DoesNotExist(f"Pokémon '{identifier}' not found")
+            team_pokemon.append(found[pokemon_id])
+        return team_pokemon
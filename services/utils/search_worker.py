@@ -0,0 +1,77 @@
+"""
+Process-pool entry points for the parallel team search, score sampling and
+leaderboard build.
+
+Models are only imported inside the functions, so workers started with the
+spawn or forkserver methods can set Django up before the search module loads.
+"""
+import time
+from typing import Dict
+
+
+
+def setup_django() -> None:
+    """Set Django up in a freshly spawned worker process."""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def search_branch(branch: int, wall_deadline: float, search_arguments: Dict, floors_name: str):
+    """
+    Search the partition of teams whose first open slot is filled from `branch`.
+
+    `floors_name` names the shared memory block holding the partition floors
+    of this search, so one long-lived pool can serve many searches.
+    """
+    from multiprocessing.shared_memory import SharedMemory
+
+    from services.utils.team_optimizer import search_completions
+
+    # Monotonic clocks are not comparable across processes, wall time is
+    deadline = time.monotonic() + (wall_deadline - time.time())
+    block = SharedMemory(name=floors_name)
+    floors = block.buf.cast("i")
+    try:
+        return search_completions(
+            deadline=deadline,
+            partition=branch,
+            shared_floors=floors,
+            **search_arguments,
+        )
+    finally:
+        floors.release()
+        block.close()
+
+
+def sample_scores(codes, pool_rows, size: int, seed):
+    """
+    Score `size` random teams of distinct Pokémon drawn from `pool_rows`.
+
+    Args:
+        codes: Defensive profile code table
+        pool_rows: Profile row of every Pokémon in the dataset
+        size: Number of teams to sample
+        seed: `numpy.random.SeedSequence` for this chunk
+
+    Returns:
+        Histogram of the sampled scores (index = score)
+    """
+    import numpy as np
+
+    from services.utils.team_scoring import TeamScoringKernel
+
+    rng = np.random.default_rng(seed)
+    team_size = 6
+    picks = rng.random((size, len(pool_rows))).argpartition(team_size - 1, axis=1)[:, :team_size]
+    scores = TeamScoringKernel.score_code_batch(codes[pool_rows[picks]])
+    return np.bincount(scores, minlength=101)
+
+
+def leaderboard_partition(partition: int, arguments: Dict):
+    """Search one partition of the leaderboard build."""
+    from services.utils.team_leaderboard import search_partition
+
+    return search_partition(partition, **arguments)
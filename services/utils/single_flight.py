@@ -0,0 +1,181 @@
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+_MISSING = object()
+
+# Cache backends that live inside one process, so a lock in them cannot
+# coalesce anything the in-process flight table doesn't already
+_LOCAL_CACHE_BACKENDS = {
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+}
+
+
+class _Call:
+    """An in-flight computation that other threads in this process can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent computations into one.
+
+    Within a process, callers with the same key while a computation is in
+    flight wait for it and share its result (or exception). Across processes,
+    the thread that computes first takes a lock in the Django cache and
+    publishes its result there; callers in other processes that find the
+    lock poll for that result instead of recomputing. If the lock holder
+    fails or takes longer than `POKEDEX_SINGLE_FLIGHT_TIMEOUT` seconds, they
+    fall back to computing themselves. Cross-process coalescing therefore
+    needs a shared cache backend (e.g. Redis, Memcached or the database
+    cache); with a process-local backend such as the default local-memory
+    cache, the cache lock is skipped and calls only coalesce within a process.
+
+    The cross-process lock costs three cache round trips (add, set, delete)
+    on every call that computes, contended or not. Set
+    `POKEDEX_SINGLE_FLIGHT_SHARED = False` to skip them when duplicate work
+    across processes is cheaper than that.
+
+    Results are shared between callers and must be treated as read-only.
+    """
+
+    RESULT_TTL = 5
+
+    _registry: Dict[str, "SingleFlight"] = {}
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._metrics = {}
+        self.reset_metrics()
+        SingleFlight._registry[name] = self
+
+    @staticmethod
+    def _timeout() -> float:
+        return getattr(settings, "POKEDEX_SINGLE_FLIGHT_TIMEOUT", 10.0)
+
+    @staticmethod
+    def _poll_interval() -> float:
+        return getattr(settings, "POKEDEX_SINGLE_FLIGHT_POLL_INTERVAL", 0.01)
+
+    @staticmethod
+    def _shared() -> bool:
+        """Whether to coalesce across processes through the Django cache."""
+        shared = getattr(settings, "POKEDEX_SINGLE_FLIGHT_SHARED", None)
+        if shared is None:
+            return settings.CACHES["default"]["BACKEND"] not in _LOCAL_CACHE_BACKENDS
+        return shared
+
+    def _cache_key(self, key: Hashable, suffix: str) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return f"single-flight:{self.name}:{digest}:{suffix}"
+
+    def _record(self, counter: str, waited: Optional[float] = None) -> None:
+        with self._lock:
+            self._metrics[counter] += 1
+            if waited is not None:
+                self._metrics["wait_seconds_total"] += waited
+                self._metrics["wait_seconds_max"] = max(self._metrics["wait_seconds_max"], waited)
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Return `compute()`, sharing one computation among concurrent callers with the same key.
+
+        Args:
+            key: Canonical, hashable description of the input (its repr is
+                used for the cross-process lock, so it must be stable)
+            compute: Zero-argument function producing the result
+        """
+        with self._lock:
+            self._metrics["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            started = time.monotonic()
+            call.done.wait()
+            self._record("coalesced_local", time.monotonic() - started)
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if self._shared():
+                call.result = self._do_shared(key, compute)
+            else:
+                call.result = self._execute(compute)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _do_shared(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Compute under the cross-process lock, or wait for the process holding it."""
+        lock_key = self._cache_key(key, "lock")
+        result_key = self._cache_key(key, "result")
+        timeout = self._timeout()
+
+        if not cache.add(lock_key, True, timeout=timeout):
+            started = time.monotonic()
+            while time.monotonic() - started < timeout:
+                result = cache.get(result_key, _MISSING)
+                if result is not _MISSING:
+                    self._record("coalesced_remote", time.monotonic() - started)
+                    return result
+                if cache.get(lock_key) is None:
+                    break
+                time.sleep(self._poll_interval())
+            self._record("wait_fallbacks", time.monotonic() - started)
+            return self._execute(compute)
+
+        try:
+            result = self._execute(compute)
+            cache.set(result_key, result, timeout=self.RESULT_TTL)
+            return result
+        finally:
+            cache.delete(lock_key)
+
+    def _execute(self, compute: Callable[[], Any]) -> Any:
+        self._record("executions")
+        return compute()
+
+    def metrics(self) -> Dict:
+        """Get the coalescing counters and wait times (in seconds) of this flight group."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        waits = metrics["coalesced_local"] + metrics["coalesced_remote"] + metrics["wait_fallbacks"]
+        metrics["wait_seconds_avg"] = metrics["wait_seconds_total"] / waits if waits else 0.0
+        return metrics
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._metrics = {
+                "calls": 0,
+                "executions": 0,
+                "coalesced_local": 0,
+                "coalesced_remote": 0,
+                "wait_fallbacks": 0,
+                "wait_seconds_total": 0.0,
+                "wait_seconds_max": 0.0,
+            }
+
+    @classmethod
+    def all_metrics(cls) -> Dict[str, Dict]:
+        """Get the metrics of every flight group in this process, by name."""
+        return {name: flight.metrics() for name, flight in cls._registry.items()}
@@ -0,0 +1,52 @@
+from typing import List
+
+import numpy as np
+
+from pokedex.models import PokemonStats
+
+from .derived_columns import save_derived_columns
+from .pokemon_comparator import PokemonComparator, PokemonGroupComparator
+
+PERCENTILE_FIELDS = PokemonComparator.STAT_FIELDS + ["total"]
+
+
+class StatPercentileService:
+    """Service for materializing per-stat percentile ranks and roles on PokemonStats."""
+
+    @staticmethod
+    def percentile_ranks(values: np.ndarray) -> np.ndarray:
+        """
+        Percentile rank of every value in each column: the share (0-100) of
+        rows whose value is lower than or equal to it.
+        """
+        if not len(values):
+            return np.zeros(values.shape)
+        ordered = np.sort(values, axis=0)
+        ranks = np.empty(values.shape, dtype=np.float64)
+        for column in range(values.shape[1]):
+            ranks[:, column] = np.searchsorted(ordered[:, column], values[:, column], side="right")
+        return np.round(100 * ranks / len(values), 2)
+
+    @classmethod
+    def recompute(cls) -> int:
+        """
+        Recompute the percentile columns and roles of every PokemonStats row in bulk.
+
+        Returns:
+            Number of rows whose columns changed
+        """
+        stats: List[PokemonStats] = list(PokemonStats.objects.all())
+        matrix = np.array(
+            [[getattr(s, field) or 0 for field in PERCENTILE_FIELDS] for s in stats],
+            dtype=np.int64,
+        ).reshape(len(stats), len(PERCENTILE_FIELDS))
+
+        percentiles = cls.percentile_ranks(matrix)
+        roles = PokemonGroupComparator.classify_roles(matrix[:, : len(PokemonComparator.STAT_FIELDS)])
+
+        pct_fields = [f"{field}_pct" for field in PERCENTILE_FIELDS]
+        return save_derived_columns(
+            PokemonStats,
+            stats,
+            ({**dict(zip(pct_fields, row)), "role": role} for row, role in zip(percentiles.tolist(), roles)),
+        )
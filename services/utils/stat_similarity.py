@@ -0,0 +1,149 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from pokedex.models import Pokemon, PokemonStats
+from services.utils.dataset_version import DatasetVersionService
+
+from .pokemon_comparator import PokemonComparator, PokemonGroupComparator
+from .type_effectiveness import TypeEffectivenessService
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """One build of the similarity index, published as a whole and never mutated."""
+
+    dataset_version: str
+    ids: np.ndarray
+    names: List[str]
+    matrix: np.ndarray
+    unit: np.ndarray
+    roles: np.ndarray
+    type_masks: np.ndarray
+    row: Dict[int, int]
+
+
+class StatSimilarityIndex:
+    """
+    In-memory index of base-stat vectors for "similar Pokémon" queries.
+
+    The six base stats of every Pokémon with stats are kept in a contiguous
+    (N x 6) float array, alongside unit-length rows for cosine similarity,
+    each Pokémon's role and a bitmask of its types. A query is a single
+    vectorized pass over the array; with a Pokédex of this size that beats
+    building and walking a KD-tree. The index is rebuilt when the dataset
+    version changes.
+    """
+
+    METRICS = ("cosine", "euclidean")
+
+    _snapshot: Optional[_Snapshot] = None
+
+    @classmethod
+    def _build_index(cls) -> _Snapshot:
+        """
+        Get the current index, rebuilding it when the dataset version changes.
+
+        A rebuild fills locals and publishes them in one assignment, so a
+        concurrent query sees either the old index or the new one, never a mix.
+        """
+        version = DatasetVersionService.current_version()
+        snapshot = cls._snapshot
+        if snapshot is not None and snapshot.dataset_version == version:
+            return snapshot
+
+        stats = list(PokemonStats.objects.select_related("pokemon").order_by("pokemon_id"))
+        ids = [s.pokemon_id for s in stats]
+        matrix = np.ascontiguousarray(
+            [[getattr(s, field) or 0 for field in PokemonComparator.STAT_FIELDS] for s in stats],
+            dtype=np.float64,
+        ).reshape(len(stats), len(PokemonComparator.STAT_FIELDS))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+
+        type_index = TypeEffectivenessService.get_type_index()
+        row = {pokemon_id: i for i, pokemon_id in enumerate(ids)}
+        type_masks = np.zeros(len(ids), dtype=np.int64)
+        for pokemon_id, type_name in Pokemon.types.through.objects.filter(
+            pokemon_id__in=ids
+        ).values_list("pokemon_id", "pokemontype__name"):
+            if type_name in type_index:
+                type_masks[row[pokemon_id]] |= 1 << type_index[type_name]
+
+        snapshot = _Snapshot(
+            dataset_version=version,
+            ids=np.array(ids, dtype=np.int64),
+            names=[s.pokemon.name for s in stats],
+            matrix=matrix,
+            unit=np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0),
+            roles=np.array(PokemonGroupComparator.classify_roles(matrix), dtype=object),
+            type_masks=type_masks,
+            row=row,
+        )
+        for array in (snapshot.ids, snapshot.matrix, snapshot.unit, snapshot.roles, snapshot.type_masks):
+            array.setflags(write=False)
+        cls._snapshot = snapshot
+        return snapshot
+
+    @classmethod
+    def similar(
+        cls,
+        pokemon_id: int,
+        k: int = 10,
+        metric: str = "cosine",
+        same_role: bool = False,
+        shared_type: bool = False,
+    ) -> Optional[Dict]:
+        """
+        Find the k Pokémon whose base stats are closest to those of `pokemon_id`.
+
+        Args:
+            pokemon_id: ID of the reference Pokémon
+            k: Number of results
+            metric: "cosine" (higher similarity first) or "euclidean"
+                (smaller distance first)
+            same_role: Only return Pokémon with the same `classify_role` role
+            shared_type: Only return Pokémon sharing at least one type
+
+        Returns:
+            Dictionary with the reference Pokémon's role and the ranked
+            results, or None if the Pokémon has no stats saved
+        """
+        if metric not in cls.METRICS:
+            raise ValueError(f"metric must be one of: {', '.join(cls.METRICS)}")
+
+        index = cls._build_index()
+        row = index.row.get(pokemon_id)
+        if row is None:
+            return None
+
+        if metric == "cosine":
+            scores = index.unit @ index.unit[row]
+            order_key = -scores
+        else:
+            scores = np.linalg.norm(index.matrix - index.matrix[row], axis=1)
+            order_key = scores
+
+        eligible = np.ones(len(index.ids), dtype=bool)
+        eligible[row] = False
+        if same_role:
+            eligible &= index.roles == index.roles[row]
+        if shared_type:
+            eligible &= (index.type_masks & index.type_masks[row]) != 0
+
+        candidates = np.flatnonzero(eligible)
+        best = candidates[np.argsort(order_key[candidates], kind="stable")[:k]]
+
+        score_name = "similarity" if metric == "cosine" else "distance"
+        return {
+            "role": index.roles[row],
+            "results": [
+                {
+                    "id": int(index.ids[i]),
+                    "name": index.names[i],
+                    "role": index.roles[i],
+                    score_name: round(float(scores[i]), 4),
+                }
+                for i in best
+            ],
+        }
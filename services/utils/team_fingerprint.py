@@ -0,0 +1,45 @@
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from pokedex.models import Pokemon
+from services.utils.dataset_version import DatasetVersionService
+
+from .type_effectiveness import TypeEffectivenessService
+
+
+class TeamDataFingerprint:
+    """
+    Fingerprint of the data team synergy scores depend on.
+
+    A team's score is a function of the type effectiveness matrix and its
+    members' typings only, so the precomputed team tables (leaderboard and
+    percentile histogram) are keyed on a hash of the type order, the matrix
+    and every Pokémon's typing rather than on the dataset version. Edits to
+    names, sizes or stats bump the dataset version but leave the fingerprint,
+    and so the stored tables, unchanged. The fingerprint is recomputed at most
+    once per dataset version.
+    """
+
+    _cached: Optional[Tuple[str, str]] = None
+
+    @classmethod
+    def current(cls) -> str:
+        """Get the fingerprint of the current type and typing data (32 hex characters)."""
+        version = DatasetVersionService.current_version()
+        cached = cls._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        typings: Dict[int, List[str]] = {pokemon_id: [] for pokemon_id in Pokemon.objects.values_list("id", flat=True)}
+        for pokemon_id, type_name in Pokemon.types.through.objects.values_list("pokemon_id", "pokemontype__name"):
+            typings.setdefault(pokemon_id, []).append(type_name)
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update("|".join(TypeEffectivenessService.get_type_order()).encode())
+        digest.update(TypeEffectivenessService.get_effectiveness_matrix().tobytes())
+        for pokemon_id in sorted(typings):
+            digest.update(f";{pokemon_id}:{','.join(sorted(typings[pokemon_id]))}".encode())
+
+        fingerprint = digest.hexdigest()
+        cls._cached = (version, fingerprint)
+        return fingerprint
@@ -0,0 +1,299 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import chain, combinations_with_replacement, islice
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.db import transaction
+
+from pokedex.models import Pokemon
+from services.models import LeaderboardEntry, LeaderboardPartition
+
+from .search_worker import leaderboard_partition, setup_django
+from .team_fingerprint import TeamDataFingerprint
+from .team_scoring import TeamScoringKernel
+from .type_effectiveness import TypeEffectivenessService
+
+OVERALL = ""
+TEAM_SIZE = 6
+
+Board = Tuple[np.ndarray, np.ndarray]
+
+
+def top_k(scores: np.ndarray, combos: np.ndarray, k: int) -> Board:
+    """
+    Keep the k best rows, ordered by score and then by input order.
+
+    Ties at the cut-off are resolved in favour of earlier rows, so merging
+    boards in enumeration order gives the same result as one global pass.
+    """
+    count = len(scores)
+    if count > k:
+        kth = np.partition(scores, count - k)[count - k]
+        greater = np.flatnonzero(scores > kth)
+        equal = np.flatnonzero(scores == kth)[: k - len(greater)]
+        keep = np.sort(np.concatenate([greater, equal]))
+        scores, combos = scores[keep], combos[keep]
+    order = np.argsort(-scores, kind="stable")
+    return scores[order], combos[order]
+
+
+def search_partition(
+    first: int,
+    codes: np.ndarray,
+    group_rows: np.ndarray,
+    group_sizes: np.ndarray,
+    group_types: np.ndarray,
+    type_count: int,
+    top: int,
+    batch_size: int,
+) -> Tuple[Dict[int, List[Tuple[int, List[int]]]], int]:
+    """
+    Score every team whose smallest type-signature group is `first`.
+
+    Teams are multisets of signature groups (non-decreasing group indices),
+    each group used at most `group_sizes[g]` times, enumerated
+    lexicographically in batches of `batch_size` and scored with
+    `TeamScoringKernel.score_code_batch`. Only plain NumPy data is used, so
+    the search does not touch the database.
+
+    Returns:
+        ({-1 or type index: [(score, combo), ...]}, teams scored), where -1 is
+        the overall board and a type index the board of teams including it
+    """
+    tails = combinations_with_replacement(range(first, len(group_rows)), TEAM_SIZE - 1)
+    boards = {key: (np.empty(0, dtype=np.int64), np.empty((0, TEAM_SIZE), dtype=np.int64))
+              for key in range(-1, type_count)}
+    scored = 0
+
+    while True:
+        batch = list(islice(tails, batch_size))
+        if not batch:
+            break
+        combos = np.empty((len(batch), TEAM_SIZE), dtype=np.int64)
+        combos[:, 0] = first
+        combos[:, 1:] = np.fromiter(
+            chain.from_iterable(batch), dtype=np.int64, count=len(batch) * (TEAM_SIZE - 1)
+        ).reshape(len(batch), TEAM_SIZE - 1)
+
+        # Combos are sorted, so a group used more than `run` times shows up as equal columns `run` apart
+        legal = np.ones(len(combos), dtype=bool)
+        for run in range(1, TEAM_SIZE):
+            repeated = combos[:, run:] == combos[:, :-run]
+            legal &= ~(repeated & (group_sizes[combos[:, run:]] <= run)).any(axis=1)
+        combos = combos[legal]
+        scored += len(combos)
+
+        scores = TeamScoringKernel.score_code_batch(codes[group_rows[combos]])
+        team_types = np.bitwise_or.reduce(group_types[combos], axis=1)
+        for key, (best_scores, best_combos) in boards.items():
+            selected = slice(None) if key < 0 else (team_types >> key) & 1 == 1
+            boards[key] = top_k(
+                np.concatenate([best_scores, scores[selected]]),
+                np.concatenate([best_combos, combos[selected]]),
+                top,
+            )
+
+    results = {
+        key: list(zip(best_scores.tolist(), best_combos.tolist()))
+        for key, (best_scores, best_combos) in boards.items()
+    }
+    return results, scored
+
+
+class TeamLeaderboardService:
+    """
+    Materialized leaderboard of the highest-scoring teams.
+
+    Pokémon with the same typing are interchangeable for scoring, so the
+    build enumerates every legal multiset of distinct type signatures instead
+    of every team of Pokémon. The search space is split by the first
+    (smallest) signature group; each finished partition is stored, so an
+    interrupted build resumes where it stopped, and partitions can be spread
+    over a process pool. Once all partitions are done their boards are
+    merged into `LeaderboardEntry` rows, which is all the API reads.
+
+    Builds are keyed on `TeamDataFingerprint`, so they stay valid across
+    edits that can't change a score (names, stats); changes to types or to
+    which Pokémon have which typing need a rebuild. Member names are read
+    fresh on every request, but the member shown for each typing (the
+    highest stat total at build time) is only re-chosen by a rebuild.
+    """
+
+    DEFAULT_TOP_K = 20
+    DEFAULT_BATCH_SIZE = 200000
+
+    @staticmethod
+    def _stat_total(pokemon: Pokemon) -> int:
+        stats = getattr(pokemon, "stats", None)
+        return (stats.total or 0) if stats else 0
+
+    @classmethod
+    def _groups(cls) -> List[Tuple[Tuple[int, ...], List[Pokemon]]]:
+        """Group the Pokédex by type signature, strongest Pokémon first within a group."""
+        groups: Dict[Tuple[int, ...], List[Pokemon]] = {}
+        for pokemon in Pokemon.objects.select_related("stats").prefetch_related("types"):
+            signature = TypeEffectivenessService.get_type_signature(
+                t.name for t in pokemon.types.all()
+            )
+            if len(signature) <= 2:
+                groups.setdefault(signature, []).append(pokemon)
+
+        for members in groups.values():
+            members.sort(key=lambda p: (-cls._stat_total(p), p.id))
+        return sorted(groups.items())
+
+    @staticmethod
+    def search_arguments(groups: Sequence[Tuple[Tuple[int, ...], List[Pokemon]]], top: int, batch_size: int) -> Dict:
+        """Plain-data arguments for `search_partition` (excluding `first`)."""
+        table = TypeEffectivenessService.get_defensive_profile_table()
+        group_types = []
+        for signature, _ in groups:
+            mask = 0
+            for type_index in signature:
+                mask |= 1 << type_index
+            group_types.append(mask)
+
+        return {
+            "codes": table.codes,
+            "group_rows": np.array([table.signature_index[s] for s, _ in groups], dtype=np.intp),
+            "group_sizes": np.array([len(members) for _, members in groups], dtype=np.int64),
+            "group_types": np.array(group_types, dtype=np.int64),
+            "type_count": table.codes.shape[1],
+            "top": top,
+            "batch_size": batch_size,
+        }
+
+    @classmethod
+    def build(
+        cls,
+        top: int = DEFAULT_TOP_K,
+        workers: int = 1,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        restart: bool = False,
+        max_partitions: Optional[int] = None,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+    ) -> bool:
+        """
+        Search the partitions not yet stored for the current team data, then publish the leaderboard.
+
+        Args:
+            top: Teams kept per board
+            workers: Worker processes; 1 searches in this process
+            batch_size: Teams enumerated and scored per NumPy batch
+            restart: Discard stored partitions instead of resuming
+            max_partitions: Stop after searching this many partitions
+            progress: Called with (partition, teams scored, partitions left)
+
+        Returns:
+            True if every partition is done and the leaderboard was published
+        """
+        fingerprint = TeamDataFingerprint.current()
+        groups = cls._groups()
+        if sum(len(members) for _, members in groups) < TEAM_SIZE:
+            raise ValueError(f"At least {TEAM_SIZE} Pokémon are required to build a leaderboard")
+
+        stored = LeaderboardPartition.objects.filter(fingerprint=fingerprint)
+        if restart:
+            stored.delete()
+        LeaderboardPartition.objects.exclude(fingerprint=fingerprint).delete()
+
+        done = set(stored.values_list("partition", flat=True))
+        pending = [p for p in range(len(groups)) if p not in done][:max_partitions]
+        arguments = cls.search_arguments(groups, top, batch_size)
+
+        def save(partition: int, outcome) -> None:
+            results, scored = outcome
+            LeaderboardPartition.objects.create(
+                fingerprint=fingerprint,
+                partition=partition,
+                results={str(key): board for key, board in results.items()},
+                teams_scored=scored,
+            )
+            done.add(partition)
+            if progress:
+                progress(partition, scored, len(groups) - len(done))
+
+        if workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=setup_django) as pool:
+                futures = {
+                    pool.submit(leaderboard_partition, partition, arguments): partition
+                    for partition in pending
+                }
+                for future in as_completed(futures):
+                    save(futures[future], future.result())
+        else:
+            for partition in pending:
+                save(partition, search_partition(partition, **arguments))
+
+        if len(done) < len(groups):
+            return False
+        cls._publish(fingerprint, groups, arguments["type_count"], top)
+        return True
+
+    @classmethod
+    def _publish(cls, fingerprint: str, groups, type_count: int, top: int) -> None:
+        """Merge the partition boards (in enumeration order) into leaderboard rows."""
+        partitions = LeaderboardPartition.objects.filter(fingerprint=fingerprint).order_by("partition")
+        boards = {key: ([], []) for key in range(-1, type_count)}
+        for partition in partitions:
+            for key, board in partition.results.items():
+                scores, combos = boards[int(key)]
+                for score, combo in board:
+                    scores.append(score)
+                    combos.append(combo)
+
+        type_order = TypeEffectivenessService.get_type_order()
+        entries = []
+        for key, (scores, combos) in boards.items():
+            if not scores:
+                continue
+            best_scores, best_combos = top_k(np.array(scores), np.array(combos), top)
+            for rank, (score, combo) in enumerate(zip(best_scores.tolist(), best_combos.tolist()), start=1):
+                team = []
+                for group, count in sorted(Counter(combo).items()):
+                    team.extend(groups[group][1][:count])
+                entries.append(
+                    LeaderboardEntry(
+                        fingerprint=fingerprint,
+                        constraint=OVERALL if key < 0 else type_order[key],
+                        rank=rank,
+                        score=score,
+                        typings=[[type_order[i] for i in groups[g][0]] for g in combo],
+                        pokemon=[{"id": p.id, "name": p.name} for p in team],
+                    )
+                )
+
+        with transaction.atomic():
+            LeaderboardEntry.objects.all().delete()
+            LeaderboardEntry.objects.bulk_create(entries)
+        partitions.delete()
+
+    @staticmethod
+    def get_leaderboard(constraint: str = OVERALL, limit: Optional[int] = None) -> Optional[List[Dict]]:
+        """
+        Read the published leaderboard for the current team data.
+
+        Returns:
+            List of {"rank", "score", "typings", "pokemon"} rows, or None if
+            no leaderboard was built for the current types and typings
+        """
+        entries = LeaderboardEntry.objects.filter(fingerprint=TeamDataFingerprint.current())
+        if not entries.exists():
+            return None
+        rows = entries.filter(constraint=constraint).order_by("rank").values(
+            "rank", "score", "typings", "pokemon"
+        )
+        rows = list(rows[:limit] if limit else rows)
+
+        # Renames don't change the fingerprint, so names come from the Pokédex
+        names = dict(
+            Pokemon.objects.filter(
+                id__in={member["id"] for row in rows for member in row["pokemon"]}
+            ).values_list("id", "name")
+        )
+        for row in rows:
+            row["pokemon"] = [
+                {**member, "name": names.get(member["id"], member["name"])} for member in row["pokemon"]
+            ]
+        return rows
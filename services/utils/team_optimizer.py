@@ -0,0 +1,345 @@
+import heapq
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import repeat
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, List, MutableSequence, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from pokedex.models import Pokemon
+
+from .search_worker import search_branch, setup_django
+from .team_scoring import TeamScoringKernel
+from .type_effectiveness import TypeEffectivenessService
+
+MaskTuple = Tuple[int, int, int, int]
+SearchResult = Tuple[int, int, Tuple[int, ...]]
+
+_search_pool: Optional[ProcessPoolExecutor] = None
+_search_pool_workers = 0
+_search_pool_lock = threading.Lock()
+
+
+def get_search_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Get the process pool for parallel searches, creating it on first use.
+
+    The pool lives for the whole process, so requests do not pay for
+    starting workers and importing Django in them.
+    """
+    global _search_pool, _search_pool_workers
+    with _search_pool_lock:
+        if _search_pool is None or _search_pool_workers != workers:
+            if _search_pool is not None:
+                _search_pool.shutdown(wait=False)
+            _search_pool = ProcessPoolExecutor(max_workers=workers, initializer=setup_django)
+            _search_pool_workers = workers
+        return _search_pool
+
+
+def discard_search_pool() -> None:
+    """Drop the search pool (e.g. after a worker died) so the next search starts a new one."""
+    global _search_pool
+    with _search_pool_lock:
+        if _search_pool is not None:
+            _search_pool.shutdown(wait=False)
+            _search_pool = None
+
+
+def search_completions(
+    fixed_members: Sequence[MaskTuple],
+    fixed_types: int,
+    group_members: Sequence[MaskTuple],
+    group_sizes: Sequence[int],
+    group_types: Sequence[int],
+    remaining: int,
+    top_k: int,
+    required_types: int,
+    full_mask: int,
+    deadline: float,
+    partition: Optional[int] = None,
+    shared_floors: Optional[MutableSequence[int]] = None,
+) -> Tuple[List[SearchResult], bool, int]:
+    """
+    Branch-and-bound search for the top-k completions of a partial team.
+
+    Candidates are grouped by type signature: Pokémon with the same typing are
+    interchangeable for scoring, so the search enumerates multisets of groups
+    (each group used at most `group_sizes[g]` times) in group order. A branch
+    is cut when its `TeamScoringKernel.upper_bound` cannot beat the current
+    k-th best score, or when the remaining slots cannot cover the required
+    types. Type sets (`fixed_types`, `group_types`, `required_types`) are
+    bitmasks over type indices.
+
+    `partition` restricts the group picked for the first open slot, which
+    splits the search space for parallel runs. `shared_floors` then holds the
+    k-th best score of every partition (-1 until it has k teams): a branch is
+    also cut when its bound is below any partition's floor, or not above the
+    floor of an earlier partition, whose teams rank first on ties. Only plain
+    Python data is used, so the search does not touch the database.
+
+    Returns:
+        (results, complete, explored) where results are (score, -order, combo)
+        tuples, combo being the sorted group indices picked for the open slots,
+        and complete is False when the deadline cut the search short
+    """
+    coverable = 0
+    for members in group_members:
+        coverable |= members[1]
+
+    heap: List[SearchResult] = []
+    used = [0] * len(group_members)
+    chosen: List[int] = []
+    members = list(fixed_members)
+    state = {
+        "explored": 0,
+        "found": 0,
+        "timed_out": False,
+        "earlier_floor": -1,
+        "any_floor": -1,
+    }
+
+    def refresh() -> None:
+        if time.monotonic() > deadline:
+            state["timed_out"] = True
+        if shared_floors is not None:
+            floors = shared_floors[:]
+            state["earlier_floor"] = max(floors[:partition], default=-1)
+            state["any_floor"] = max(floors)
+
+    def visit(start: int, covered: int) -> None:
+        state["explored"] += 1
+        if state["explored"] % 256 == 1:
+            refresh()
+        if state["timed_out"]:
+            return
+
+        slots = remaining - len(chosen)
+        missing = (required_types & ~covered).bit_count()
+
+        if slots == 0:
+            if missing:
+                return
+            score = TeamScoringKernel.score_masks(TeamScoringKernel.combine(members, full_mask))
+            entry = (score, -state["found"], tuple(chosen))
+            state["found"] += 1
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif score > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+            else:
+                return
+            if shared_floors is not None and len(heap) == top_k:
+                shared_floors[partition] = heap[0][0]
+            return
+
+        # Each Pokémon covers at most two types
+        if missing > 2 * slots:
+            return
+        if len(heap) == top_k or state["any_floor"] >= 0:
+            bound = TeamScoringKernel.upper_bound(members, slots, coverable, full_mask)
+            if len(heap) == top_k and bound <= heap[0][0]:
+                return
+            if bound < state["any_floor"] or bound <= state["earlier_floor"]:
+                return
+
+        groups = range(start, len(group_members))
+        if partition is not None and not chosen:
+            groups = [partition]
+        for group in groups:
+            if used[group] == group_sizes[group]:
+                continue
+            used[group] += 1
+            chosen.append(group)
+            members.append(group_members[group])
+            visit(group, covered | group_types[group])
+            members.pop()
+            chosen.pop()
+            used[group] -= 1
+
+    visit(0, fixed_types)
+    return heap, not state["timed_out"], state["explored"]
+
+
+class TeamOptimizer:
+    """Searches for the best completions of a partial team by synergy score."""
+
+    TEAM_SIZE = 6
+    DEFAULT_TIME_BUDGET_MS = 2000
+
+    def __init__(
+        self,
+        fixed_pokemon: List[Pokemon],
+        candidates: Iterable[Pokemon],
+        top_k: int = 5,
+        required_types: Optional[Iterable[str]] = None,
+        time_budget_ms: int = DEFAULT_TIME_BUDGET_MS,
+        workers: Optional[int] = None,
+    ):
+        self.fixed = list(fixed_pokemon)
+        self.top_k = top_k
+        self.time_budget_ms = time_budget_ms
+        if workers is None:
+            workers = getattr(settings, "POKEDEX_TEAM_SEARCH_WORKERS", 1)
+        self.workers = workers
+        self.masks, self.full_mask = TeamScoringKernel.get_masks()
+
+        type_index = TypeEffectivenessService.get_type_index()
+        self.required_types = 0
+        for type_name in required_types or []:
+            self.required_types |= 1 << type_index[type_name]
+
+        self.groups = self._group_candidates(candidates)
+
+    @staticmethod
+    def _signature(pokemon: Pokemon) -> Tuple[int, ...]:
+        return TypeEffectivenessService.get_type_signature(t.name for t in pokemon.types.all())
+
+    @staticmethod
+    def _stat_total(pokemon: Pokemon) -> int:
+        stats = getattr(pokemon, "stats", None)
+        return (stats.total or 0) if stats else 0
+
+    @staticmethod
+    def _types_mask(signature: Tuple[int, ...]) -> int:
+        mask = 0
+        for type_index in signature:
+            mask |= 1 << type_index
+        return mask
+
+    def _group_candidates(self, candidates: Iterable[Pokemon]) -> List[Tuple[Tuple[int, ...], List[Pokemon]]]:
+        """
+        Group candidates by type signature.
+
+        Within a group the strongest Pokémon (by stat total) come first; groups
+        are ordered by their solo score so good teams are found early and the
+        bound starts pruning sooner.
+        """
+        fixed_ids = {p.id for p in self.fixed}
+        groups: Dict[Tuple[int, ...], List[Pokemon]] = {}
+        for pokemon in candidates:
+            if pokemon.id in fixed_ids:
+                continue
+            groups.setdefault(self._signature(pokemon), []).append(pokemon)
+
+        for members in groups.values():
+            members.sort(key=lambda p: (-self._stat_total(p), p.id))
+
+        def solo_score(signature: Tuple[int, ...]) -> int:
+            return TeamScoringKernel.score_masks(
+                TeamScoringKernel.combine([self.masks[signature]], self.full_mask)
+            )
+
+        return sorted(groups.items(), key=lambda item: (-solo_score(item[0]), item[0]))
+
+    def search_arguments(self) -> Dict:
+        """Plain-data arguments for `search_completions` (excluding `deadline`)."""
+        fixed_signatures = [self._signature(p) for p in self.fixed]
+        fixed_types = 0
+        for signature in fixed_signatures:
+            fixed_types |= self._types_mask(signature)
+
+        return {
+            "fixed_members": [self.masks[s] for s in fixed_signatures],
+            "fixed_types": fixed_types,
+            "group_members": [self.masks[signature] for signature, _ in self.groups],
+            "group_sizes": [len(members) for _, members in self.groups],
+            "group_types": [self._types_mask(signature) for signature, _ in self.groups],
+            "remaining": self.TEAM_SIZE - len(self.fixed),
+            "top_k": self.top_k,
+            "required_types": self.required_types,
+            "full_mask": self.full_mask,
+        }
+
+    def _expand(self, combo: Tuple[int, ...]) -> List[Pokemon]:
+        """Turn a multiset of group indices into concrete Pokémon."""
+        team = list(self.fixed)
+        for group, count in sorted(Counter(combo).items()):
+            team.extend(self.groups[group][1][:count])
+        return team
+
+    def _finish(
+        self,
+        results: List[Tuple[int, Tuple[int, ...], Tuple[int, ...]]],
+        complete: bool,
+        explored: int,
+    ) -> Dict:
+        """Rank (score, discovery order, combo) results and expand them into teams."""
+        ranked = sorted(results, key=lambda entry: (-entry[0], entry[1]))[: self.top_k]
+        return {
+            "teams": [
+                {"score": score, "team": self._expand(combo)}
+                for score, _, combo in ranked
+            ],
+            "complete": complete,
+            "explored": explored,
+        }
+
+    def _run_serial(self, deadline: float) -> Dict:
+        results, complete, explored = search_completions(
+            deadline=time.monotonic() + (deadline - time.time()), **self.search_arguments()
+        )
+        return self._finish(
+            [(score, (-order,), combo) for score, order, combo in results], complete, explored
+        )
+
+    def _run_parallel(self, deadline: float) -> Dict:
+        """
+        Search each first-slot group in its own task and merge the per-task top-k.
+
+        Partitions do not depend on the worker count, and merged results are
+        ordered by (score, partition, discovery order within the partition),
+        which is the discovery order of the serial search. Every team a task
+        prunes is either below the k-th best of some partition or beaten or
+        tied by k teams that rank before it, so the merged top-k matches the
+        serial one regardless of the number of workers.
+        """
+        branches = range(len(self.groups))
+        block = SharedMemory(create=True, size=4 * len(self.groups))
+        floors = block.buf.cast("i")
+        floors[:] = array("i", [-1] * len(self.groups))
+        try:
+            pool = get_search_pool(self.workers)
+            outcomes = list(
+                pool.map(
+                    search_branch,
+                    branches,
+                    repeat(deadline),
+                    repeat(self.search_arguments()),
+                    repeat(block.name),
+                )
+            )
+        except BrokenProcessPool:
+            discard_search_pool()
+            raise
+        finally:
+            floors.release()
+            block.close()
+            block.unlink()
+
+        merged = []
+        complete = True
+        explored = 0
+        for branch, (results, branch_complete, branch_explored) in zip(branches, outcomes):
+            merged.extend((score, (branch, -order), combo) for score, order, combo in results)
+            complete = complete and branch_complete
+            explored += branch_explored
+        return self._finish(merged, complete, explored)
+
+    def run(self) -> Dict:
+        """
+        Return the top-k teams found within the time budget.
+
+        `complete` is False when the budget ran out, in which case the teams
+        are the best found so far. With more than one worker the search is
+        spread over a process pool.
+        """
+        deadline = time.time() + self.time_budget_ms / 1000
+        if self.workers > 1 and len(self.groups) > 1:
+            return self._run_parallel(deadline)
+        return self._run_serial(deadline)
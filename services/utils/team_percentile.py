@@ -0,0 +1,191 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from django.conf import settings
+
+from pokedex.models import Pokemon
+from services.models import TeamScoreDistribution
+from services.utils.dataset_version import DatasetVersionService
+
+from .search_worker import sample_scores, setup_django
+from .team_fingerprint import TeamDataFingerprint
+from .type_effectiveness import TypeEffectivenessService
+
+DISTRIBUTION_KEY = "random-teams"
+MAX_SCORE = 100
+
+
+class TeamPercentileService:
+    """
+    Service for ranking a synergy score against random teams.
+
+    The reference distribution is a histogram of the scores of randomly drawn
+    legal teams (6 distinct Pokémon), built offline by the
+    `build_team_percentiles` command. At request time a score's percentile is
+    a single lookup into the cumulative histogram.
+
+    The distribution is keyed on `TeamDataFingerprint`, so it stays valid
+    across edits that can't change a team's score (names, stats); changes to
+    types or typings need a rebuild. The histogram is cached per stored
+    distribution row (fingerprint and `updated_at`); each process re-checks
+    the row when the dataset version changes and otherwise at most every
+    `POKEDEX_TEAM_PERCENTILE_CHECK_INTERVAL` seconds, so builds run by
+    another process (including `--force` rebuilds) are picked up without a
+    dataset version bump.
+    """
+
+    TEAM_SIZE = 6
+    DEFAULT_CHUNK_SIZE = 20000
+
+    _key = None
+    _checked_version = None
+    _checked_at = 0.0
+    _below = None
+    _total = 0
+
+    @staticmethod
+    def _check_interval() -> float:
+        return getattr(settings, "POKEDEX_TEAM_PERCENTILE_CHECK_INTERVAL", 5.0)
+
+    @classmethod
+    def _load(cls) -> Optional[np.ndarray]:
+        """Load the cumulative histogram for the current team data."""
+        version = DatasetVersionService.current_version()
+        fingerprint = TeamDataFingerprint.current()
+        now = time.monotonic()
+        if (
+            cls._key is not None
+            and cls._key[0] == fingerprint
+            and cls._checked_version == version
+            and now - cls._checked_at < cls._check_interval()
+        ):
+            return cls._below
+
+        distribution = (
+            TeamScoreDistribution.objects.filter(key=DISTRIBUTION_KEY, fingerprint=fingerprint)
+            .values_list("id", "updated_at")
+            .first()
+        )
+        key = (fingerprint, distribution)
+        if key != cls._key:
+            below, total = None, 0
+            if distribution is not None:
+                counts = np.asarray(
+                    TeamScoreDistribution.objects.values_list("histogram", flat=True).get(id=distribution[0]),
+                    dtype=np.int64,
+                )
+                # below[s] is the number of sampled teams scoring strictly less than s
+                below = np.concatenate(([0], np.cumsum(counts)[:-1]))
+                total = int(counts.sum())
+            cls._below = below
+            cls._total = total
+            cls._key = key
+        cls._checked_version = version
+        cls._checked_at = now
+        return cls._below
+
+    @classmethod
+    def percentile(cls, score: int) -> Optional[float]:
+        """
+        Get the share of random teams (in %) that score lower than `score`.
+
+        Returns None when no distribution was built for the current types and typings.
+        """
+        below = cls._load()
+        if below is None or not cls._total:
+            return None
+        return round(100 * float(below[min(max(score, 0), MAX_SCORE)]) / cls._total, 1)
+
+    @classmethod
+    def is_current(cls, sample_size: int, seed: int) -> bool:
+        """Check whether the stored distribution matches the team data and sampling settings."""
+        return TeamScoreDistribution.objects.filter(
+            key=DISTRIBUTION_KEY,
+            fingerprint=TeamDataFingerprint.current(),
+            sample_size=sample_size,
+            seed=seed,
+        ).exists()
+
+    @classmethod
+    def sample_histogram(
+        cls,
+        sample_size: int,
+        seed: int,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> np.ndarray:
+        """
+        Score `sample_size` random legal teams and histogram the scores.
+
+        The sample is split into fixed-size chunks, each with its own child of
+        `numpy.random.SeedSequence(seed)`, so the histogram depends only on the
+        seed and the chunk size, not on the number of workers.
+
+        Raises:
+            ValueError: if the dataset has fewer than 6 Pokémon
+        """
+        table = TypeEffectivenessService.get_defensive_profile_table()
+        codes = table.codes
+        pool_rows = np.array(
+            [table.signature_index[signature] for signature in cls._pool_signatures()],
+            dtype=np.intp,
+        )
+        if len(pool_rows) < cls.TEAM_SIZE:
+            raise ValueError(f"At least {cls.TEAM_SIZE} Pokémon are required to sample teams")
+
+        sizes = [chunk_size] * (sample_size // chunk_size)
+        if sample_size % chunk_size:
+            sizes.append(sample_size % chunk_size)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+        histogram = np.zeros(MAX_SCORE + 1, dtype=np.int64)
+        if workers > 1 and len(sizes) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=setup_django) as pool:
+                chunks = pool.map(
+                    sample_scores,
+                    [codes] * len(sizes),
+                    [pool_rows] * len(sizes),
+                    sizes,
+                    seeds,
+                )
+                for chunk in chunks:
+                    histogram += chunk
+        else:
+            for size, chunk_seed in zip(sizes, seeds):
+                histogram += sample_scores(codes, pool_rows, size, chunk_seed)
+        return histogram
+
+    @staticmethod
+    def _pool_signatures():
+        """Type signatures of every Pokémon that can be drawn into a team."""
+        for pokemon in Pokemon.objects.prefetch_related("types"):
+            signature = TypeEffectivenessService.get_type_signature(
+                t.name for t in pokemon.types.all()
+            )
+            if len(signature) <= 2:
+                yield signature
+
+    @classmethod
+    def build(
+        cls,
+        sample_size: int,
+        seed: int,
+        workers: int = 1,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> TeamScoreDistribution:
+        """Sample the reference distribution for the current team data and store it."""
+        fingerprint = TeamDataFingerprint.current()
+        histogram = cls.sample_histogram(sample_size, seed, workers, chunk_size)
+        distribution, _ = TeamScoreDistribution.objects.update_or_create(
+            key=DISTRIBUTION_KEY,
+            defaults={
+                "fingerprint": fingerprint,
+                "sample_size": sample_size,
+                "seed": seed,
+                "histogram": histogram.tolist(),
+            },
+        )
+        cls._key = None
+        return distribution
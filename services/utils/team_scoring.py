@@ -0,0 +1,213 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .type_effectiveness import TypeEffectivenessService
+
+# Profile codes index into PROFILE_MULTIPLIERS: 0 -> 0x, 1 -> 1/4x, 2 -> 1/2x, 3 -> 1x, 4 -> 2x, 5 -> 4x
+IMMUNE_CODE = 0
+NEUTRAL_CODE = 3
+QUAD_CODE = 5
+
+
+class TeamScoringKernel:
+    """
+    Bitset kernel for scoring teams from their type signatures.
+
+    Every typing is encoded as four integers with one bit per attacking type
+    (bit `i` is type `get_type_order()[i]`): weak, resisted-or-immune, immune
+    and 4x weak. A team's per-type counters are then bit-sliced sums of its
+    members' masks, so categories and the synergy score reduce to a handful of
+    bitwise operations and popcounts.
+    """
+
+    _masks = None
+    _source_codes = None
+    _full_mask = 0
+
+    @classmethod
+    def _build_masks(cls) -> Dict[Tuple[int, ...], Tuple[int, int, int, int]]:
+        """Build the per-signature masks from the defensive profile table."""
+        table = TypeEffectivenessService.get_defensive_profile_table()
+        codes = table.codes
+        if cls._masks is not None and cls._source_codes is codes:
+            return cls._masks
+
+        weights = np.left_shift(1, np.arange(codes.shape[1], dtype=np.int64))
+
+        def pack(bits: np.ndarray) -> List[int]:
+            return (bits.astype(np.int64) * weights).sum(axis=1).tolist()
+
+        weak = pack(codes > NEUTRAL_CODE)
+        resist_or_immune = pack(codes < NEUTRAL_CODE)
+        immune = pack(codes == IMMUNE_CODE)
+        quad = pack(codes == QUAD_CODE)
+
+        masks = {}
+        for signature, row in table.signature_index.items():
+            masks[signature] = (weak[row], resist_or_immune[row], immune[row], quad[row])
+
+        cls._full_mask = (1 << codes.shape[1]) - 1
+        cls._masks = masks
+        cls._source_codes = codes
+        return masks
+
+    @staticmethod
+    def _bit_sliced_count(masks: Sequence[int]) -> List[int]:
+        """
+        Add masks column-wise; slice `i` holds bit `i` of every per-type count.
+        """
+        slices = []
+        for carry in masks:
+            for i in range(len(slices)):
+                slices[i], carry = slices[i] ^ carry, slices[i] & carry
+                if not carry:
+                    break
+            if carry:
+                slices.append(carry)
+        return slices
+
+    @staticmethod
+    def _count_within(slices: List[int], region: int) -> int:
+        """Sum the per-type counts over the types set in `region`."""
+        return sum((s & region).bit_count() << i for i, s in enumerate(slices))
+
+    @classmethod
+    def get_masks(cls) -> Tuple[Dict[Tuple[int, ...], Tuple[int, int, int, int]], int]:
+        """
+        Get a read-only snapshot of the per-signature masks and the full type mask.
+
+        Both are plain Python objects, so they can be handed to code that has
+        no database access (e.g. worker processes).
+        """
+        masks = cls._build_masks()
+        return masks, cls._full_mask
+
+    @classmethod
+    def combine(cls, members: Sequence[Tuple[int, int, int, int]], full_mask: int) -> Dict:
+        """
+        Combine member masks into team-level matchup masks.
+
+        Returns:
+            Dictionary with the bit-sliced `weak` and `resist_or_immune`
+            counters, the `immune` slices, and the `major`, `balanced`,
+            `safe` and `quad` type masks
+        """
+        weak = cls._bit_sliced_count([m[0] for m in members])
+        resist_or_immune = cls._bit_sliced_count([m[1] for m in members])
+        immune = cls._bit_sliced_count([m[2] for m in members])
+
+        weak_any = 0
+        for s in weak:
+            weak_any |= s
+        weak_multiple = 0
+        for s in weak[1:]:
+            weak_multiple |= s
+        covered_any = 0
+        for s in resist_or_immune:
+            covered_any |= s
+        quad = 0
+        for m in members:
+            quad |= m[3]
+
+        return {
+            "weak": weak,
+            "resist_or_immune": resist_or_immune,
+            "immune": immune,
+            "major": weak_multiple & ~covered_any,
+            "balanced": weak_any & covered_any,
+            "safe": ~weak_any & covered_any & full_mask,
+            "quad": quad,
+        }
+
+    @classmethod
+    def team_masks(cls, signatures: Sequence[Tuple[int, ...]]) -> Dict:
+        """Compute the team-level matchup masks of a team given its type signatures."""
+        masks = cls._build_masks()
+        return cls.combine([masks[signature] for signature in signatures], cls._full_mask)
+
+    @classmethod
+    def score_masks(cls, team: Dict) -> int:
+        """Calculate the synergy score (see `TeamAnalysisService._calculate_synergy_score`) from team masks."""
+        major = team["major"]
+
+        # Each major threat costs weak_count * 5 + (worst_multiplier - 1) * 10,
+        # where worst_multiplier is 4 if any member is 4x weak and 2 otherwise
+        penalty = (
+            cls._count_within(team["weak"], major) * 5
+            + major.bit_count() * 10
+            + (major & team["quad"]).bit_count() * 20
+        )
+        reward = cls._count_within(team["resist_or_immune"], team["safe"]) * 3
+
+        return max(0, min(100, 70 - penalty + reward))
+
+    @classmethod
+    def upper_bound(
+        cls,
+        members: Sequence[Tuple[int, int, int, int]],
+        remaining: int,
+        coverable: int,
+        full_mask: int,
+    ) -> int:
+        """
+        Upper bound on the score of any team that extends `members` by `remaining` more.
+
+        Weaknesses never go away once a member has them, so a type that already
+        hits someone super effectively can at best end up balanced (0 points).
+        Every other type can at most become safe, with each remaining member
+        resisting it if any candidate in `coverable` can.
+        """
+        weak_any = 0
+        for m in members:
+            weak_any |= m[0]
+        open_types = ~weak_any & full_mask
+        resist_or_immune = cls._bit_sliced_count([m[1] for m in members])
+
+        reward = cls._count_within(resist_or_immune, open_types) + remaining * (
+            open_types & coverable
+        ).bit_count()
+        return max(0, min(100, 70 + reward * 3))
+
+    @staticmethod
+    def score_code_batch(team_codes: np.ndarray) -> np.ndarray:
+        """
+        Score many teams at once from their members' profile codes.
+
+        Args:
+            team_codes: (teams x members x types) array of profile codes, as
+                returned by `TypeEffectivenessService.get_defensive_profile_codes`
+
+        Returns:
+            1-D int array with one synergy score per team
+        """
+        weak = (team_codes > NEUTRAL_CODE).sum(axis=1)
+        covered = (team_codes < NEUTRAL_CODE).sum(axis=1)
+        quad = (team_codes == QUAD_CODE).any(axis=1)
+
+        major = (weak >= 2) & (covered == 0)
+        safe = (weak == 0) & (covered > 0)
+        penalty = np.where(major, weak * 5 + 10 + quad * 20, 0).sum(axis=1)
+        reward = np.where(safe, covered * 3, 0).sum(axis=1)
+        return np.clip(70 - penalty + reward, 0, 100)
+
+    @classmethod
+    def score(cls, signatures: Sequence[Tuple[int, ...]]) -> int:
+        """Score a team given its members' type signatures."""
+        return cls.score_masks(cls.team_masks(signatures))
+
+    @classmethod
+    def summarize(cls, signatures: Sequence[Tuple[int, ...]]) -> Dict:
+        """Score a team and list the attacking types in each matchup category."""
+        team = cls.team_masks(signatures)
+        type_order = TypeEffectivenessService.get_type_order()
+
+        def names(mask: int) -> List[str]:
+            return [t for i, t in enumerate(type_order) if (mask >> i) & 1]
+
+        return {
+            "score": cls.score_masks(team),
+            "major_threats": names(team["major"]),
+            "balanced_matchups": names(team["balanced"]),
+            "safe_matchups": names(team["safe"]),
+        }
@@ -0,0 +1,187 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.core import signing
+
+from pokedex.models import Pokemon
+
+from .type_effectiveness import TypeEffectivenessService
+
+COUNTERS = ("weak", "resist", "immune", "quad", "offense")
+
+
+class TeamStateError(ValueError):
+    """Raised when an edit cannot be applied to a team state."""
+
+
+class TeamState:
+    """
+    Incrementally maintained team analysis.
+
+    The state keeps, per attacking type, how many members are weak to it,
+    resist it, are immune to it and are 4x weak to it, plus how many members
+    hit each defending type super effectively. Adding or removing a member
+    adds or subtracts that member's profile rows, so every edit costs one
+    pass over the type list instead of a full re-analysis. The state travels
+    to the client as a signed token, which keeps the API stateless.
+    """
+
+    TEAM_SIZE = 6
+    TOKEN_SALT = "pokedex.team-state"
+
+    def __init__(
+        self,
+        version: str,
+        members: Optional[List[Tuple[int, Tuple[int, ...]]]] = None,
+        counts: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.version = version
+        self.members = members or []
+        type_count = len(TypeEffectivenessService.get_type_order())
+        self.counts = counts or {
+            name: np.zeros(type_count, dtype=np.int64) for name in COUNTERS
+        }
+
+    @classmethod
+    def from_pokemon(cls, team_pokemon: Sequence[Pokemon]) -> "TeamState":
+        """Build a state from Pokémon with their types prefetched."""
+        state = cls(TypeEffectivenessService.get_version())
+        for pokemon in team_pokemon:
+            state.add(pokemon)
+        return state
+
+    @classmethod
+    def from_token(cls, token: str) -> "TeamState":
+        """
+        Restore a state from a token issued by `to_token`.
+
+        If the dataset changed since the token was issued, the members are
+        re-read and the counters rebuilt from scratch.
+
+        Raises:
+            TeamStateError: if the token is invalid or tampered with
+        """
+        try:
+            payload = signing.loads(token, salt=cls.TOKEN_SALT)
+        except signing.BadSignature:
+            raise TeamStateError("Invalid team state")
+
+        if payload["version"] != TypeEffectivenessService.get_version():
+            ids = [pokemon_id for pokemon_id, _ in payload["members"]]
+            found = Pokemon.objects.prefetch_related("types").in_bulk(ids)
+            return cls.from_pokemon([found[i] for i in ids if i in found])
+
+        return cls(
+            payload["version"],
+            [(pokemon_id, tuple(signature)) for pokemon_id, signature in payload["members"]],
+            {name: np.array(payload["counts"][name], dtype=np.int64) for name in COUNTERS},
+        )
+
+    def to_token(self) -> str:
+        """Serialize the state into a signed, compressed token."""
+        payload = {
+            "version": self.version,
+            "members": [[pokemon_id, list(signature)] for pokemon_id, signature in self.members],
+            "counts": {name: self.counts[name].tolist() for name in COUNTERS},
+        }
+        return signing.dumps(payload, salt=self.TOKEN_SALT, compress=True)
+
+    @staticmethod
+    def _signature(pokemon: Pokemon) -> Tuple[int, ...]:
+        return TypeEffectivenessService.get_type_signature(t.name for t in pokemon.types.all())
+
+    @staticmethod
+    def _contribution(signature: Tuple[int, ...]) -> Dict[str, np.ndarray]:
+        """Get the counter rows a member with this typing contributes."""
+        profile = TypeEffectivenessService.get_signature_profiles([signature])[0]
+        matrix = TypeEffectivenessService.get_effectiveness_matrix()
+        if signature:
+            offense = (matrix[list(signature)] > 1).any(axis=0)
+        else:
+            offense = np.zeros(matrix.shape[1], dtype=bool)
+
+        return {
+            "weak": profile > 1,
+            "resist": (profile > 0) & (profile < 1),
+            "immune": profile == 0,
+            "quad": profile > 2,
+            "offense": offense,
+        }
+
+    def _apply(self, signature: Tuple[int, ...], sign: int) -> None:
+        for name, row in self._contribution(signature).items():
+            self.counts[name] += sign * row
+
+    def member_ids(self) -> List[int]:
+        """Get the member IDs in team order."""
+        return [pokemon_id for pokemon_id, _ in self.members]
+
+    def add(self, pokemon: Pokemon) -> None:
+        """Add a member (with types prefetched)."""
+        if pokemon.id in self.member_ids():
+            raise TeamStateError(f"Pokémon '{pokemon.name}' is already in the team")
+        if len(self.members) >= self.TEAM_SIZE:
+            raise TeamStateError(f"A team has at most {self.TEAM_SIZE} Pokémon")
+
+        signature = self._signature(pokemon)
+        self.members.append((pokemon.id, signature))
+        self._apply(signature, 1)
+
+    def remove(self, pokemon_id: int) -> None:
+        """Remove a member by ID; its typing is taken from the state, so no query is needed."""
+        for position, (member_id, signature) in enumerate(self.members):
+            if member_id == pokemon_id:
+                del self.members[position]
+                self._apply(signature, -1)
+                return
+        raise TeamStateError(f"Pokémon '{pokemon_id}' is not in the team")
+
+    def replace(self, pokemon_id: int, pokemon: Pokemon) -> None:
+        """Swap a member for another Pokémon (with types prefetched), keeping its position."""
+        member_ids = self.member_ids()
+        if pokemon_id not in member_ids:
+            raise TeamStateError(f"Pokémon '{pokemon_id}' is not in the team")
+        if pokemon.id != pokemon_id and pokemon.id in member_ids:
+            raise TeamStateError(f"Pokémon '{pokemon.name}' is already in the team")
+
+        position = member_ids.index(pokemon_id)
+        _, old_signature = self.members[position]
+        signature = self._signature(pokemon)
+        self.members[position] = (pokemon.id, signature)
+        self._apply(old_signature, -1)
+        self._apply(signature, 1)
+
+    def summary(self) -> Dict:
+        """
+        Derive categories, offensive coverage and the synergy score from the counters.
+
+        Matches `TeamAnalysisService.analyze_team_synergy(..., detailed=False)`
+        for the same members.
+        """
+        type_order = TypeEffectivenessService.get_type_order()
+        weak = self.counts["weak"]
+        covered = self.counts["resist"] + self.counts["immune"]
+
+        major = (weak >= 2) & (covered == 0)
+        balanced = (weak > 0) & (covered > 0)
+        safe = (weak == 0) & (covered > 0)
+
+        if self.members:
+            worst = np.where(self.counts["quad"] > 0, 4, 2)
+            penalty = (weak[major] * 5 + (worst[major] - 1) * 10).sum()
+            reward = (covered[safe] * 3).sum()
+            score = int(max(0, min(100, 70 - penalty + reward)))
+        else:
+            score = 0
+
+        def names(mask: np.ndarray) -> List[str]:
+            return [type_order[i] for i in np.flatnonzero(mask)]
+
+        return {
+            "score": score,
+            "major_threats": names(major),
+            "balanced_matchups": names(balanced),
+            "safe_matchups": names(safe),
+            "offensive_coverage": names(self.counts["offense"] > 0),
+            "offensive_gaps": names(self.counts["offense"] == 0),
+        }
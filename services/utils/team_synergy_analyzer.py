@@ -1,8 +1,13 @@
 from collections import defaultdict
-from typing import Dict, List, Set, Tuple
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+from django.conf import settings
 
 from pokedex.models import Pokemon
 
+from .team_scoring import TeamScoringKernel
 from .type_effectiveness import TypeEffectivenessService
 
 
@@ -10,12 +15,20 @@ class TeamAnalysisService:
     """Service for analyzing Pokémon team synergy."""
 
     @staticmethod
-    def analyze_team_synergy(team_pokemon: List[Pokemon]) -> Dict:
+    def analyze_team_synergy(
+        team_pokemon: List[Pokemon], detailed: bool = True, prefetched: bool = False
+    ) -> Dict:
         """
         Analyze a team of Pokémon with a focus on team-level matchups.
 
         Args:
             team_pokemon: List of Pokémon objects to analyze
+            detailed: When False, skip the name-annotated breakdown and return
+                only the score and the attacking type names per category,
+                computed by the bitset kernel
+            prefetched: When True, the Pokémon already have their types
+                prefetched and are used as given instead of being re-queried
+                (repeated Pokémon still count once, as when re-queried)
 
         Returns:
             Dictionary containing synergy analysis results
@@ -32,18 +45,55 @@ class TeamAnalysisService:
             }
 
         # Prefetch types to avoid N+1 queries
-        team_with_types = Pokemon.objects.filter(
-            id__in=[p.id for p in team_pokemon]
-        ).prefetch_related("types")
+        if prefetched:
+            team_with_types = list(dict.fromkeys(team_pokemon))
+        else:
+            team_with_types = list(
+                Pokemon.objects.filter(
+                    id__in=[p.id for p in team_pokemon]
+                ).prefetch_related("types")
+            )
+
+        if not detailed:
+            return TeamScoringKernel.summarize(
+                TeamAnalysisService.get_team_signatures(team_with_types)
+            )
+
+        # Analyze the typings in canonical (signature) order, so that teams
+        # with the same multiset of typings share one cached analysis
+        signatures = TeamAnalysisService.get_team_signatures(team_with_types)
+        order = sorted(range(len(signatures)), key=lambda i: (signatures[i], i))
+        structure = TeamAnalysisService._analyze_signatures(
+            tuple(signatures[i] for i in order), TypeEffectivenessService.get_version()
+        )
+
+        return TeamAnalysisService._apply_names(
+            structure, [(i, team_with_types[i].name) for i in order]
+        )
 
-        # Get all type names
-        all_type_names = TypeEffectivenessService.get_all_type_names()
+    @staticmethod
+    @lru_cache(maxsize=getattr(settings, "POKEDEX_TEAM_ANALYSIS_CACHE_SIZE", 4096))
+    def _analyze_signatures(signatures: Tuple[Tuple[int, ...], ...], version: str) -> Dict:
+        """
+        Analyze a team given its sorted type signatures.
+
+        Members are labelled by their slot in `signatures` instead of by name;
+        `_apply_names` turns the result into the per-team breakdown. `version`
+        is the dataset version, which keeps stale entries from being served.
+        """
+        # Get all type names in matrix order
+        type_order = TypeEffectivenessService.get_type_order()
+        slots = list(range(len(signatures)))
+        member_types = [[type_order[i] for i in signature] for signature in signatures]
+
+        # Multiplier of every attacking type against every team member
+        team_multipliers = TypeEffectivenessService.get_signature_profiles(signatures)
 
         # Analyze each type against the team
         type_analysis = {}
-        for attacking_type in all_type_names:
+        for index, attacking_type in enumerate(type_order):
             analysis = TeamAnalysisService._analyze_type_matchup(
-                attacking_type, team_with_types
+                attacking_type, slots, team_multipliers[:, index]
             )
             type_analysis[attacking_type] = analysis
 
@@ -54,7 +104,7 @@ class TeamAnalysisService:
 
         # Analyze offensive coverage
         offensive_strengths = TeamAnalysisService._analyze_offensive_coverage(
-            team_with_types, all_type_names
+            list(zip(slots, member_types))
         )
 
         # Calculate synergy score
@@ -76,44 +126,99 @@ class TeamAnalysisService:
         }
 
     @staticmethod
-    def _analyze_type_matchup(attacking_type: str, team_pokemon: List[Pokemon]) -> Dict:
-        """Analyze how a specific type affects the team."""
-        weak_count = 0
-        resist_count = 0
-        immune_count = 0
+    def _apply_names(structure: Dict, members: List[Tuple[int, str]]) -> Dict:
+        """
+        Build a team's breakdown from a slot-labelled analysis.
+
+        `members[slot]` is the (team position, name) of the Pokémon in that
+        slot. Member lists are returned in team order, as if the team had been
+        analyzed directly. The cached structure itself is never modified.
+        """
+
+        def named(entries: List[Dict]) -> List[Dict]:
+            ordered = sorted(entries, key=lambda entry: members[entry["name"]][0])
+            return [{**entry, "name": members[entry["name"]][1]} for entry in ordered]
+
+        def annotate(matchups: List[Dict]) -> List[Dict]:
+            result = []
+            for matchup in matchups:
+                matchup = dict(matchup)
+                for key in ("vulnerable_pokemon", "resistant_pokemon", "immune_pokemon"):
+                    if key in matchup:
+                        matchup[key] = named(matchup[key])
+                result.append(matchup)
+            return result
+
+        return {
+            "score": structure["score"],
+            "major_threats": annotate(structure["major_threats"]),
+            "balanced_matchups": annotate(structure["balanced_matchups"]),
+            "safe_matchups": annotate(structure["safe_matchups"]),
+            "suggestions": list(structure["suggestions"]),
+        }
+
+    @staticmethod
+    def cache_info() -> Dict:
+        """Get hit/miss counters and size of the signature-keyed analysis cache."""
+        info = TeamAnalysisService._analyze_signatures.cache_info()
+        return {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+        }
+
+    @staticmethod
+    def get_team_signatures(team_pokemon: List[Pokemon]) -> List[Tuple[int, ...]]:
+        """Get the canonical type signature of each team member."""
+        return [
+            TypeEffectivenessService.get_type_signature(t.name for t in pokemon.types.all())
+            for pokemon in team_pokemon
+        ]
+
+    @staticmethod
+    def score_team(signatures: List[Tuple[int, ...]]) -> int:
+        """
+        Fast-path synergy score for a team given its members' type signatures.
+
+        Matches the score of `analyze_team_synergy` without building any of
+        the breakdown, which makes it suitable for scoring many candidate teams.
+        """
+        return TeamScoringKernel.score(signatures)
+
+    @staticmethod
+    def _analyze_type_matchup(
+        attacking_type: str, member_names: List, multipliers: np.ndarray
+    ) -> Dict:
+        """
+        Analyze how a specific type affects the team.
+
+        `multipliers` holds the attacking type's effectiveness against each
+        team member, in the order of `member_names`.
+        """
         vulnerable_pokemon = []
         resistant_pokemon = []
         immune_pokemon = []
-        worst_multiplier = 1.0
-
-        for pokemon in team_pokemon:
-            # Get the Pokémon's types
-            pokemon_types = [t.name for t in pokemon.types.all()]
-
-            # Calculate effectiveness
-            effectiveness = TypeEffectivenessService.calculate_effectiveness(
-                attacking_type, pokemon_types
-            )
 
-            # Track counts
+        for name, effectiveness in zip(member_names, multipliers.tolist()):
             if effectiveness > 1:
-                weak_count += 1
                 vulnerable_pokemon.append(
-                    {"name": pokemon.name, "effectiveness": effectiveness}
+                    {"name": name, "effectiveness": effectiveness}
                 )
-                if effectiveness > worst_multiplier:
-                    worst_multiplier = effectiveness
             elif effectiveness < 1 and effectiveness > 0:
-                resist_count += 1
                 resistant_pokemon.append(
-                    {"name": pokemon.name, "effectiveness": effectiveness}
+                    {"name": name, "effectiveness": effectiveness}
                 )
             elif effectiveness == 0:
-                immune_count += 1
                 immune_pokemon.append(
-                    {"name": pokemon.name, "effectiveness": effectiveness}
+                    {"name": name, "effectiveness": effectiveness}
                 )
 
+        weak_count = len(vulnerable_pokemon)
+        resist_count = len(resistant_pokemon)
+        immune_count = len(immune_pokemon)
+        worst_multiplier = float(multipliers.max(initial=1.0))
+
         return {
             "weak_count": weak_count,
             "resist_count": resist_count,
@@ -178,30 +283,36 @@ class TeamAnalysisService:
         return major_threats, balanced_matchups, safe_matchups
 
     @staticmethod
-    def _analyze_offensive_coverage(
-        team_pokemon: List[Pokemon], all_type_names: Set[str]
-    ) -> List[Dict]:
-        """Analyze which types the team can hit super effectively."""
-        offensive_coverage = defaultdict(list)
+    def _analyze_offensive_coverage(members: List[Tuple]) -> List[Dict]:
+        """
+        Analyze which types the team can hit super effectively.
 
-        for defending_type in all_type_names:
-            for pokemon in team_pokemon:
-                # Get the Pokémon's types
-                pokemon_types = [t.name for t in pokemon.types.all()]
-
-                # Check if any of the Pokémon's types are super effective against the defending type
-                for pokemon_type in pokemon_types:
-                    effectiveness = TypeEffectivenessService.calculate_effectiveness(
-                        pokemon_type, [defending_type]
-                    )
-                    if effectiveness > 1:
-                        offensive_coverage[defending_type].append(
-                            {
-                                "pokemon": pokemon.name,
-                                "type": pokemon_type,
-                                "effectiveness": effectiveness,
-                            }
-                        )
+        `members` holds a (name, type names) pair per team member.
+        """
+        type_order = TypeEffectivenessService.get_type_order()
+        matrix = TypeEffectivenessService.get_effectiveness_matrix()
+        type_index = TypeEffectivenessService.get_type_index()
+
+        # One row per (Pokémon, own type) pair
+        attackers = [
+            (name, type_name)
+            for name, type_names in members
+            for type_name in type_names
+            if type_name in type_index
+        ]
+        offensive_coverage = defaultdict(list)
+        if attackers:
+            rows = matrix[[type_index[type_name] for _, type_name in attackers]]
+            # Iterate defending types first so coverage keeps a stable type order
+            for column, row in zip(*np.nonzero(rows.T > 1)):
+                pokemon_name, pokemon_type = attackers[row]
+                offensive_coverage[type_order[column]].append(
+                    {
+                        "pokemon": pokemon_name,
+                        "type": pokemon_type,
+                        "effectiveness": float(rows[row, column]),
+                    }
+                )
 
         # Format for response
         strengths = []
@@ -281,11 +392,12 @@ class TeamAnalysisService:
             )
 
         # Highlight offensive coverage gaps
-        all_type_names = TypeEffectivenessService.get_all_type_names()
         covered_types = set(
             [s["type"] for s in offensive_strengths if s["best_effectiveness"] >= 2]
         )
-        uncovered_types = all_type_names - covered_types
+        uncovered_types = [
+            t for t in TypeEffectivenessService.get_type_order() if t not in covered_types
+        ]
 
         if uncovered_types:
             suggestions.append(
@@ -302,15 +414,10 @@ class TeamAnalysisService:
     @staticmethod
     def _find_types_that_resist(attacking_type: str) -> List[str]:
         """Find types that resist a given attacking type."""
-        resisting_types = []
-        all_type_names = TypeEffectivenessService.get_all_type_names()
-
-        for defending_type in all_type_names:
-            effectiveness = TypeEffectivenessService.calculate_effectiveness(
-                attacking_type, [defending_type]
-            )
-
-            if effectiveness < 1:
-                resisting_types.append(defending_type)
+        type_index = TypeEffectivenessService.get_type_index()
+        if attacking_type not in type_index:
+            return []
 
-        return resisting_types
+        type_order = TypeEffectivenessService.get_type_order()
+        row = TypeEffectivenessService.get_effectiveness_matrix()[type_index[attacking_type]]
+        return [type_order[i] for i in np.flatnonzero(row < 1)]
@@ -1,65 +1,275 @@
-from typing import Dict, List, Set
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 
 from pokedex.models import PokemonType
+from services.utils.dataset_version import DatasetVersionService
+
+# Every multiplier a single or dual typing can take; profile codes index into this
+PROFILE_MULTIPLIERS = np.array([0.0, 0.25, 0.5, 1.0, 2.0, 4.0], dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class _Tables:
+    """One build of the effectiveness matrix and its type lookups, published as a whole."""
+
+    dataset_version: str
+    matrix: np.ndarray
+    type_order: Tuple[str, ...]
+    type_index: Dict[str, int]
+    type_names: Set[str]
+
+
+@dataclass(frozen=True)
+class DefensiveProfileTable:
+    """One build of the defensive profile table, published as a whole and never mutated."""
+
+    dataset_version: str
+    codes: np.ndarray
+    signature_index: Dict[Tuple[int, ...], int]
 
 
 class TypeEffectivenessService:
     """Service for calculating type effectiveness."""
 
-    _effectiveness_matrix = None
-    _type_names = None
+    _tables: Optional[_Tables] = None
+    _profiles: Optional[DefensiveProfileTable] = None
 
     @classmethod
-    def _build_effectiveness_matrix(cls) -> Dict[str, Dict[str, float]]:
-        """Build a matrix of type effectiveness relationships."""
-        if cls._effectiveness_matrix is not None:
-            return cls._effectiveness_matrix
+    def _build_tables(cls) -> _Tables:
+        """
+        Build a dense matrix of type effectiveness relationships.
+
+        Rows are attacking types and columns are defending types, both keyed
+        by the integer index from `get_type_index()`. One extra neutral row and
+        column (index == number of types) is appended so unknown type names and
+        padding slots resolve to a 1.0 multiplier without special casing.
+
+        The matrix is rebuilt lazily whenever the dataset version changes, and
+        published together with its type lookups in one assignment.
+        """
+        version = DatasetVersionService.current_version()
+        tables = cls._tables
+        if tables is not None and tables.dataset_version == version:
+            return tables
 
         # Build the matrix from database
-        matrix = {}
-        all_types = PokemonType.objects.all()
+        all_types = list(PokemonType.objects.order_by("name"))
+        type_order = tuple(t.name for t in all_types)
+        type_index = {name: index for index, name in enumerate(type_order)}
+
+        # Initialize all matchups to 1.0 (neutral)
+        matrix = np.ones((len(type_order) + 1, len(type_order) + 1), dtype=np.float64)
 
         for attacking_type in all_types:
-            matrix[attacking_type.name] = {}
-            damage_relations = attacking_type.damage_relations
+            row = type_index[attacking_type.name]
+            damage_relations = attacking_type.damage_relations or {}
+
+            for relation, multiplier in (
+                ("double_damage_to", 2.0),
+                ("half_damage_to", 0.5),
+                ("no_damage_to", 0.0),
+            ):
+                for defending_type in damage_relations.get(relation, []):
+                    column = type_index.get(defending_type["name"])
+                    if column is not None:
+                        matrix[row, column] = multiplier
+
+        matrix.setflags(write=False)
+        tables = _Tables(
+            dataset_version=version,
+            matrix=matrix,
+            type_order=type_order,
+            type_index=type_index,
+            type_names=set(type_order),
+        )
+        cls._tables = tables
+        return tables
+
+    @classmethod
+    def _build_effectiveness_matrix(cls) -> np.ndarray:
+        """Get the effectiveness matrix, with its neutral row and column."""
+        return cls._build_tables().matrix
+
+    @classmethod
+    def get_version(cls) -> str:
+        """Get the dataset version the current tables were built from."""
+        return cls._build_tables().dataset_version
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop all cached tables so the next call rebuilds them."""
+        cls._tables = None
+        cls._profiles = None
+
+    @classmethod
+    def get_type_order(cls) -> Tuple[str, ...]:
+        """Get all type names ordered by their matrix index."""
+        return cls._build_tables().type_order
+
+    @classmethod
+    def get_type_index(cls) -> Dict[str, int]:
+        """Get the mapping of type name to matrix index."""
+        return cls._build_tables().type_index
+
+    @classmethod
+    def get_effectiveness_matrix(cls) -> np.ndarray:
+        """Get the read-only (attacking x defending) matrix without the neutral row/column."""
+        matrix = cls._build_effectiveness_matrix()
+        return matrix[:-1, :-1]
+
+    @classmethod
+    def encode_types(cls, type_names: Iterable[str]) -> List[int]:
+        """Map type names to matrix indices; unknown names map to the neutral slot."""
+        type_index = cls.get_type_index()
+        neutral = len(type_index)
+        return [type_index.get(name, neutral) for name in type_names]
+
+    @classmethod
+    def encode_type_sets(cls, type_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """
+        Encode a list of defending type sets as a padded (len(type_sets) x width)
+        index array. Missing slots are filled with the neutral index.
+        """
+        encoded = [cls.encode_types(types) for types in type_sets]
+        neutral = len(cls.get_type_index())
+        width = max([len(types) for types in encoded] + [1])
+        padded = np.full((len(encoded), width), neutral, dtype=np.intp)
+        for row, indices in enumerate(encoded):
+            padded[row, : len(indices)] = indices
+        return padded
+
+    @classmethod
+    def calculate_effectiveness_batch(
+        cls, attacking_types: Sequence[str], defending_type_sets: Sequence[Iterable[str]]
+    ) -> np.ndarray:
+        """
+        Calculate effectiveness for many (attacking type, defending types) pairs at once.
+
+        Args:
+            attacking_types: Attacking type names, one per pair
+            defending_type_sets: Defending type name collections, one per pair
 
-            # Initialize all matchups to 1.0 (neutral)
-            for defending_type in all_types:
-                matrix[attacking_type.name][defending_type.name] = 1.0
+        Returns:
+            1-D array of multipliers aligned with the input pairs
+        """
+        if len(attacking_types) != len(defending_type_sets):
+            raise ValueError("attacking_types and defending_type_sets must have the same length")
 
-            # Apply double damage
-            for double_damage in damage_relations.get("double_damage_to", []):
-                matrix[attacking_type.name][double_damage["name"]] = 2.0
+        matrix = cls._build_effectiveness_matrix()
+        attackers = np.asarray(cls.encode_types(attacking_types), dtype=np.intp)
+        defenders = cls.encode_type_sets(defending_type_sets)
+        return matrix[attackers[:, None], defenders].prod(axis=1)
 
-            # Apply half damage
-            for half_damage in damage_relations.get("half_damage_to", []):
-                matrix[attacking_type.name][half_damage["name"]] = 0.5
+    @classmethod
+    def defensive_multipliers(cls, defending_type_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """
+        Calculate the multiplier of every attacking type against each defending type set.
 
-            # Apply no damage
-            for no_damage in damage_relations.get("no_damage_to", []):
-                matrix[attacking_type.name][no_damage["name"]] = 0.0
+        Returns:
+            (len(defending_type_sets) x number of types) array, columns ordered
+            as `get_type_order()`
+        """
+        matrix = cls._build_effectiveness_matrix()
+        defenders = cls.encode_type_sets(defending_type_sets)
+        # matrix[:-1, defenders] has shape (types, sets, width)
+        return matrix[:-1, defenders].prod(axis=2).T
 
-        cls._effectiveness_matrix = matrix
-        return matrix
+    @classmethod
+    def _build_defensive_profiles(cls) -> DefensiveProfileTable:
+        """
+        Precompute the defensive profile of every typing.
+
+        Row 0 is the typeless profile, followed by every single typing and every
+        unordered dual typing. Each row stores, per attacking type, an int8 code
+        indexing into PROFILE_MULTIPLIERS. The codes and the signature -> row
+        map are published together, tagged with the dataset version they were
+        built from, so a build that finishes after a newer one can't be paired
+        with the newer one's lookups.
+        """
+        tables = cls._build_tables()
+        profiles = cls._profiles
+        if profiles is not None and profiles.dataset_version == tables.dataset_version:
+            return profiles
+
+        matrix = tables.matrix[:-1, :-1]
+        type_count = matrix.shape[0]
+
+        # singles[d, a] is the multiplier of attacking type a against defending type d
+        singles = matrix.T
+        first, second = np.triu_indices(type_count, k=1)
+        profiles = np.vstack(
+            [np.ones((1, type_count)), singles, singles[first] * singles[second]]
+        )
+
+        signatures = (
+            [()]
+            + [(i,) for i in range(type_count)]
+            + list(zip(first.tolist(), second.tolist()))
+        )
+
+        codes = np.searchsorted(PROFILE_MULTIPLIERS, profiles).astype(np.int8)
+        codes.setflags(write=False)
+        table = DefensiveProfileTable(
+            dataset_version=tables.dataset_version,
+            codes=codes,
+            signature_index={signature: row for row, signature in enumerate(signatures)},
+        )
+        cls._profiles = table
+        return table
+
+    @classmethod
+    def get_defensive_profile_table(cls) -> DefensiveProfileTable:
+        """Get the int8 profile codes of every typing with their signature -> row map."""
+        return cls._build_defensive_profiles()
+
+    @classmethod
+    def get_type_signature(cls, type_names: Iterable[str]) -> Tuple[int, ...]:
+        """Get the canonical signature (sorted, de-duplicated type indices) of a typing."""
+        type_index = cls.get_type_index()
+        return tuple(sorted({type_index[name] for name in type_names if name in type_index}))
+
+    @classmethod
+    def get_defensive_profile_codes(cls, signatures: Sequence[Tuple[int, ...]]) -> np.ndarray:
+        """
+        Look up the int8 profile codes of the given type signatures.
+
+        Returns:
+            (len(signatures) x number of types) int8 array, columns ordered
+            as `get_type_order()`
+        """
+        table = cls._build_defensive_profiles()
+        return table.codes[[table.signature_index[signature] for signature in signatures]]
+
+    @classmethod
+    def get_defensive_profiles(cls, type_sets: Sequence[Iterable[str]]) -> np.ndarray:
+        """
+        Look up the multiplier of every attacking type against each typing.
+
+        Equivalent to `defensive_multipliers` for single and dual typings, but
+        served from the precomputed table instead of being multiplied out.
+        """
+        signatures = [cls.get_type_signature(types) for types in type_sets]
+        if any(len(signature) > 2 for signature in signatures):
+            return cls.defensive_multipliers(type_sets)
+        return cls.get_signature_profiles(signatures)
+
+    @classmethod
+    def get_signature_profiles(cls, signatures: Sequence[Tuple[int, ...]]) -> np.ndarray:
+        """Look up the multiplier of every attacking type against each type signature."""
+        return PROFILE_MULTIPLIERS[cls.get_defensive_profile_codes(signatures)]
 
     @classmethod
     def calculate_effectiveness(
         cls, attacking_type: str, defending_types: List[str]
     ) -> float:
         """Calculate effectiveness of an attacking type against defending types."""
-        matrix = cls._build_effectiveness_matrix()
-        effectiveness = 1.0
-
-        for defending_type in defending_types:
-            effectiveness *= matrix.get(attacking_type, {}).get(defending_type, 1.0)
-
-        return effectiveness
+        return float(
+            cls.calculate_effectiveness_batch([attacking_type], [defending_types])[0]
+        )
 
     @classmethod
     def get_all_type_names(cls) -> Set[str]:
         """Get all type names."""
-        if cls._type_names is not None:
-            return cls._type_names
-
-        cls._type_names = set(cls._build_effectiveness_matrix().keys())
-        return cls._type_names
+        return cls._build_tables().type_names